@@ -0,0 +1,117 @@
+"""Benchmark di throughput in lettura di ConcurrentGraph con uno scrittore
+
+Confronta get_neighbors sul grafo senza lock (un solo thread), tramite
+ConcurrentGraph (lock in lettura) e su snapshot(), con 1..N thread
+lettori mentre uno scrittore aggiunge e toglie archi a ritmo fisso.
+
+    PYTHONPATH=src python benchmarks/concurrent_reads.py --threads 1 2 4 8
+"""
+import argparse
+import random
+import threading
+from time import perf_counter, sleep
+
+from base_graph import BaseGraph, ConcurrentGraph
+
+
+def build_graph(num_nodes, num_edges, seed):
+    rng = random.Random(seed)
+    graph = BaseGraph()
+    uids = graph.add_nodes({} for _ in range(num_nodes))
+    graph.add_edges((rng.choice(uids), rng.choice(uids), "link")
+                    for _ in range(num_edges))
+    return graph, uids
+
+
+def run_readers(reads, uids, num_threads, duration):
+    """Operazioni al secondo di num_threads thread lettori
+
+    reads() restituisce la funzione di lettura per un blocco di 100
+    operazioni (con snapshot() ogni blocco prende l'istantanea corrente).
+    """
+    start = threading.Barrier(num_threads + 1)
+    stop = threading.Event()
+    counts = [0] * num_threads
+
+    def reader(slot):
+        rng = random.Random(slot)
+        choice = rng.choice
+        count = 0
+        start.wait()
+        while not stop.is_set():
+            read = reads()
+            for _ in range(100):
+                read(choice(uids))
+            count += 100
+        counts[slot] = count
+
+    threads = [threading.Thread(target=reader, args=(slot,)) for slot in range(num_threads)]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    began = perf_counter()
+    sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / (perf_counter() - began)
+
+
+def start_writer(graph, uids, rate, seed):
+    """Thread che alterna add_edge e del_edge circa rate volte al secondo"""
+    stop = threading.Event()
+
+    def writer():
+        rng = random.Random(seed)
+        while not stop.wait(1 / rate):
+            a, b = rng.choice(uids), rng.choice(uids)
+            if graph.has_edge(a, b, "churn"):
+                graph.del_edge(a, b, "churn")
+            else:
+                graph.add_edge(a, b, "churn")
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    return stop, thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--nodes', type=int, default=10_000)
+    parser.add_argument('--edges', type=int, default=50_000)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--write-rate', type=float, default=1000.0,
+                        help="scritture al secondo dello scrittore")
+    parser.add_argument('--duration', type=float, default=2.0,
+                        help="secondi per ogni misura")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    graph, uids = build_graph(args.nodes, args.edges, args.seed)
+    print(f"grafo: {args.nodes} nodi, {args.edges} archi; "
+          f"scrittore a {args.write_rate:g} scritture/s")
+
+    def report(label, ops):
+        print(f"  {label:<40}{ops:12,.0f} op/s")
+
+    report("senza lock, 1 thread, senza scrittore",
+           run_readers(lambda: graph.get_neighbors, uids, 1, args.duration))
+
+    concurrent = ConcurrentGraph(graph)
+    stop, writer = start_writer(concurrent, uids, args.write_rate, args.seed)
+    try:
+        for num_threads in args.threads:
+            report(f"lock in lettura, {num_threads} thread",
+                   run_readers(lambda: concurrent.get_neighbors, uids,
+                               num_threads, args.duration))
+        for num_threads in args.threads:
+            report(f"snapshot(), {num_threads} thread",
+                   run_readers(lambda: concurrent.snapshot().get_neighbors, uids,
+                               num_threads, args.duration))
+    finally:
+        stop.set()
+        writer.join()
+
+
+if __name__ == '__main__':
+    main()
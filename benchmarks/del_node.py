@@ -0,0 +1,45 @@
+"""Benchmark di del_node al crescere del numero di tipi di arco
+
+Ogni nodo rimosso ha archi di due soli tipi, mentre il grafo ne
+contiene sempre di più: grazie all'indice di incidenza (out_types,
+in_types) il tempo per nodo deve restare circa costante.
+
+    PYTHONPATH=src python benchmarks/del_node.py --types 2 100 1000 10000
+"""
+import argparse
+from time import perf_counter
+
+from base_graph import BaseGraph
+
+
+def time_deletions(num_types, num_victims):
+    """Secondi per rimuovere num_victims nodi in un grafo con num_types tipi"""
+    graph = BaseGraph()
+    hub_a = graph.add_node()
+    hub_b = graph.add_node()
+    graph.add_edges((hub_a, hub_b, f"type-{i}") for i in range(num_types))
+    victims = graph.add_nodes({} for _ in range(num_victims))
+    graph.add_edges((victim, hub_a, "type-0") for victim in victims)
+    graph.add_edges((hub_b, victim, "type-1") for victim in victims)
+
+    start = perf_counter()
+    for victim in victims:
+        graph.del_node(victim)
+    return perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--types', type=int, nargs='+', default=[2, 100, 1000, 10000])
+    parser.add_argument('--victims', type=int, default=10000)
+    args = parser.parse_args()
+
+    print(f"{args.victims} nodi rimossi")
+    for num_types in args.types:
+        elapsed = time_deletions(num_types, args.victims)
+        print(f"  {num_types:>7} tipi{elapsed:9.3f} s"
+              f"{elapsed / args.victims * 1e6:9.2f} us/nodo")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Benchmark della memoria occupata dai nodi nei vari tipi di grafo
+
+Misura con tracemalloc la memoria allocata per creare lo stesso insieme
+di nodi in BaseGraph (Node con __dict__), SlottedGraph (__slots__
+generati dallo schema) e ColumnarGraph (colonne tipizzate).
+
+    PYTHONPATH=src python benchmarks/node_memory.py --nodes 1000000
+"""
+import argparse
+import gc
+import tracemalloc
+from time import perf_counter
+
+from base_graph import BaseGraph, ColumnarGraph, SlottedGraph
+
+GRAPH_TYPES = {
+    'base': BaseGraph,
+    'slotted': SlottedGraph,
+    'columnar': ColumnarGraph,
+}
+
+
+def measure(graph_cls, num_nodes):
+    """Memoria allocata (byte) e tempo per creare num_nodes nodi"""
+    gc.collect()
+    tracemalloc.start()
+    start = perf_counter()
+    graph = graph_cls(name="", value=0, score=0.0, active=True)
+    graph.add_nodes(
+        {"name": "task", "value": i, "score": i / 2, "active": bool(i & 1)}
+        for i in range(num_nodes)
+    )
+    elapsed = perf_counter() - start
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del graph
+    return used, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--nodes', type=int, default=1_000_000)
+    parser.add_argument('--types', nargs='+', choices=list(GRAPH_TYPES),
+                        default=list(GRAPH_TYPES))
+    args = parser.parse_args()
+
+    print(f"{args.nodes} nodi con 4 attributi")
+    baseline = None
+    for name in args.types:
+        used, elapsed = measure(GRAPH_TYPES[name], args.nodes)
+        if baseline is None:
+            baseline = used
+        print(f"  {name:<10}{used / 2 ** 20:10.1f} MB{used / baseline:8.2f}x"
+              f"{elapsed:9.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Benchmark di ParallelAnalytics al variare del numero di processi
+
+Genera un grafo casuale direttamente come array CSR (senza passare da
+BaseGraph, che per decine di milioni di archi richiederebbe molti GB),
+poi misura le stesse analisi con 1, 2, ... N processi.
+
+    PYTHONPATH=src python benchmarks/parallel_analytics.py --nodes 1000000 --edges 20000000
+    PYTHONPATH=src python benchmarks/parallel_analytics.py --workers 1 2 4 8
+"""
+import argparse
+import os
+import random
+from array import array
+from itertools import accumulate
+from time import perf_counter
+
+from base_graph import FrozenGraph, ParallelAnalytics
+
+_CHUNK = 1 << 20
+
+
+def random_csr(num_nodes, num_edges, seed):
+    """CSR in avanti e all'indietro di un grafo casuale con grado uscente uniforme"""
+    rng = random.Random(seed)
+    degree, extra = divmod(num_edges, num_nodes)
+    # I primi extra nodi hanno un arco in più
+    offsets = array('q', accumulate(
+        [0] + [degree + 1] * extra + [degree] * (num_nodes - extra)))
+    population = range(num_nodes)
+    targets = array('i')
+    for start in range(0, num_edges, _CHUNK):
+        targets.extend(rng.choices(population, k=min(_CHUNK, num_edges - start)))
+
+    # Ordinamento per conteggio sugli estremi di arrivo
+    counts = array('q', [0]) * (num_nodes + 1)
+    for target in targets:
+        counts[target + 1] += 1
+    rev_offsets = array('q', accumulate(counts))
+    positions = array('q', rev_offsets)
+    rev_targets = array('i', [0]) * num_edges
+    for source in range(num_nodes):
+        for target in targets[offsets[source]:offsets[source + 1]]:
+            rev_targets[positions[target]] = source
+            positions[target] += 1
+    return ((memoryview(offsets), memoryview(targets)),
+            (memoryview(rev_offsets), memoryview(rev_targets)))
+
+
+def timed(label, func, *args, **kwargs):
+    start = perf_counter()
+    result = func(*args, **kwargs)
+    print(f"  {label:<22}{perf_counter() - start:9.3f} s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--nodes', type=int, default=1_000_000)
+    parser.add_argument('--edges', type=int, default=20_000_000)
+    parser.add_argument('--workers', type=int, nargs='+',
+                        help="numeri di processi da provare (default 1, 2, 4, ... cpu_count)")
+    parser.add_argument('--sources', type=int, default=8,
+                        help="sorgenti per multi_source_bfs")
+    parser.add_argument('--max-depth', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    workers = args.workers
+    if not workers:
+        cpus = os.cpu_count() or 1
+        workers = [1 << i for i in range(cpus.bit_length()) if 1 << i < cpus] + [cpus]
+
+    start = perf_counter()
+    csr, rev_csr = random_csr(args.nodes, args.edges, args.seed)
+    graph = FrozenGraph({}, args.nodes, range(args.nodes), {},
+                        {'edge': csr}, {'edge': rev_csr})
+    print(f"grafo: {args.nodes} nodi, {args.edges} archi, "
+          f"generato in {perf_counter() - start:.1f} s")
+
+    rng = random.Random(args.seed)
+    sources = rng.sample(range(args.nodes), min(args.sources, args.nodes))
+    values = [rng.random() for _ in range(args.nodes)]
+
+    for count in workers:
+        print(f"workers={count}")
+        analytics = timed("setup", ParallelAnalytics, graph, workers=count)
+        with analytics:
+            timed("degrees", analytics.degrees)
+            timed("neighbor_sum", analytics.neighbor_sum, values)
+            timed("multi_source_bfs", analytics.multi_source_bfs, sources,
+                  max_depth=args.max_depth)
+            timed("connected_components", analytics.connected_components)
+
+
+if __name__ == '__main__':
+    main()
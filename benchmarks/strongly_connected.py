@@ -0,0 +1,77 @@
+"""Benchmark delle componenti fortemente connesse contro la visita per nodo
+
+Confronta strongly_connected_components (Tarjan iterativo) con il
+metodo ingenuo: per ogni nodo non ancora assegnato, la sua componente
+è l'intersezione dei nodi raggiunti in avanti e all'indietro. I grafi
+sono casuali con edge_factor * N archi; con --condensation misura anche
+la costruzione del grafo aciclico delle componenti.
+
+    PYTHONPATH=src python benchmarks/strongly_connected.py --nodes 2000 5000 10000
+    PYTHONPATH=src python benchmarks/strongly_connected.py --nodes 1000000 --skip-naive --condensation
+"""
+import argparse
+import random
+from time import perf_counter
+
+from base_graph import BaseGraph
+
+
+def random_graph(num_nodes, num_edges, seed):
+    rng = random.Random(seed)
+    graph = BaseGraph()
+    uids = graph.add_nodes({} for _ in range(num_nodes))
+    graph.add_edges((rng.choice(uids), rng.choice(uids), "link")
+                    for _ in range(num_edges))
+    return graph
+
+
+def naive_components(graph, tipo):
+    """Componenti come intersezione di raggiungibili in avanti e all'indietro"""
+    assigned = set()
+    components = []
+    for uid in graph.nodes:
+        if uid in assigned:
+            continue
+        forward = {other for other, _ in graph.dfs(uid, tipo)}
+        backward = {other for other, _ in graph.dfs(uid, tipo, direction='in')}
+        component = forward & backward
+        assigned |= component
+        components.append(component)
+    return components
+
+
+def timed(func, *args, **kwargs):
+    start = perf_counter()
+    result = func(*args, **kwargs)
+    return result, perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--nodes', type=int, nargs='+', default=[2000, 5000, 10000])
+    parser.add_argument('--edge-factor', type=float, default=2.0,
+                        help="archi per nodo nel grafo casuale")
+    parser.add_argument('--skip-naive', action='store_true',
+                        help="non eseguire il metodo ingenuo (quadratico)")
+    parser.add_argument('--condensation', action='store_true')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    for num_nodes in args.nodes:
+        num_edges = int(num_nodes * args.edge_factor)
+        graph = random_graph(num_nodes, num_edges, args.seed)
+        components, tarjan = timed(graph.strongly_connected_components, "link")
+        line = f"N={num_nodes:<9} archi={num_edges:<9} tarjan {tarjan:8.3f} s"
+        if not args.skip_naive:
+            naive, elapsed = timed(naive_components, graph, "link")
+            assert sorted(map(len, naive)) == sorted(map(len, components))
+            line += f"   ingenuo {elapsed:8.3f} s ({elapsed / tarjan:.0f}x)"
+        if args.condensation:
+            dag, elapsed = timed(graph.condensation, "link")
+            line += (f"   condensazione {elapsed:8.3f} s "
+                     f"({len(dag.nodes)} nodi, {dag.num_edges()} archi)")
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,29 @@
 
 from .base_graph import BaseGraph
 from .base_graph import Node
+from .base_graph import FrozenGraph
+from .base_graph import ColumnarGraph
+from .base_graph import SlottedGraph
+from .base_graph import BaseNode
+from .base_graph import AdjacencyView
+from .base_graph import SubgraphView
+from .base_graph import GraphObserver
+from .base_graph import ConcurrentGraph
+from .base_graph import ReadWriteLock
+from .base_graph import ParallelAnalytics
 
 __version__ = "0.1.0"
-__all__ = ["BaseGraph", "Node"]
+__all__ = [
+    "BaseGraph",
+    "Node",
+    "BaseNode",
+    "FrozenGraph",
+    "ColumnarGraph",
+    "SlottedGraph",
+    "AdjacencyView",
+    "SubgraphView",
+    "GraphObserver",
+    "ConcurrentGraph",
+    "ReadWriteLock",
+    "ParallelAnalytics",
+]
@@ -1,3 +1,19 @@
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping, Sequence, Set
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache, partial
+from heapq import heapify, heappop, heappush
+from inspect import iscoroutinefunction
+from itertools import accumulate, chain
+from math import inf
+from threading import Condition, Lock, get_ident, local
+from time import perf_counter
+from types import MappingProxyType
+from xml.sax.saxutils import escape
+
+
 class BaseGraph:
     """Graph to represent various things"""
 
@@ -10,6 +26,27 @@ class BaseGraph:
         # edges and reverse flow edges
         self.edges = {}
         self.rev_edges = {}
+        # indice di incidenza: per ogni nodo i tipi di arco in uscita/entrata
+        self.out_types = {}
+        self.in_types = {}
+        # contatore delle modifiche agli archi (protegge le viste in uso)
+        self._version = 0
+        # statistiche mantenute: archi totali/per tipo, gradi e istogrammi
+        self._num_edges = 0
+        self._edge_counts = {}
+        self._out_degrees = {}
+        self._in_degrees = {}
+        self._out_histogram = {}
+        self._in_histogram = {}
+        # indici opzionali aggiornati a ogni modifica (vedi GraphObserver)
+        self._observers = []
+        self._topological = {}
+        self._reachability = {}
+        self._components = None
+        self._journal = None
+        self._dirty = None
+        # modifiche in sospeso dentro graph.batch()
+        self._batch = None
 
     def add_property(self, key, value):
         if key == "uid":
@@ -17,6 +54,22 @@ class BaseGraph:
         if key in self.keys:
             raise KeyError(f"key '{key}' already present")
         self.keys[key] = value
+        if self._batch is not None:
+            self._batch.undo.append(partial(self._drop_property, key))
+        for observer in self._observers:
+            observer.property_added(key, value)
+
+    def _drop_property(self, key):
+        """Toglie una chiave dallo schema (annullamento di un batch, delta)"""
+        del self.keys[key]
+        for observer in self._observers:
+            observer.property_removed(key)
+
+    def _restore_progress(self, progress):
+        """Riporta indietro il contatore degli uid (annullamento di un batch)"""
+        self.progress = progress
+        for observer in self._observers:
+            observer.progress_restored(progress)
 
     def next_auto_uid(self):
         uid = f'node-{self.progress}'
@@ -50,72 +103,375 @@ class BaseGraph:
         valid_dict_pairs = self.check_validity(**kwargs)
         
         # Crea e aggiungi il nodo
-        new_node = Node(uid, **valid_dict_pairs)
+        new_node = self._new_node(uid, valid_dict_pairs)
         self.nodes[uid] = new_node
+        if self._batch is not None:
+            self._batch.undo.append(partial(self.del_node, uid))
+        for observer in self._observers:
+            observer.node_added(uid)
         return uid  # Utile per sapere quale uid è stato assegnato
 
+    def add_nodes(self, nodes):
+        """Aggiunge in blocco nodi descritti da dizionari di attributi
+
+        Lo schema viene letto una sola volta per tutto il blocco; uid e
+        attributi seguono le stesse regole di add_node. Restituisce la
+        lista degli uid assegnati, nello stesso ordine dell'input.
+        """
+        schema = {key: type(value) for key, value in self.keys.items()}
+        graph_nodes = self.nodes
+        uids = []
+        for data in nodes:
+            uid = None
+            if "uid" in data:
+                uid_str = str(data["uid"])
+                if uid_str not in graph_nodes:
+                    uid = uid_str
+            if not uid:
+                uid = self.next_auto_uid()
+
+            valid_dict_pairs = {
+                key: value for key, value in data.items()
+                if key in schema and isinstance(value, schema[key])
+            }
+            graph_nodes[uid] = self._new_node(uid, valid_dict_pairs)
+            uids.append(uid)
+        if self._batch is not None:
+            self._batch.undo.extend(partial(self.del_node, uid) for uid in uids)
+        for observer in self._observers:
+            for uid in uids:
+                observer.node_added(uid)
+        return uids
+
+    def _new_node(self, uid, attributes):
+        """Crea l'oggetto nodo (le sottoclassi possono cambiarne la forma)"""
+        return Node(uid, **attributes)
+
     def modify_node(self, uid, **kwargs):
         """Modifica attributi di un nodo esistente"""
         if uid not in self.nodes:
             raise KeyError(f"Node with uid '{uid}' does not exist")
         
         valid_dict_pairs = self.check_validity(**kwargs)
+        if self._batch is not None:
+            attributes = self.nodes[uid].to_dict()['attributes']
+            self._batch.undo.append(partial(self._restore_node, uid, attributes))
         self.nodes[uid].update(**valid_dict_pairs)
+        for observer in self._observers:
+            observer.node_modified(uid, valid_dict_pairs)
     
+    def _restore_node(self, uid, attributes):
+        """Sostituisce tutti gli attributi di un nodo (annullamento di un batch, delta)"""
+        self.nodes[uid] = self._new_node(uid, attributes)
+        for observer in self._observers:
+            observer.node_replaced(uid, attributes)
+
     def del_node(self, uid):
         """Rimuove un nodo e tutti i suoi archi"""
         if uid not in self.nodes:
             raise KeyError(f"Node with uid '{uid}' does not exist")
+        batch = self._batch
+        if batch is not None:
+            # Gli archi annotati vanno applicati prima di togliere il nodo
+            self._flush_batch(batch)
+            edges = [(uid, target, tipo) for tipo in self.out_types.get(uid, ())
+                     for target in self.edges[tipo][uid]]
+            edges += [(source, uid, tipo) for tipo in self.in_types.get(uid, ())
+                      for source in self.rev_edges[tipo][uid]]
+            attributes = self.nodes[uid].to_dict()['attributes']
+            batch.undo.append(partial(self._reinsert_node, uid, attributes, edges))
+        self._version += 1
         
-        # Rimuovi tutti gli archi in uscita
-        for tipo in list(self.edges.keys()):
-            if uid in self.edges[tipo]:
-                for target in list(self.edges[tipo][uid]):
-                    self.del_edge(uid, target, tipo)
-
-        # Rimuovi tutti gli archi in entrata
-        for tipo in list(self.rev_edges.keys()):
-            if uid in self.rev_edges[tipo]:
-                for source in list(self.rev_edges[tipo][uid]):
-                    self.del_edge(source, uid, tipo)
+        # Rimuovi tutti gli archi in uscita (solo i tipi del nodo)
+        for tipo in self.out_types.pop(uid, ()):
+            rev_dict = self.rev_edges[tipo]
+            for target in self.edges[tipo].pop(uid):
+                self._count_edge(uid, target, tipo, -1)
+                sources = rev_dict[target]
+                sources.discard(uid)
+                if not sources:
+                    del rev_dict[target]
+                    self._discard_type(self.in_types, target, tipo)
+            self._drop_empty_type(tipo)
+
+        # Rimuovi tutti gli archi in entrata (solo i tipi del nodo)
+        for tipo in self.in_types.pop(uid, ()):
+            fwd_dict = self.edges[tipo]
+            for source in self.rev_edges[tipo].pop(uid):
+                self._count_edge(source, uid, tipo, -1)
+                targets = fwd_dict[source]
+                targets.discard(uid)
+                if not targets:
+                    del fwd_dict[source]
+                    self._discard_type(self.out_types, source, tipo)
+            self._drop_empty_type(tipo)
         
         # Rimuovi il nodo
         del self.nodes[uid]
+        for observer in self._observers:
+            observer.node_removed(uid)
     
+    def _reinsert_node(self, uid, attributes, edges):
+        """Ricrea un nodo rimosso con i suoi archi (annullamento di un batch)"""
+        self.add_node(uid=uid, **attributes)
+        self.add_edges(edges)
+
     def add_edge(self, v1: str, v2: str, tipo: str):
         """Aggiunge un arco tra due nodi"""
         if v1 not in self.nodes:
             raise KeyError(f"Source node '{v1}' does not exist")
         if v2 not in self.nodes:
             raise KeyError(f"Target node '{v2}' does not exist")
+        if self._batch is not None:
+            self._batch.pending[(tipo, v1, v2)] = True
+            return
+        for observer in self._observers:
+            observer.check_edge(v1, v2, tipo)
+        self._version += 1
         
         self.edges.setdefault(tipo, {})
         self.rev_edges.setdefault(tipo, {})
         self.edges[tipo].setdefault(v1, set())
+        if v2 not in self.edges[tipo][v1]:
+            self._count_edge(v1, v2, tipo, 1)
         self.edges[tipo][v1].add(v2)
         self.rev_edges[tipo].setdefault(v2, set())
         self.rev_edges[tipo][v2].add(v1)
+        self.out_types.setdefault(v1, set()).add(tipo)
+        self.in_types.setdefault(v2, set()).add(tipo)
+        for observer in self._observers:
+            observer.edge_added(v1, v2, tipo)
     
+    def add_edges(self, edges):
+        """Aggiunge in blocco archi (v1, v2, tipo)
+
+        Tutti gli estremi vengono verificati prima di modificare il grafo:
+        se un nodo non esiste viene sollevato lo stesso KeyError di
+        add_edge e nessun arco del blocco viene inserito. Con indici
+        opzionali attivi (salvo quelli con bulk_edges) gli archi passano
+        uno alla volta da add_edge: un arco rifiutato (es. un ciclo)
+        ferma l'inserimento lì.
+        """
+        nodes = self.nodes
+        # Unico passaggio: validazione e raggruppamento per tipo
+        grouped = {}
+        for v1, v2, tipo in edges:
+            if v1 not in nodes:
+                raise KeyError(f"Source node '{v1}' does not exist")
+            if v2 not in nodes:
+                raise KeyError(f"Target node '{v2}' does not exist")
+            pairs = grouped.get(tipo)
+            if pairs is None:
+                grouped[tipo] = pairs = []
+            pairs.append((v1, v2))
+
+        if self._batch is not None:
+            pending = self._batch.pending
+            for tipo, pairs in grouped.items():
+                for v1, v2 in pairs:
+                    pending[(tipo, v1, v2)] = True
+            return
+
+        observers = self._observers
+        if not all(observer.bulk_edges for observer in observers):
+            for tipo, pairs in grouped.items():
+                for v1, v2 in pairs:
+                    self.add_edge(v1, v2, tipo)
+            return
+        inserted = [] if observers else None
+
+        self._version += 1
+        out_types = self.out_types
+        in_types = self.in_types
+        # Gradi accumulati per nodo e applicati ai contatori una volta sola
+        out_added = {}
+        in_added = {}
+        for tipo, pairs in grouped.items():
+            fwd_dict = self.edges.setdefault(tipo, {})
+            rev_dict = self.rev_edges.setdefault(tipo, {})
+            added = 0
+            for v1, v2 in pairs:
+                targets = fwd_dict.get(v1)
+                if targets is None:
+                    fwd_dict[v1] = targets = set()
+                    out_types.setdefault(v1, set()).add(tipo)
+                elif v2 in targets:
+                    continue
+                targets.add(v2)
+                added += 1
+                out_added[v1] = out_added.get(v1, 0) + 1
+                in_added[v2] = in_added.get(v2, 0) + 1
+                sources = rev_dict.get(v2)
+                if sources is None:
+                    rev_dict[v2] = sources = set()
+                    in_types.setdefault(v2, set()).add(tipo)
+                sources.add(v1)
+                if inserted is not None:
+                    inserted.append((v1, v2, tipo))
+            if added:
+                self._num_edges += added
+                self._edge_counts[tipo] = self._edge_counts.get(tipo, 0) + added
+        for uid, delta in out_added.items():
+            self._shift_degree(self._out_degrees, self._out_histogram, uid, delta)
+        for uid, delta in in_added.items():
+            self._shift_degree(self._in_degrees, self._in_histogram, uid, delta)
+        if inserted:
+            for observer in observers:
+                observer.edges_added(inserted)
+
     def del_edge(self, v1: str, v2: str, tipo: str):
         """Rimuove un arco specifico tra due nodi"""
+        if self._batch is not None:
+            self._batch.pending[(tipo, v1, v2)] = False
+            return
         if tipo in self.edges:
+            self._version += 1
+            existed = v2 in self.edges[tipo].get(v1, ())
+            if existed:
+                self._count_edge(v1, v2, tipo, -1)
             if v1 in self.edges[tipo]:
                 self.edges[tipo][v1].discard(v2)
                 # Pulizia: rimuovi chiave se set vuoto
                 if not self.edges[tipo][v1]:
                     del self.edges[tipo][v1]
+                    self._discard_type(self.out_types, v1, tipo)
             
             if v2 in self.rev_edges[tipo]:
                 self.rev_edges[tipo][v2].discard(v1)
                 # Pulizia: rimuovi chiave se set vuoto
                 if not self.rev_edges[tipo][v2]:
                     del self.rev_edges[tipo][v2]
+                    self._discard_type(self.in_types, v2, tipo)
             
             # Pulizia: rimuovi tipo se vuoto
-            if not self.edges[tipo]:
-                del self.edges[tipo]
-            if tipo in self.rev_edges and not self.rev_edges[tipo]:
-                del self.rev_edges[tipo]
+            self._drop_empty_type(tipo)
+            if existed:
+                for observer in self._observers:
+                    observer.edge_removed(v1, v2, tipo)
+
+    def _del_edges(self, edges):
+        """Rimuove in blocco archi esistenti, con un'unica pulizia finale"""
+        self._version += 1
+        rows = set()
+        rev_rows = set()
+        for v1, v2, tipo in edges:
+            self.edges[tipo][v1].discard(v2)
+            self.rev_edges[tipo][v2].discard(v1)
+            self._count_edge(v1, v2, tipo, -1)
+            rows.add((tipo, v1))
+            rev_rows.add((tipo, v2))
+        # Righe e tipi rimasti vuoti vengono controllati una volta sola
+        for tipo, v1 in rows:
+            if not self.edges[tipo][v1]:
+                del self.edges[tipo][v1]
+                self._discard_type(self.out_types, v1, tipo)
+        for tipo, v2 in rev_rows:
+            if not self.rev_edges[tipo][v2]:
+                del self.rev_edges[tipo][v2]
+                self._discard_type(self.in_types, v2, tipo)
+        for tipo in {tipo for tipo, _ in rows}:
+            self._drop_empty_type(tipo)
+
+    @contextmanager
+    def batch(self):
+        """Raggruppa le modifiche in un blocco applicato tutto insieme
+
+        Dentro il blocco add_edge, add_edges e del_edge vengono solo
+        annotati (su ogni arco vince l'ultima operazione) e applicati
+        all'uscita in un unico passaggio, con la pulizia di righe e tipi
+        vuoti fatta una volta sola: le letture degli archi vedono lo
+        stato precedente al blocco. I nodi vengono modificati subito e
+        del_node applica prima gli archi annotati fino a quel momento.
+        Se il blocco solleva un'eccezione il grafo torna allo stato
+        iniziale. Un blocco annidato fa parte di quello più esterno.
+        """
+        if self._batch is not None:
+            yield
+            return
+        batch = self._batch = _Batch(self.progress)
+        try:
+            yield
+            self._flush_batch(batch)
+        except BaseException:
+            self._batch = None
+            for undo in reversed(batch.undo):
+                undo()
+            if self.progress != batch.progress:
+                self._restore_progress(batch.progress)
+            raise
+        finally:
+            self._batch = None
+
+    def _flush_batch(self, batch):
+        """Applica gli archi annotati nel batch, saltando quelli senza effetto"""
+        pending, batch.pending = batch.pending, {}
+        adds = []
+        dels = []
+        for (tipo, v1, v2), add in pending.items():
+            if self.has_edge(v1, v2, tipo) != add:
+                (adds if add else dels).append((v1, v2, tipo))
+        self._batch = None
+        try:
+            if self._observers:
+                # Gli indici opzionali vedono (e possono rifiutare) ogni arco
+                for edge in dels:
+                    self.del_edge(*edge)
+                    batch.undo.append(partial(self.add_edge, *edge))
+                for edge in adds:
+                    self.add_edge(*edge)
+                    batch.undo.append(partial(self.del_edge, *edge))
+            else:
+                if dels:
+                    self._del_edges(dels)
+                    batch.undo.append(partial(self.add_edges, dels))
+                if adds:
+                    self.add_edges(adds)
+                    batch.undo.append(partial(self._del_edges, adds))
+        finally:
+            self._batch = batch
+
+    def _count_edge(self, v1, v2, tipo, delta):
+        """Aggiorna i contatori per un arco aggiunto (+1) o rimosso (-1)"""
+        self._num_edges += delta
+        count = self._edge_counts.get(tipo, 0) + delta
+        if count:
+            self._edge_counts[tipo] = count
+        else:
+            del self._edge_counts[tipo]
+        self._shift_degree(self._out_degrees, self._out_histogram, v1, delta)
+        self._shift_degree(self._in_degrees, self._in_histogram, v2, delta)
+
+    @staticmethod
+    def _shift_degree(degrees, histogram, uid, delta):
+        """Sposta un nodo nell'istogramma dei gradi (solo gradi positivi)"""
+        old = degrees.get(uid, 0)
+        if old:
+            if histogram[old] == 1:
+                del histogram[old]
+            else:
+                histogram[old] -= 1
+        new = old + delta
+        if new:
+            degrees[uid] = new
+            histogram[new] = histogram.get(new, 0) + 1
+        else:
+            del degrees[uid]
+
+    def _drop_empty_type(self, tipo):
+        """Rimuove un tipo di arco rimasto senza archi"""
+        if tipo in self.edges and not self.edges[tipo]:
+            del self.edges[tipo]
+        if tipo in self.rev_edges and not self.rev_edges[tipo]:
+            del self.rev_edges[tipo]
+
+    @staticmethod
+    def _discard_type(index, uid, tipo):
+        """Rimuove un tipo dall'indice di incidenza di un nodo"""
+        types = index.get(uid)
+        if types is not None:
+            types.discard(tipo)
+            if not types:
+                del index[uid]
     
     def get_neighbors(self, uid: str, tipo: str = None):
         """Ottiene i vicini (successori) di un nodo"""
@@ -125,11 +481,10 @@ class BaseGraph:
         if tipo:
             return self.edges.get(tipo, {}).get(uid, set()).copy()
         else:
-            # Tutti i vicini di tutti i tipi
+            # Tutti i vicini, solo sui tipi in cui il nodo compare
             neighbors = set()
-            for edge_dict in self.edges.values():
-                if uid in edge_dict:
-                    neighbors.update(edge_dict[uid])
+            for edge_tipo in self.out_types.get(uid, ()):
+                neighbors.update(self.edges[edge_tipo][uid])
             return neighbors
     
     def get_predecessors(self, uid: str, tipo: str = None):
@@ -140,19 +495,532 @@ class BaseGraph:
         if tipo:
             return self.rev_edges.get(tipo, {}).get(uid, set()).copy()
         else:
-            # Tutti i predecessori di tutti i tipi
+            # Tutti i predecessori, solo sui tipi in cui il nodo compare
             predecessors = set()
-            for edge_dict in self.rev_edges.values():
-                if uid in edge_dict:
-                    predecessors.update(edge_dict[uid])
+            for edge_tipo in self.in_types.get(uid, ()):
+                predecessors.update(self.rev_edges[edge_tipo][uid])
             return predecessors
+
+    def neighbors_view(self, uid: str, tipo: str):
+        """Vista in sola lettura, senza copia, dei successori di un nodo"""
+        if uid not in self.nodes:
+            raise KeyError(f"Node with uid '{uid}' does not exist")
+        return AdjacencyView(self, self.edges, uid, tipo)
+
+    def predecessors_view(self, uid: str, tipo: str):
+        """Vista in sola lettura, senza copia, dei predecessori di un nodo"""
+        if uid not in self.nodes:
+            raise KeyError(f"Node with uid '{uid}' does not exist")
+        return AdjacencyView(self, self.rev_edges, uid, tipo)
+
+    def iter_neighbors(self, uid: str, tipo: str = None):
+        """Itera i successori senza copie; con tipo=None concatena i tipi
+
+        Un vicino collegato con più tipi di arco compare una volta per tipo.
+        Modificare gli archi durante l'iterazione solleva RuntimeError.
+        """
+        if uid not in self.nodes:
+            raise KeyError(f"Node with uid '{uid}' does not exist")
+        return self._iter_rows(self.edges, self.out_types, uid, tipo)
+
+    def iter_predecessors(self, uid: str, tipo: str = None):
+        """Itera i predecessori senza copie; con tipo=None concatena i tipi"""
+        if uid not in self.nodes:
+            raise KeyError(f"Node with uid '{uid}' does not exist")
+        return self._iter_rows(self.rev_edges, self.in_types, uid, tipo)
+
+    def _iter_rows(self, adjacency, types_index, uid, tipo):
+        version = self._version
+        tipi = (tipo,) if tipo else types_index.get(uid, ())
+        for edge_tipo in tipi:
+            # L'iteratore del set segnala già i cambi di dimensione; il
+            # contatore copre le modifiche che lasciano invariata la dimensione
+            yield from adjacency.get(edge_tipo, {}).get(uid, ())
+            if self._version != version:
+                raise RuntimeError("Graph edges changed during iteration")
+
+    def out_degree(self, uid: str, tipo: str = None) -> int:
+        """Numero di archi in uscita da un nodo (di un tipo o di tutti)"""
+        if uid not in self.nodes:
+            raise KeyError(f"Node with uid '{uid}' does not exist")
+        if tipo:
+            return len(self.edges.get(tipo, {}).get(uid, ()))
+        return self._out_degrees.get(uid, 0)
+
+    def in_degree(self, uid: str, tipo: str = None) -> int:
+        """Numero di archi in entrata in un nodo (di un tipo o di tutti)"""
+        if uid not in self.nodes:
+            raise KeyError(f"Node with uid '{uid}' does not exist")
+        if tipo:
+            return len(self.rev_edges.get(tipo, {}).get(uid, ()))
+        return self._in_degrees.get(uid, 0)
+
+    def num_nodes(self) -> int:
+        """Numero di nodi del grafo"""
+        return len(self.nodes)
+
+    def num_edges(self, tipo: str = None) -> int:
+        """Numero di archi (di un tipo o di tutti), mantenuto a ogni modifica"""
+        if tipo:
+            return self._edge_counts.get(tipo, 0)
+        return self._num_edges
+
+    def degree_histogram(self, direction='out', tipo: str = None):
+        """Dizionario grado -> numero di nodi con quel grado
+
+        Senza tipo l'istogramma è mantenuto a ogni modifica e costa
+        O(gradi distinti); con un tipo viene contato dalle righe di
+        adiacenza di quel tipo.
+        """
+        if direction == 'out':
+            histogram, adjacency = self._out_histogram, self.edges
+        elif direction == 'in':
+            histogram, adjacency = self._in_histogram, self.rev_edges
+        else:
+            raise ValueError(f"Unknown direction '{direction}'")
+        if tipo:
+            histogram = {}
+            for row in adjacency.get(tipo, {}).values():
+                histogram[len(row)] = histogram.get(len(row), 0) + 1
+        result = dict(histogram)
+        isolated = len(self.nodes) - sum(histogram.values())
+        if isolated:
+            result[0] = isolated
+        return result
     
+    def _seeds(self, start):
+        """Normalizza uid o insieme di uid di partenza (senza duplicati)"""
+        if isinstance(start, str):
+            start = (start,)
+        seeds = list(dict.fromkeys(start))
+        for uid in seeds:
+            if uid not in self.nodes:
+                raise KeyError(f"Node with uid '{uid}' does not exist")
+        return seeds
+
+    def _neighbor_rows(self, tipi, direction):
+        """Funzione uid -> righe di adiacenza da seguire nella visita"""
+        sides = []
+        if direction in ('out', 'both'):
+            sides.append((self.edges, self.out_types))
+        if direction in ('in', 'both'):
+            sides.append((self.rev_edges, self.in_types))
+        if not sides:
+            raise ValueError(f"Unknown direction '{direction}'")
+
+        if tipi is None:
+            # Tutti i tipi: solo quelli in cui il nodo compare
+            def rows(uid):
+                for adjacency, types_index in sides:
+                    for tipo in types_index.get(uid, ()):
+                        yield adjacency[tipo][uid]
+        else:
+            if isinstance(tipi, str):
+                tipi = (tipi,)
+            dicts = [adjacency[tipo] for adjacency, _ in sides
+                     for tipo in tipi if tipo in adjacency]
+
+            def rows(uid):
+                for edge_dict in dicts:
+                    row = edge_dict.get(uid)
+                    if row:
+                        yield row
+        return rows
+
+    def bfs(self, start, tipi=None, direction='out', max_depth=None, predicate=None):
+        """Visita in ampiezza: genera (uid, profondità) in ordine di distanza
+
+        start è un uid o un insieme di uid; tipi limita i tipi di arco
+        seguiti; direction è 'out' (successori), 'in' (predecessori) o
+        'both'; predicate(node) esclude nodi dalla visita. I risultati sono
+        prodotti man mano, quindi si può interrompere la visita in anticipo.
+        """
+        nodes = self.nodes
+        rows = self._neighbor_rows(tipi, direction)
+        seeds = self._seeds(start)
+        visited = set(seeds)
+        frontier = [uid for uid in seeds if predicate is None or predicate(nodes[uid])]
+        version = self._version
+        for uid in frontier:
+            yield uid, 0
+
+        depth = 0
+        while frontier and (max_depth is None or depth < max_depth):
+            depth += 1
+            next_frontier = []
+            for uid in frontier:
+                for row in rows(uid):
+                    for other in row:
+                        if other in visited:
+                            continue
+                        visited.add(other)
+                        if predicate is None or predicate(nodes[other]):
+                            next_frontier.append(other)
+                            yield other, depth
+                            if self._version != version:
+                                raise RuntimeError("Graph edges changed during traversal")
+            frontier = next_frontier
+
+    def dfs(self, start, tipi=None, direction='out', max_depth=None, predicate=None):
+        """Visita in profondità (iterativa): genera (uid, profondità) in preordine
+
+        Stessi parametri di bfs. Con max_depth un nodo raggiunto di nuovo
+        a profondità minore viene riespanso, così nessun nodo entro il
+        limite viene perso; ogni nodo è comunque prodotto una sola volta.
+        """
+        nodes = self.nodes
+        rows = self._neighbor_rows(tipi, direction)
+        version = self._version
+        # uid -> profondità minima a cui è stato espanso
+        depths = {}
+        rejected = set()
+        for seed in self._seeds(start):
+            if predicate is not None and not predicate(nodes[seed]):
+                rejected.add(seed)
+                continue
+            if seed not in depths:
+                yield seed, 0
+            depths[seed] = 0
+            stack = []
+            if max_depth is None or max_depth > 0:
+                stack.append((0, chain.from_iterable(rows(seed))))
+            while stack:
+                depth, neighbors = stack[-1]
+                for other in neighbors:
+                    if other in rejected:
+                        continue
+                    known = depths.get(other)
+                    if known is not None and (max_depth is None or known <= depth + 1):
+                        continue
+                    if known is None:
+                        if predicate is not None and not predicate(nodes[other]):
+                            rejected.add(other)
+                            continue
+                        yield other, depth + 1
+                        if self._version != version:
+                            raise RuntimeError("Graph edges changed during traversal")
+                    depths[other] = depth + 1
+                    if max_depth is None or depth + 1 < max_depth:
+                        stack.append((depth + 1, chain.from_iterable(rows(other))))
+                        break
+                else:
+                    stack.pop()
+
+    def k_hop(self, start, k, tipi=None, direction='out', predicate=None):
+        """Genera gli uid raggiungibili in al più k passi (esclusi i nodi di partenza)"""
+        for uid, depth in self.bfs(start, tipi, direction, k, predicate):
+            if depth:
+                yield uid
+
+    def _cost_function(self, weight):
+        """Costo di un arco (u, v, tipo): None (unitario), attributo o callable
+
+        Con il nome di un attributo il costo è il valore di quell'attributo
+        sul nodo di arrivo (il default dello schema se il nodo non lo ha).
+        """
+        if weight is None or callable(weight):
+            return weight
+        if weight not in self.keys:
+            raise KeyError(f"Unknown weight attribute '{weight}'")
+        default = self.keys[weight]
+        nodes = self.nodes
+        return lambda u, v, tipo: getattr(nodes[v], weight, default)
+
+    def _weighted_neighbors(self, tipi, weight, reverse=False):
+        """Funzione uid -> (vicino, costo) per gli algoritmi di cammino minimo"""
+        cost = self._cost_function(weight)
+        if isinstance(tipi, str):
+            tipi = (tipi,)
+        if reverse:
+            adjacency, types_index = self.rev_edges, self.in_types
+        else:
+            adjacency, types_index = self.edges, self.out_types
+
+        def edges_of(uid):
+            for tipo in (types_index.get(uid, ()) if tipi is None else tipi):
+                row = adjacency.get(tipo, {}).get(uid)
+                if not row:
+                    continue
+                for other in row:
+                    if cost is None:
+                        yield other, 1
+                        continue
+                    c = cost(other, uid, tipo) if reverse else cost(uid, other, tipo)
+                    if c < 0:
+                        raise ValueError(f"Negative weight {c} on edge type '{tipo}'")
+                    yield other, c
+        return edges_of
+
+    def dijkstra(self, sources, tipi=None, weight=None, max_cost=None):
+        """Distanze minime da uno o più nodi sorgente (Dijkstra con heap binario)
+
+        Con più sorgenti calcola in un'unica passata la distanza dalla
+        sorgente più vicina. weight è None (costo 1), il nome di un
+        attributo numerico dello schema o una funzione (u, v, tipo).
+        Restituisce (distanze, predecessori) come dizionari per uid.
+        """
+        edges_of = self._weighted_neighbors(tipi, weight)
+        return _dijkstra(self._seeds(sources), edges_of, max_cost=max_cost)
+
+    def shortest_path(self, source, target, tipi=None, weight=None):
+        """Cammino minimo con Dijkstra bidirezionale: (costo, [uid...])
+
+        Se target non è raggiungibile restituisce (inf, []).
+        """
+        self._seeds((source, target))
+        return _bidirectional_dijkstra(
+            source, target,
+            self._weighted_neighbors(tipi, weight),
+            self._weighted_neighbors(tipi, weight, reverse=True),
+        )
+
+    def astar_path(self, source, target, heuristic, tipi=None, weight=None):
+        """Cammino minimo con A*; heuristic(uid) stima il costo residuo verso target"""
+        self._seeds((source, target))
+        return _astar(source, target, self._weighted_neighbors(tipi, weight), heuristic)
+
+    def add_observer(self, observer):
+        """Registra un GraphObserver che riceve tutte le modifiche del grafo"""
+        self._observers.append(observer)
+        return observer
+
+    def remove_observer(self, observer):
+        """Rimuove un GraphObserver registrato con add_observer"""
+        self._observers.remove(observer)
+
+    def enable_topological_order(self, tipo: str):
+        """Mantiene incrementalmente un ordine topologico per un tipo di arco
+
+        Da qui in poi add_edge rifiuta con ValueError gli archi di quel
+        tipo che chiuderebbero un ciclo. Solleva ValueError se gli archi
+        esistenti contengono già un ciclo.
+        """
+        if tipo not in self._topological:
+            order = _TopologicalOrder(self, tipo)
+            self._topological[tipo] = self.add_observer(order)
+
+    def disable_topological_order(self, tipo: str):
+        """Smette di mantenere l'ordine topologico di un tipo di arco"""
+        order = self._topological.pop(tipo, None)
+        if order is not None:
+            self.remove_observer(order)
+
+    def topological_order(self, tipo: str):
+        """Lista di tutti gli uid in ordine topologico rispetto agli archi di tipo
+
+        Per un tipo abilitato con enable_topological_order l'ordine è già
+        pronto; altrimenti viene calcolato da zero (ValueError se c'è un ciclo).
+        """
+        order = self._topological.get(tipo)
+        if order is not None:
+            return order.order()
+        return _topological_sort(self.nodes, self.edges.get(tipo, {}),
+                                 self.rev_edges.get(tipo, {}))
+
+    def strongly_connected_components(self, tipi=None):
+        """Componenti fortemente connesse sugli archi dei tipi scelti
+
+        Tarjan iterativo, senza ricorsione: regge grafi con milioni di
+        nodi e cammini lunghi. Restituisce liste di uid in ordine
+        topologico inverso (ogni componente dopo quelle che raggiunge);
+        ogni nodo compare in esattamente una componente.
+        """
+        rows = self._neighbor_rows(tipi, 'out')
+        return _strongly_connected(self.nodes, lambda uid: chain.from_iterable(rows(uid)))
+
+    def condensation(self, tipi=None, frozen=False):
+        """Grafo aciclico delle componenti fortemente connesse
+
+        Ogni componente diventa un nodo 'scc-<i>', con i numerati in
+        ordine topologico, e attributi members (lista di uid) e size.
+        Un arco fra componenti diverse produce un arco dello stesso tipo
+        fra i loro nodi. Con frozen=True restituisce un FrozenGraph.
+        """
+        components = self.strongly_connected_components(tipi)
+        components.reverse()
+        component_of = {}
+        for cid, members in enumerate(components):
+            for uid in members:
+                component_of[uid] = f'scc-{cid}'
+        dag = BaseGraph(members=[], size=0)
+        dag.add_nodes({'uid': f'scc-{cid}', 'members': members, 'size': len(members)}
+                      for cid, members in enumerate(components))
+        if tipi is None:
+            tipi = tuple(self.edges)
+        elif isinstance(tipi, str):
+            tipi = (tipi,)
+        dag.add_edges(
+            (component_of[v1], component_of[v2], tipo)
+            for tipo in tipi for v1, targets in self.edges.get(tipo, {}).items()
+            for v2 in targets if component_of[v1] != component_of[v2]
+        )
+        return dag.freeze() if frozen else dag
+
+    def would_create_cycle(self, v1: str, v2: str, tipo: str) -> bool:
+        """Verifica se l'arco v1 -> v2 di tipo chiuderebbe un ciclo"""
+        self._seeds((v1, v2))
+        order = self._topological.get(tipo)
+        if order is not None:
+            return order.would_create_cycle(v1, v2)
+        if v1 == v2:
+            return True
+        return any(uid == v1 for uid, _ in self.bfs(v2, tipo))
+
+    def enable_reachability_index(self, tipo: str):
+        """Attiva l'indice di raggiungibilità (chiusura transitiva) per un tipo"""
+        if tipo not in self._reachability:
+            index = _ReachabilityIndex(self, tipo)
+            self._reachability[tipo] = self.add_observer(index)
+
+    def disable_reachability_index(self, tipo: str):
+        """Elimina l'indice di raggiungibilità di un tipo di arco"""
+        index = self._reachability.pop(tipo, None)
+        if index is not None:
+            self.remove_observer(index)
+
+    def rebuild_reachability_index(self, tipo: str):
+        """Ricostruisce subito l'indice di un tipo (invece che alla prossima query)"""
+        self._reachability[tipo].rebuild()
+
+    def reachability_stats(self, tipo: str):
+        """Contatori dell'indice: query servite, ricostruzioni e loro costo"""
+        return dict(self._reachability[tipo].stats)
+
+    def is_reachable(self, a: str, b: str, tipo: str) -> bool:
+        """Verifica se esiste un cammino (anche vuoto) da a a b sugli archi di tipo
+
+        Con l'indice attivo la risposta è un test su bit; senza indice
+        viene eseguita una visita in ampiezza.
+        """
+        self._seeds((a, b))
+        index = self._reachability.get(tipo)
+        if index is not None:
+            return index.is_reachable(a, b)
+        return any(uid == b for uid, _ in self.bfs(a, tipo))
+
+    def enable_component_index(self):
+        """Mantiene le componenti debolmente connesse con un union-find
+
+        add_edge e add_edges fondono le componenti sul posto; dopo una
+        rimozione solo la componente coinvolta viene ricalcolata, alla
+        prima query che la tocca.
+        """
+        if self._components is None:
+            self._components = self.add_observer(_ComponentIndex(self))
+
+    def disable_component_index(self):
+        """Elimina l'indice delle componenti connesse"""
+        if self._components is not None:
+            self.remove_observer(self._components)
+            self._components = None
+
+    def component_stats(self):
+        """Contatori dell'indice: unioni, ricalcoli e nodi ricalcolati"""
+        if self._components is None:
+            raise ValueError("Component index not enabled")
+        return dict(self._components.stats)
+
+    def component_of(self, uid: str):
+        """Insieme degli uid nella componente debolmente connessa di uid
+
+        Senza indice viene eseguita una visita in ampiezza su tutti i
+        tipi di arco, in entrambe le direzioni.
+        """
+        self._seeds(uid)
+        if self._components is not None:
+            return self._components.component_of(uid)
+        return {other for other, _ in self.bfs(uid, direction='both')}
+
+    def same_component(self, a: str, b: str) -> bool:
+        """Verifica se a e b sono nella stessa componente debolmente connessa"""
+        self._seeds((a, b))
+        if self._components is not None:
+            return self._components.same_component(a, b)
+        return any(uid == b for uid, _ in self.bfs(a, direction='both'))
+
+    def components(self):
+        """Lista delle componenti debolmente connesse come insiemi di uid"""
+        if self._components is not None:
+            return self._components.components()
+        seen = set()
+        result = []
+        for uid in self.nodes:
+            if uid not in seen:
+                component = {other for other, _ in self.bfs(uid, direction='both')}
+                seen |= component
+                result.append(component)
+        return result
+
     def has_edge(self, v1: str, v2: str, tipo: str) -> bool:
         """Verifica se esiste un arco tra due nodi"""
         return (tipo in self.edges and 
                 v1 in self.edges[tipo] and 
                 v2 in self.edges[tipo][v1])
     
+    def freeze(self):
+        """Restituisce un'istantanea immutabile del grafo in formato CSR"""
+        return FrozenGraph.from_graph(self)
+
+    def subgraph(self, nodes=None, node_filter=None, edge_types=None):
+        """Vista filtrata del grafo, senza copie (vedi SubgraphView)"""
+        return SubgraphView(self, nodes, node_filter, edge_types)
+
+    def _adjacency_snapshot(self, tipi):
+        """FrozenGraph con le sole adiacenze dei tipi scelti, senza attributi"""
+        uids = list(self.nodes)
+        index = {uid: i for i, uid in enumerate(uids)}
+        if tipi is None:
+            tipi = tuple(self.edges)
+        elif isinstance(tipi, str):
+            tipi = (tipi,)
+        csr = {tipo: _build_csr(self.edges[tipo], index, len(uids))
+               for tipo in tipi if tipo in self.edges}
+        rev_csr = {tipo: _build_csr(self.rev_edges[tipo], index, len(uids))
+                   for tipo in tipi if tipo in self.rev_edges}
+        return FrozenGraph(dict(self.keys), self.progress, uids, {},
+                           csr, rev_csr, index=index)
+
+    def pagerank(self, tipi=None, alpha=0.85, personalization=None, tol=1e-6, max_iter=100):
+        """PageRank (anche personalizzato) sugli archi dei tipi scelti
+
+        Calcolato su una copia CSR delle sole adiacenze coinvolte; vedi
+        FrozenGraph.pagerank per i parametri.
+        """
+        return self._adjacency_snapshot(tipi).pagerank(
+            None, alpha, personalization, tol, max_iter)
+
+    def hits(self, tipi=None, tol=1e-8, max_iter=100):
+        """Punteggi HITS sugli archi dei tipi scelti: (hub, authority) per uid"""
+        return self._adjacency_snapshot(tipi).hits(None, tol, max_iter)
+
+    def degree_centrality(self, tipi=None, direction='out'):
+        """Centralità di grado (grado / (n - 1)) per uid; direction 'out', 'in' o 'both'
+
+        Senza tipi usa i contatori di grado mantenuti a ogni modifica.
+        """
+        sides = []
+        if direction in ('out', 'both'):
+            sides.append((self._out_degrees, self.edges))
+        if direction in ('in', 'both'):
+            sides.append((self._in_degrees, self.rev_edges))
+        if not sides:
+            raise ValueError(f"Unknown direction '{direction}'")
+        scale = 1.0 / (len(self.nodes) - 1) if len(self.nodes) > 1 else 1.0
+        centrality = dict.fromkeys(self.nodes, 0.0)
+        for degrees, adjacency in sides:
+            if tipi is None:
+                for uid, degree in degrees.items():
+                    centrality[uid] += degree * scale
+                continue
+            for tipo in ((tipi,) if isinstance(tipi, str) else tipi):
+                for uid, row in adjacency.get(tipo, {}).items():
+                    centrality[uid] += len(row) * scale
+        return centrality
+
+    def save_binary(self, filepath):
+        """Salva il grafo nel formato binario di FrozenGraph.load_binary"""
+        self.freeze().save_binary(filepath)
+
     def to_dict(self):
         """Serializza il grafo in un dizionario"""
         return {
@@ -174,14 +1042,16 @@ class BaseGraph:
         
         # Ricrea i nodi
         for uid, node_data in data['nodes'].items():
-            node = Node(node_data['uid'], **node_data['attributes'])
+            node = graph._new_node(node_data['uid'], node_data['attributes'])
             graph.nodes[uid] = node
         
         # Ricrea gli archi
-        for tipo, edges_dict in data['edges'].items():
-            for v1, v2_list in edges_dict.items():
-                for v2 in v2_list:
-                    graph.add_edge(v1, v2, tipo)
+        graph.add_edges(
+            (v1, v2, tipo)
+            for tipo, edges_dict in data['edges'].items()
+            for v1, v2_list in edges_dict.items()
+            for v2 in v2_list
+        )
         
         return graph
     
@@ -190,6 +1060,7 @@ class BaseGraph:
         import json
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+        self._mark_saved()
     
     @classmethod
     def load_json(cls, filepath):
@@ -199,219 +1070,3264 @@ class BaseGraph:
             data = json.load(f)
         return cls.from_dict(data)
     
-    def export_graphml(self, filepath):
-        """Esporta il grafo in formato GraphML per visualizzazione"""
-        import xml.etree.ElementTree as ET
-        from xml.dom import minidom
-        
-        # Crea root element
-        graphml = ET.Element('graphml')
-        graphml.set('xmlns', 'http://graphml.graphdrawing.org/xmlns')
-        graphml.set('xmlns:xsi', 'http://www.w3.org/2001/XMLSchema-instance')
-        graphml.set('xsi:schemaLocation', 
-                    'http://graphml.graphdrawing.org/xmlns '
-                    'http://graphml.graphdrawing.org/xmlns/1.0/graphml.xsd')
-        
-        # Definisci gli attributi dei nodi (keys)
-        key_id = 0
-        key_mapping = {}
-        for attr_name, attr_value in self.keys.items():
-            key_elem = ET.SubElement(graphml, 'key')
-            key_elem.set('id', f'k{key_id}')
-            key_elem.set('for', 'node')
-            key_elem.set('attr.name', attr_name)
-            
-            # Determina il tipo
-            if isinstance(attr_value, bool):
-                key_elem.set('attr.type', 'boolean')
-            elif isinstance(attr_value, int):
-                key_elem.set('attr.type', 'int')
-            elif isinstance(attr_value, float):
-                key_elem.set('attr.type', 'double')
+    def to_records(self):
+        """Genera i record del formato JSON Lines senza materializzare il grafo
+
+        Il primo record è l'intestazione (chiavi e progress), seguono un
+        record per nodo e uno per ogni riga di adiacenza (tipo, sorgente).
+        """
+        yield from _graph_records(
+            self.keys, self.progress,
+            (node.to_dict() for node in self.nodes.values()), self.edges)
+
+    @classmethod
+    def from_records(cls, records):
+        """Ricrea un grafo consumando i record uno alla volta"""
+        records = iter(records)
+        header = next(records, None)
+        if not header or header.get('record') != 'graph':
+            raise ValueError("Missing graph header record")
+        graph = cls(**header['keys'])
+        graph.progress = header['progress']
+
+        for record in records:
+            kind = record.get('record')
+            if kind == 'node':
+                uid = record['uid']
+                graph.nodes[uid] = graph._new_node(uid, record['attributes'])
+            elif kind == 'edges':
+                tipo = record['tipo']
+                v1 = record['source']
+                graph.add_edges((v1, v2, tipo) for v2 in record['targets'])
             else:
-                key_elem.set('attr.type', 'string')
-            
-            key_mapping[attr_name] = f'k{key_id}'
-            key_id += 1
-        
-        # Definisci l'attributo per il tipo di edge
-        edge_type_key = ET.SubElement(graphml, 'key')
-        edge_type_key.set('id', 'edge_type')
-        edge_type_key.set('for', 'edge')
-        edge_type_key.set('attr.name', 'type')
-        edge_type_key.set('attr.type', 'string')
-        
-        # Crea il grafo
-        graph_elem = ET.SubElement(graphml, 'graph')
-        graph_elem.set('id', 'G')
-        graph_elem.set('edgedefault', 'directed')
-        
-        # Aggiungi i nodi
-        for uid, node in self.nodes.items():
-            node_elem = ET.SubElement(graph_elem, 'node')
-            node_elem.set('id', uid)
-            
-            # Aggiungi gli attributi del nodo
-            for attr_name, key_id_str in key_mapping.items():
-                if hasattr(node, attr_name):
-                    data_elem = ET.SubElement(node_elem, 'data')
-                    data_elem.set('key', key_id_str)
-                    value = getattr(node, attr_name)
-                    data_elem.text = str(value).lower() if isinstance(value, bool) else str(value)
-        
-        # Aggiungi gli archi
-        edge_id = 0
-        for tipo, edges_dict in self.edges.items():
-            for v1, v2_set in edges_dict.items():
-                for v2 in v2_set:
-                    edge_elem = ET.SubElement(graph_elem, 'edge')
-                    edge_elem.set('id', f'e{edge_id}')
-                    edge_elem.set('source', v1)
-                    edge_elem.set('target', v2)
-                    
-                    # Aggiungi il tipo di edge come attributo
-                    data_elem = ET.SubElement(edge_elem, 'data')
-                    data_elem.set('key', 'edge_type')
-                    data_elem.text = tipo
-                    
-                    edge_id += 1
-        
-        # Formatta e salva con indentazione
-        xml_str = ET.tostring(graphml, encoding='unicode')
-        dom = minidom.parseString(xml_str)
-        pretty_xml = dom.toprettyxml(indent='  ')
-        
-        # Rimuovi linee vuote extra
-        lines = [line for line in pretty_xml.split('\n') if line.strip()]
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(lines))
-    
+                raise ValueError(f"Unknown record type '{kind}'")
+        return graph
+
+    def save_jsonl(self, filepath):
+        """Salva il grafo in formato JSON Lines, un record per riga"""
+        _write_jsonl(filepath, self.to_records())
+        self._mark_saved()
+
+    @classmethod
+    def load_jsonl(cls, filepath):
+        """Carica il grafo da un file JSON Lines in modo incrementale"""
+        import json
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return cls.from_records(
+                json.loads(line) for line in f if line.strip()
+            )
+
+    @classmethod
+    def open(cls, path, keys=None, fsync='batch', sync_every=1000):
+        """Apre un grafo persistente: ultima istantanea più journal delle modifiche
+
+        L'istantanea è un file JSON Lines in path, il journal è path + '.wal'.
+        Se l'istantanea non esiste viene creato un grafo vuoto con lo
+        schema keys. Da qui in poi ogni modifica viene aggiunta al journal
+        (vedi enable_journal per fsync e sync_every).
+        """
+        import json
+        import os
+        if not os.path.exists(path):
+            graph = cls(**(keys or {}))
+            graph.enable_journal(path, fsync=fsync, sync_every=sync_every)
+            return graph
+
+        with open(path, 'r', encoding='utf-8') as f:
+            header = json.loads(f.readline())
+            graph = cls.from_records(chain(
+                (header,), (json.loads(line) for line in f if line.strip())
+            ))
+        generation = header.get('journal', 0)
+        end = _replay_journal(graph, path + '.wal', generation)
+        if end is not None:
+            # Scarta un'eventuale ultima riga troncata prima di riaprire
+            os.truncate(path + '.wal', end)
+        journal = _Journal(graph, path, generation, fsync, sync_every,
+                           append=end is not None)
+        graph._journal = graph.add_observer(journal)
+        return graph
+
+    def enable_journal(self, path, fsync='batch', sync_every=1000):
+        """Scrive un'istantanea in path e registra ogni modifica successiva
+
+        fsync stabilisce quando il journal viene forzato su disco:
+        'always' dopo ogni modifica, 'batch' ogni sync_every modifiche
+        (e su sync/compact/close_journal), 'never' lascia fare al sistema.
+        """
+        if self._journal is not None:
+            raise ValueError("Journal already enabled")
+        journal = _Journal(self, path, 0, fsync, sync_every)
+        journal.compact()
+        self._journal = self.add_observer(journal)
+
+    def enable_dirty_tracking(self):
+        """Inizia a tenere traccia di nodi, righe di adiacenza e chiavi modificati
+
+        Lo stato attuale conta come salvato: save_delta scriverà solo
+        ciò che cambia da qui in poi. save_json e save_jsonl azzerano
+        le modifiche tracciate.
+        """
+        if self._dirty is None:
+            self._dirty = self.add_observer(_DirtyTracker())
+
+    def _mark_saved(self):
+        if self._dirty is not None:
+            self._dirty.clear()
+
+    def to_delta_records(self):
+        """Genera i record delle sole modifiche dall'ultimo salvataggio
+
+        Intestazione con chiavi nuove e progress, poi i nodi rimossi,
+        i nodi aggiunti o modificati e le righe di adiacenza cambiate
+        (ogni riga riporta l'insieme completo dei suoi target attuali).
+        """
+        dirty = self._dirty
+        if dirty is None:
+            raise ValueError("Dirty tracking not enabled")
+        header = {'record': 'delta', 'keys': dirty.keys, 'progress': self.progress}
+        if dirty.removed_keys:
+            header['removed_keys'] = sorted(dirty.removed_keys)
+        yield header
+        for uid in dirty.removed:
+            yield {'record': 'del_node', 'uid': uid}
+        for uid in dirty.nodes:
+            yield {'record': 'node', **self.nodes[uid].to_dict()}
+        for source, tipi in dirty.rows.items():
+            for tipo in tipi:
+                yield {
+                    'record': 'edges',
+                    'tipo': tipo,
+                    'source': source,
+                    'targets': list(self.edges.get(tipo, {}).get(source, ())),
+                }
+
+    def save_delta(self, filepath):
+        """Salva in JSON Lines solo le modifiche dall'ultimo salvataggio"""
+        _write_jsonl(filepath, self.to_delta_records())
+        self._mark_saved()
+
+    def apply_delta_records(self, records):
+        """Applica al grafo i record prodotti da to_delta_records"""
+        records = iter(records)
+        header = next(records, None)
+        if not header or header.get('record') != 'delta':
+            raise ValueError("Missing delta header record")
+        for key in header.get('removed_keys', ()):
+            if key in self.keys:
+                self._drop_property(key)
+        for key, value in header['keys'].items():
+            if key not in self.keys:
+                self.add_property(key, value)
+        self.progress = header['progress']
+
+        for record in records:
+            kind = record.get('record')
+            if kind == 'del_node':
+                if record['uid'] in self.nodes:
+                    self.del_node(record['uid'])
+            elif kind == 'node':
+                uid = record['uid']
+                if uid in self.nodes:
+                    # Il record porta tutti gli attributi: sostituiscono i vecchi
+                    self._restore_node(uid, record['attributes'])
+                else:
+                    self.add_node(uid=uid, **record['attributes'])
+            elif kind == 'edges':
+                tipo = record['tipo']
+                source = record['source']
+                current = self.edges.get(tipo, {}).get(source, set())
+                targets = set(record['targets'])
+                for v2 in current - targets:
+                    self.del_edge(source, v2, tipo)
+                self.add_edges((source, v2, tipo) for v2 in targets - current)
+            else:
+                raise ValueError(f"Unknown record type '{kind}'")
+
     @classmethod
-    def import_graphml(cls, filepath):
-        """Importa un grafo da formato GraphML"""
+    def load_with_deltas(cls, base, deltas):
+        """Carica un'istantanea completa e applica in ordine i file delta
+
+        base è un file di save_jsonl (estensione .jsonl) o di save_json.
+        """
+        import json
+        if base.endswith('.jsonl'):
+            graph = cls.load_jsonl(base)
+        else:
+            graph = cls.load_json(base)
+        for delta in deltas:
+            with open(delta, 'r', encoding='utf-8') as f:
+                graph.apply_delta_records(
+                    json.loads(line) for line in f if line.strip()
+                )
+        return graph
+
+    @classmethod
+    def merge_deltas(cls, base, deltas, filepath):
+        """Ricompone istantanea e catena di delta in una nuova istantanea completa"""
+        graph = cls.load_with_deltas(base, deltas)
+        if filepath.endswith('.jsonl'):
+            graph.save_jsonl(filepath)
+        else:
+            graph.save_json(filepath)
+        return graph
+
+    def _active_journal(self):
+        if self._journal is None:
+            raise ValueError("Journal not enabled")
+        return self._journal
+
+    def compact(self):
+        """Scrive una nuova istantanea e svuota il journal"""
+        self._active_journal().compact()
+
+    def sync(self):
+        """Forza su disco le modifiche ancora nel buffer del journal"""
+        self._active_journal().sync()
+
+    def close_journal(self):
+        """Chiude il journal; le modifiche successive non vengono più registrate"""
+        journal = self._active_journal()
+        journal.close()
+        self.remove_observer(journal)
+        self._journal = None
+
+    def export_graphml(self, filepath, indent='  '):
+        """Esporta il grafo in formato GraphML per visualizzazione
+
+        Il documento viene scritto in streaming, una riga per elemento,
+        senza costruire l'albero XML in memoria; con indent vuoto o None
+        il file viene scritto compatto, senza a capo.
+        """
+        _write_graphml(filepath, self._graphml_lines(), indent)
+
+    def _graphml_lines(self):
+        """Genera (profondità, markup) per ogni riga del documento GraphML"""
+        yield from _graphml_markup(
+            self.keys,
+            ((uid, node._attributes()) for uid, node in self.nodes.items()),
+            self.edges)
+
+    @classmethod
+    def import_graphml(cls, filepath, batch_size=10000):
+        """Importa un grafo da formato GraphML
+
+        Il file viene letto in streaming con iterparse: ogni <key>, <node>
+        ed <edge> viene elaborato appena chiuso e poi rimosso dall'albero;
+        nodi e archi sono inseriti a blocchi di batch_size tramite
+        add_nodes/add_edges, quindi la memoria resta limitata.
+        """
         import xml.etree.ElementTree as ET
-        
-        tree = ET.parse(filepath)
-        root = tree.getroot()
-        
-        # Namespace GraphML
-        ns = {'g': 'http://graphml.graphdrawing.org/xmlns'}
-        
-        # Parse le definizioni delle chiavi
+
         node_keys = {}
         edge_type_key = None
-        
-        for key_elem in root.findall('g:key', ns):
-            key_id = key_elem.get('id')
-            key_for = key_elem.get('for')
-            attr_name = key_elem.get('attr.name')
-            attr_type = key_elem.get('attr.type')
-            
-            if key_for == 'node':
-                node_keys[key_id] = {
-                    'name': attr_name,
-                    'type': attr_type
-                }
-            elif key_for == 'edge' and attr_name == 'type':
-                edge_type_key = key_id
-        
-        # Determina i keys per il grafo basandosi sui tipi
-        graph_keys = {}
-        for key_info in node_keys.values():
-            attr_name = key_info['name']
-            attr_type = key_info['type']
-            
-            if attr_type == 'boolean':
-                graph_keys[attr_name] = True
-            elif attr_type == 'int':
-                graph_keys[attr_name] = 0
-            elif attr_type == 'double':
-                graph_keys[attr_name] = 0.0
+        graph = None
+        pending_nodes = []
+        pending_edges = []
+        # archi che citano nodi non ancora letti (ammesso da GraphML)
+        deferred_edges = []
+
+        def flush_nodes():
+            graph.add_nodes(pending_nodes)
+            pending_nodes.clear()
+
+        def flush_edges():
+            flush_nodes()
+            nodes = graph.nodes
+            ready = []
+            for edge in pending_edges:
+                if edge[0] in nodes and edge[1] in nodes:
+                    ready.append(edge)
+                else:
+                    deferred_edges.append(edge)
+            graph.add_edges(ready)
+            pending_edges.clear()
+
+        stack = []
+        for event, elem in ET.iterparse(filepath, events=('start', 'end')):
+            tag = elem.tag.rpartition('}')[2]
+            if event == 'start':
+                stack.append(elem)
+                if tag == 'graph' and graph is None:
+                    graph = cls(**{
+                        info['name']: _graphml_default(info['type'])
+                        for info in node_keys.values()
+                    })
+                continue
+
+            stack.pop()
+            if tag == 'key':
+                key_for = elem.get('for')
+                if key_for == 'node':
+                    node_keys[elem.get('id')] = {
+                        'name': elem.get('attr.name'),
+                        'type': elem.get('attr.type'),
+                    }
+                elif key_for == 'edge' and elem.get('attr.name') == 'type':
+                    edge_type_key = elem.get('id')
+            elif tag == 'node' and graph is not None:
+                node_attrs = {'uid': elem.get('id')}
+                for data_elem in elem:
+                    key_info = node_keys.get(data_elem.get('key'))
+                    if key_info is not None:
+                        node_attrs[key_info['name']] = _graphml_value(
+                            data_elem.text, key_info['type'])
+                pending_nodes.append(node_attrs)
+                if len(pending_nodes) >= batch_size:
+                    flush_nodes()
+            elif tag == 'edge' and graph is not None:
+                edge_type = 'default'
+                if edge_type_key:
+                    for data_elem in elem:
+                        if data_elem.get('key') == edge_type_key:
+                            edge_type = data_elem.text or ''
+                            break
+                pending_edges.append(
+                    (elem.get('source'), elem.get('target'), edge_type))
+                if len(pending_edges) >= batch_size:
+                    flush_edges()
             else:
-                graph_keys[attr_name] = ""
-        
-        # Crea il grafo
-        graph = cls(**graph_keys)
-        
-        # Trova l'elemento graph
-        graph_elem = root.find('g:graph', ns)
-        
-        # Parse i nodi
-        for node_elem in graph_elem.findall('g:node', ns):
-            uid = node_elem.get('id')
-            node_attrs = {'uid': uid}
-            
-            for data_elem in node_elem.findall('g:data', ns):
-                key_id = data_elem.get('key')
-                if key_id in node_keys:
-                    key_info = node_keys[key_id]
-                    attr_name = key_info['name']
-                    attr_type = key_info['type']
-                    value_text = data_elem.text
-                    
-                    # Converti il valore al tipo appropriato
-                    if attr_type == 'boolean':
-                        value = value_text.lower() == 'true'
-                    elif attr_type == 'int':
-                        value = int(value_text)
-                    elif attr_type == 'double':
-                        value = float(value_text)
-                    else:
-                        value = value_text
-                    
-                    node_attrs[attr_name] = value
-            
-            graph.add_node(**node_attrs)
-        
-        # Parse gli archi
-        for edge_elem in graph_elem.findall('g:edge', ns):
-            source = edge_elem.get('source')
-            target = edge_elem.get('target')
-            edge_type = 'default'
-            
-            # Cerca il tipo di edge
-            if edge_type_key:
-                for data_elem in edge_elem.findall('g:data', ns):
-                    if data_elem.get('key') == edge_type_key:
-                        edge_type = data_elem.text
-                        break
-            
-            graph.add_edge(source, target, edge_type)
-        
-        return graph
+                continue
 
+            # Libera l'elemento già elaborato
+            elem.clear()
+            if stack:
+                stack[-1].remove(elem)
 
-class Node:
-    def __init__(self, uid: str, **kwargs):
-        self.uid = uid
-        for key, value in kwargs.items():
-            setattr(self, key, value)
+        if graph is None:
+            return cls(**{
+                info['name']: _graphml_default(info['type'])
+                for info in node_keys.values()
+            })
+        flush_edges()
+        graph.add_edges(deferred_edges)
+        return graph
 
-    def update(self, **kwargs):
-        """Aggiorna attributi del nodo"""
-        for key, value in kwargs.items():
-            setattr(self, key, value)
+    async def to_dict_async(self, chunk_size=10000):
+        """Come to_dict, cedendo il controllo al loop ogni chunk_size elementi
 
-    def __str__(self):
-        return self.uid
+        Se un'altra coroutine modifica il grafo durante la copia, la
+        copia viene rifatta in un colpo solo: il risultato è sempre
+        un'istantanea coerente.
+        """
+        if _READ_LOCKED.get():
+            # ConcurrentGraph tiene il lock in lettura per tutta la coroutine:
+            # nessuno può scrivere, e registrare un osservatore sarebbe una
+            # scrittura
+            return await self._copy_async(chunk_size)
+        counter = self.add_observer(_MutationCounter())
+        try:
+            data = await self._copy_async(chunk_size)
+        finally:
+            self.remove_observer(counter)
+        if counter.count:
+            data = self.to_dict()
+            # to_dict condivide lo schema vivo: la scrittura avviene altrove
+            data['keys'] = dict(data['keys'])
+        return data
 
-    def __repr__(self):
-        return self.uid
-    
-    def __eq__(self, other):
-        """Confronto basato su uid"""
-        if isinstance(other, Node):
-            return self.uid == other.uid
-        return False
-    
-    def __hash__(self):
-        """Hash basato su uid per permettere uso in set/dict"""
-        return hash(self.uid)
-    
-    def to_dict(self):
-        """Serializza il nodo in un dizionario"""
+    async def _copy_async(self, chunk_size):
+        """Copia di to_dict a blocchi, senza controllare modifiche concorrenti"""
+        import asyncio
+        nodes = {}
+        for count, (uid, node) in enumerate(list(self.nodes.items()), 1):
+            nodes[uid] = node.to_dict()
+            if not count % chunk_size:
+                await asyncio.sleep(0)
+        edges = {}
+        count = 0
+        for tipo, rows in list(self.edges.items()):
+            edges[tipo] = edges_dict = {}
+            for v1, v2_set in list(rows.items()):
+                edges_dict[v1] = list(v2_set)
+                count += 1
+                if not count % chunk_size:
+                    await asyncio.sleep(0)
         return {
-            'uid': self.uid,
-            'attributes': {k: v for k, v in self.__dict__.items() if k != 'uid'}
+            'keys': dict(self.keys),
+            'progress': self.progress,
+            'nodes': nodes,
+            'edges': edges,
         }
+
+    async def _save_in_executor(self, write, executor):
+        """Copia lo stato a blocchi nel loop e lo scrive in un executor
+
+        La copia (to_dict_async) è coerente; codifica e scrittura, la
+        parte lenta, avvengono fuori dal loop. Le modifiche tracciate
+        vengono staccate insieme alla copia: quelle fatte durante la
+        scrittura restano da salvare, e se la scrittura fallisce le
+        precedenti vengono rimesse.
+        """
+        import asyncio
+        data = await self.to_dict_async()
+        dirty = self._dirty
+        saved = dirty.detach() if dirty is not None else None
+        try:
+            await asyncio.get_running_loop().run_in_executor(executor, write, data)
+        except BaseException:
+            if saved is not None:
+                dirty.reattach(saved)
+            raise
+
+    async def save_json_async(self, filepath, executor=None):
+        """Come save_json, senza bloccare l'event loop (executor a thread)"""
+        def write(data):
+            import json
+            with open(filepath, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+        await self._save_in_executor(write, executor)
+
+    async def save_jsonl_async(self, filepath, executor=None):
+        """Come save_jsonl, senza bloccare l'event loop (executor a thread)"""
+        def write(data):
+            _write_jsonl(filepath, _graph_records(
+                data['keys'], data['progress'], data['nodes'].values(), data['edges']))
+        await self._save_in_executor(write, executor)
+
+    async def export_graphml_async(self, filepath, indent='  ', executor=None):
+        """Come export_graphml, senza bloccare l'event loop (executor a thread)"""
+        def write(data):
+            lines = _graphml_markup(
+                data['keys'],
+                ((uid, node['attributes']) for uid, node in data['nodes'].items()),
+                data['edges'])
+            _write_graphml(filepath, lines, indent)
+        await self._save_in_executor(write, executor)
+
+    @classmethod
+    async def load_json_async(cls, filepath, executor=None):
+        """Come load_json, senza bloccare l'event loop
+
+        Il grafo viene costruito nell'executor e restituito solo quando
+        è completo: nessuna coroutine può vederlo a metà.
+        """
+        import asyncio
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, cls.load_json, filepath)
+
+    @classmethod
+    async def load_jsonl_async(cls, filepath, executor=None):
+        """Come load_jsonl, senza bloccare l'event loop"""
+        import asyncio
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, cls.load_jsonl, filepath)
+
+    @classmethod
+    async def import_graphml_async(cls, filepath, batch_size=10000, executor=None):
+        """Come import_graphml, senza bloccare l'event loop"""
+        import asyncio
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            executor, partial(cls.import_graphml, filepath, batch_size))
+
+
+# Vero dentro le coroutine che ConcurrentGraph esegue sotto lock in lettura
+_READ_LOCKED = ContextVar('_READ_LOCKED', default=False)
+
+_XML_TEXT_ENTITIES = {'"': '&quot;'}
+_XML_ATTR_ENTITIES = {'"': '&quot;', '\n': '&#10;', '\r': '&#13;', '\t': '&#9;'}
+
+
+def _xml_text(text):
+    """Escape del contenuto testuale di un elemento XML"""
+    return escape(text, _XML_TEXT_ENTITIES)
+
+
+def _xml_attr(text):
+    """Valore di attributo XML tra virgolette, con escape"""
+    return '"' + escape(text, _XML_ATTR_ENTITIES) + '"'
+
+
+def _graphml_type(value):
+    """Tipo GraphML (attr.type) corrispondente al valore di default"""
+    if isinstance(value, bool):
+        return 'boolean'
+    if isinstance(value, int):
+        return 'int'
+    if isinstance(value, float):
+        return 'double'
+    return 'string'
+
+
+def _graph_records(keys, progress, node_dicts, edges):
+    """Record JSON Lines di un grafo: intestazione, nodi, righe di adiacenza
+
+    node_dicts sono i dizionari di Node.to_dict ed edges le adiacenze
+    tipo -> uid -> target: vanno bene sia il grafo vivo sia la copia
+    prodotta da to_dict.
+    """
+    yield {'record': 'graph', 'keys': keys, 'progress': progress}
+    for node_dict in node_dicts:
+        yield {'record': 'node', **node_dict}
+    for tipo, edges_dict in edges.items():
+        for v1, v2_set in edges_dict.items():
+            yield {
+                'record': 'edges',
+                'tipo': tipo,
+                'source': v1,
+                'targets': list(v2_set),
+            }
+
+
+def _write_jsonl(filepath, records):
+    """Scrive i record in JSON Lines, uno per riga, senza tenerli in memoria"""
+    import json
+    with open(filepath, 'w', encoding='utf-8') as f:
+        f.writelines(
+            json.dumps(record, ensure_ascii=False) + '\n'
+            for record in records
+        )
+
+
+def _graphml_markup(keys, node_attributes, edges):
+    """Genera (profondità, markup) per ogni riga del documento GraphML
+
+    node_attributes sono coppie (uid, attributi), edges le adiacenze
+    tipo -> uid -> target, del grafo vivo o di una copia da to_dict.
+    """
+    yield 0, ('<graphml xmlns="http://graphml.graphdrawing.org/xmlns" '
+              'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+              'xsi:schemaLocation="http://graphml.graphdrawing.org/xmlns '
+              'http://graphml.graphdrawing.org/xmlns/1.0/graphml.xsd">')
+
+    # Definisci gli attributi dei nodi (keys)
+    key_mapping = {}
+    for key_id, (attr_name, attr_value) in enumerate(keys.items()):
+        key_mapping[attr_name] = f'k{key_id}'
+        yield 1, (f'<key id="k{key_id}" for="node" '
+                  f'attr.name={_xml_attr(attr_name)} '
+                  f'attr.type="{_graphml_type(attr_value)}"/>')
+
+    # Definisci l'attributo per il tipo di edge
+    yield 1, '<key id="edge_type" for="edge" attr.name="type" attr.type="string"/>'
+    yield 1, '<graph id="G" edgedefault="directed">'
+
+    # Aggiungi i nodi
+    for uid, attributes in node_attributes:
+        data = []
+        for attr_name, key_id in key_mapping.items():
+            if attr_name in attributes:
+                value = attributes[attr_name]
+                text = str(value).lower() if isinstance(value, bool) else str(value)
+                data.append(f'<data key="{key_id}">{_xml_text(text)}</data>')
+        if data:
+            yield 2, f'<node id={_xml_attr(uid)}>'
+            for markup in data:
+                yield 3, markup
+            yield 2, '</node>'
+        else:
+            yield 2, f'<node id={_xml_attr(uid)}/>'
+
+    # Aggiungi gli archi
+    edge_id = 0
+    for tipo, edges_dict in edges.items():
+        tipo_text = _xml_text(str(tipo))
+        for v1, v2_set in edges_dict.items():
+            source = _xml_attr(v1)
+            for v2 in v2_set:
+                yield 2, f'<edge id="e{edge_id}" source={source} target={_xml_attr(v2)}>'
+                yield 3, f'<data key="edge_type">{tipo_text}</data>'
+                yield 2, '</edge>'
+                edge_id += 1
+
+    yield 1, '</graph>'
+    yield 0, '</graphml>'
+
+
+def _write_graphml(filepath, lines, indent):
+    """Scrive in streaming le righe (profondità, markup) di un documento GraphML"""
+    indent = indent or ''
+    newline = '\n' if indent else ''
+    with open(filepath, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" ?>')
+        f.writelines(
+            newline + indent * depth + markup
+            for depth, markup in lines
+        )
+
+
+class AdjacencyView(Set):
+    """Vista viva e in sola lettura di una riga di adiacenza
+
+    Riflette sempre lo stato corrente del grafo; iterarla mentre gli archi
+    vengono modificati solleva RuntimeError, come per le viste dei dict.
+    """
+
+    __slots__ = ('_graph', '_adjacency', '_uid', '_tipo')
+
+    def __init__(self, graph, adjacency, uid, tipo):
+        self._graph = graph
+        self._adjacency = adjacency
+        self._uid = uid
+        self._tipo = tipo
+
+    @classmethod
+    def _from_iterable(cls, iterable):
+        return set(iterable)
+
+    def _row(self):
+        return self._adjacency.get(self._tipo, {}).get(self._uid, ())
+
+    def __contains__(self, other):
+        return other in self._row()
+
+    def __len__(self):
+        return len(self._row())
+
+    def __iter__(self):
+        graph = self._graph
+        version = graph._version
+        yield from self._row()
+        if graph._version != version:
+            raise RuntimeError("Graph edges changed during iteration")
+
+    def __repr__(self):
+        return f"{type(self).__name__}({set(self._row())!r})"
+
+
+class _FilteredRow(Set):
+    """Riga di adiacenza ristretta al volo ai nodi di una SubgraphView"""
+
+    __slots__ = ('_row', '_includes')
+
+    def __init__(self, row, includes):
+        self._row = row
+        self._includes = includes
+
+    @classmethod
+    def _from_iterable(cls, iterable):
+        return set(iterable)
+
+    def __contains__(self, uid):
+        return uid in self._row and self._includes(uid)
+
+    def __iter__(self):
+        return filter(self._includes, self._row)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __bool__(self):
+        return any(map(self._includes, self._row))
+
+    def copy(self):
+        return set(self)
+
+
+class _FilteredRows(Mapping):
+    """Righe uid -> _FilteredRow di un tipo di arco, solo se non vuote"""
+
+    def __init__(self, rows, includes):
+        self._rows = rows
+        self._includes = includes
+
+    def __getitem__(self, uid):
+        row = self._rows.get(uid)
+        if row and self._includes(uid):
+            filtered = _FilteredRow(row, self._includes)
+            if filtered:
+                return filtered
+        raise KeyError(uid)
+
+    def __iter__(self):
+        includes = self._includes
+        for uid, row in self._rows.items():
+            if includes(uid) and any(map(includes, row)):
+                yield uid
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class _FilteredEdges(Mapping):
+    """Adiacenze tipo -> _FilteredRows dei soli tipi di arco della vista"""
+
+    def __init__(self, edges, edge_types, includes):
+        self._edges = edges
+        self._edge_types = edge_types
+        self._includes = includes
+
+    def __getitem__(self, tipo):
+        if self._edge_types is not None and tipo not in self._edge_types:
+            raise KeyError(tipo)
+        return _FilteredRows(self._edges[tipo], self._includes)
+
+    def __iter__(self):
+        edge_types = self._edge_types
+        return (tipo for tipo in self._edges if edge_types is None or tipo in edge_types)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class _FilteredTypes(Mapping):
+    """Indice di incidenza uid -> tipi con almeno un vicino nella vista"""
+
+    def __init__(self, types_index, adjacency):
+        self._types_index = types_index
+        self._adjacency = adjacency
+
+    def __getitem__(self, uid):
+        adjacency = self._adjacency
+        tipi = {tipo for tipo in self._types_index.get(uid, ())
+                if tipo in adjacency and uid in adjacency[tipo]}
+        if not tipi:
+            raise KeyError(uid)
+        return tipi
+
+    def __iter__(self):
+        return (uid for uid in self._types_index if uid in self)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class _FilteredNodes(Mapping):
+    """Nodi uid -> nodo inclusi in una SubgraphView"""
+
+    def __init__(self, nodes, selected, includes):
+        self._nodes = nodes
+        self._selected = selected
+        self._includes = includes
+
+    def __getitem__(self, uid):
+        if not self._includes(uid):
+            raise KeyError(uid)
+        return self._nodes[uid]
+
+    def __contains__(self, uid):
+        return self._includes(uid)
+
+    def __iter__(self):
+        return filter(self._includes, self._nodes if self._selected is None else self._selected)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class SubgraphView:
+    """Vista in sola lettura di un grafo ristretto a nodi e tipi di arco
+
+    nodes limita la vista a un insieme di uid, node_filter(node) la
+    restringe ancora, edge_types tiene solo i tipi indicati; un arco è
+    visibile se entrambi gli estremi lo sono. Nulla viene copiato: i
+    filtri sono applicati a ogni accesso e la vista segue le modifiche
+    del grafo. Offre l'API di lettura di BaseGraph (visite, cammini,
+    componenti, centralità, serializzazione); materialize() crea una
+    copia vera passando dall'inserimento in blocco.
+    """
+
+    def __init__(self, graph, nodes=None, node_filter=None, edge_types=None):
+        if isinstance(nodes, str):
+            nodes = (nodes,)
+        if isinstance(edge_types, str):
+            edge_types = (edge_types,)
+        self.graph = graph
+        self._selected = None if nodes is None else dict.fromkeys(nodes)
+        self._node_filter = node_filter
+        self.edge_types = None if edge_types is None else frozenset(edge_types)
+        self.nodes = _FilteredNodes(graph.nodes, self._selected, self._includes)
+        self.edges = _FilteredEdges(graph.edges, self.edge_types, self._includes)
+        self.rev_edges = _FilteredEdges(graph.rev_edges, self.edge_types, self._includes)
+        self.out_types = _FilteredTypes(graph.out_types, self.edges)
+        self.in_types = _FilteredTypes(graph.in_types, self.rev_edges)
+        # Gli indici opzionali del grafo non descrivono la vista
+        self._topological = {}
+        self._reachability = {}
+        self._components = None
+        self._dirty = None
+
+    def _includes(self, uid):
+        node = self.graph.nodes.get(uid)
+        return (node is not None
+                and (self._selected is None or uid in self._selected)
+                and (self._node_filter is None or self._node_filter(node)))
+
+    @property
+    def keys(self):
+        return self.graph.keys
+
+    @property
+    def progress(self):
+        return self.graph.progress
+
+    @property
+    def _version(self):
+        return self.graph._version
+
+    # API di lettura di BaseGraph: lavora sulle mappe filtrate qui sopra
+    get_neighbors = BaseGraph.get_neighbors
+    get_predecessors = BaseGraph.get_predecessors
+    neighbors_view = BaseGraph.neighbors_view
+    predecessors_view = BaseGraph.predecessors_view
+    iter_neighbors = BaseGraph.iter_neighbors
+    iter_predecessors = BaseGraph.iter_predecessors
+    _iter_rows = BaseGraph._iter_rows
+    has_edge = BaseGraph.has_edge
+    num_nodes = BaseGraph.num_nodes
+    _seeds = BaseGraph._seeds
+    _neighbor_rows = BaseGraph._neighbor_rows
+    bfs = BaseGraph.bfs
+    dfs = BaseGraph.dfs
+    k_hop = BaseGraph.k_hop
+    _cost_function = BaseGraph._cost_function
+    _weighted_neighbors = BaseGraph._weighted_neighbors
+    dijkstra = BaseGraph.dijkstra
+    shortest_path = BaseGraph.shortest_path
+    astar_path = BaseGraph.astar_path
+    topological_order = BaseGraph.topological_order
+    would_create_cycle = BaseGraph.would_create_cycle
+    is_reachable = BaseGraph.is_reachable
+    strongly_connected_components = BaseGraph.strongly_connected_components
+    condensation = BaseGraph.condensation
+    component_of = BaseGraph.component_of
+    same_component = BaseGraph.same_component
+    components = BaseGraph.components
+    freeze = BaseGraph.freeze
+    subgraph = BaseGraph.subgraph
+    _adjacency_snapshot = BaseGraph._adjacency_snapshot
+    pagerank = BaseGraph.pagerank
+    hits = BaseGraph.hits
+    to_dict = BaseGraph.to_dict
+    to_records = BaseGraph.to_records
+    _mark_saved = BaseGraph._mark_saved
+    save_json = BaseGraph.save_json
+    save_jsonl = BaseGraph.save_jsonl
+    export_graphml = BaseGraph.export_graphml
+    _graphml_lines = BaseGraph._graphml_lines
+
+    # I contatori del grafo non valgono per la vista: qui si conta al volo
+    def out_degree(self, uid: str, tipo: str = None) -> int:
+        """Numero di archi in uscita da un nodo, dentro la vista"""
+        return sum(1 for _ in self.iter_neighbors(uid, tipo))
+
+    def in_degree(self, uid: str, tipo: str = None) -> int:
+        """Numero di archi in entrata in un nodo, dentro la vista"""
+        return sum(1 for _ in self.iter_predecessors(uid, tipo))
+
+    def num_edges(self, tipo: str = None) -> int:
+        """Numero di archi visibili (di un tipo o di tutti)"""
+        tipi = (tipo,) if tipo else tuple(self.edges)
+        return sum(len(row) for edge_tipo in tipi
+                   for row in self.edges.get(edge_tipo, {}).values())
+
+    def degree_histogram(self, direction='out', tipo: str = None):
+        """Dizionario grado -> numero di nodi della vista con quel grado"""
+        if direction == 'out':
+            degree = self.out_degree
+        elif direction == 'in':
+            degree = self.in_degree
+        else:
+            raise ValueError(f"Unknown direction '{direction}'")
+        histogram = {}
+        for uid in self.nodes:
+            d = degree(uid, tipo)
+            histogram[d] = histogram.get(d, 0) + 1
+        return histogram
+
+    def degree_centrality(self, tipi=None, direction='out'):
+        """Centralità di grado (grado / (n - 1)) dei nodi della vista"""
+        if direction not in ('out', 'in', 'both'):
+            raise ValueError(f"Unknown direction '{direction}'")
+        if tipi is None or isinstance(tipi, str):
+            tipi = (tipi,)
+        num_nodes = len(self.nodes)
+        scale = 1.0 / (num_nodes - 1) if num_nodes > 1 else 1.0
+        centrality = {}
+        for uid in self.nodes:
+            degree = 0
+            for tipo in tipi:
+                if direction != 'in':
+                    degree += self.out_degree(uid, tipo)
+                if direction != 'out':
+                    degree += self.in_degree(uid, tipo)
+            centrality[uid] = degree * scale
+        return centrality
+
+    def materialize(self, graph_cls=None):
+        """Copia modificabile della vista, costruita con add_nodes/add_edges
+
+        Di default il grafo ha la stessa classe di quello di partenza.
+        """
+        if graph_cls is None:
+            graph_cls = type(self.graph) if isinstance(self.graph, BaseGraph) else BaseGraph
+        graph = graph_cls(**self.keys)
+        graph.progress = self.progress
+        # Filtri valutati una volta per nodo, poi solo lookup in un set
+        kept = set(graph.add_nodes(
+            dict(node.to_dict()['attributes'], uid=uid)
+            for uid, node in self.nodes.items()
+        ))
+        source = self.graph.edges
+        graph.add_edges(
+            (v1, v2, tipo)
+            for tipo in self.edges
+            for v1, targets in source[tipo].items() if v1 in kept
+            for v2 in targets if v2 in kept
+        )
+        return graph
+
+
+class GraphObserver:
+    """Base per indici e registri aggiornati dalle modifiche del grafo
+
+    Le sottoclassi ridefiniscono solo gli eventi che interessano. Tutti
+    vengono chiamati a modifica avvenuta, tranne check_edge che precede
+    l'inserimento e può sollevare un'eccezione per rifiutare l'arco.
+    del_node notifica solo node_removed: gli archi del nodo spariscono con lui.
+    property_removed e node_replaced nascono solo da annullamenti di un
+    batch e da delta: node_replaced porta tutti gli attributi del nodo,
+    che sostituiscono (non integrano) quelli precedenti. progress_restored
+    segnala il contatore degli uid riportato indietro da un annullamento.
+    Un osservatore con bulk_edges = True non rifiuta archi e lascia ad
+    add_edges il percorso in blocco: riceve gli archi davvero inseriti
+    con un'unica chiamata a edges_added.
+    """
+
+    bulk_edges = False
+
+    def property_added(self, key, value):
+        pass
+
+    def property_removed(self, key):
+        pass
+
+    def progress_restored(self, progress):
+        pass
+
+    def node_added(self, uid):
+        pass
+
+    def node_modified(self, uid, attributes):
+        pass
+
+    def node_replaced(self, uid, attributes):
+        self.node_modified(uid, attributes)
+
+    def node_removed(self, uid):
+        pass
+
+    def check_edge(self, v1, v2, tipo):
+        pass
+
+    def edge_added(self, v1, v2, tipo):
+        pass
+
+    def edges_added(self, edges):
+        for v1, v2, tipo in edges:
+            self.edge_added(v1, v2, tipo)
+
+    def edge_removed(self, v1, v2, tipo):
+        pass
+
+
+def _topological_sort(nodes, edges_dict, rev_dict):
+    """Ordine topologico di tutti i nodi (Kahn); ValueError se c'è un ciclo"""
+    pending = {uid: len(sources) for uid, sources in rev_dict.items()}
+    order = [uid for uid in nodes if uid not in pending]
+    for uid in order:
+        for target in edges_dict.get(uid, ()):
+            pending[target] -= 1
+            if not pending[target]:
+                order.append(target)
+    if len(order) != len(nodes):
+        raise ValueError("Edges contain a cycle")
+    return order
+
+
+class _TopologicalOrder(GraphObserver):
+    """Ordine topologico incrementale di un tipo di arco (Pearce-Kelly)
+
+    Ogni nodo ha una posizione in slots; un nuovo arco v1 -> v2 già
+    coerente con l'ordine costa O(1), altrimenti vengono visitati e
+    riordinati solo i nodi con posizione compresa tra v2 e v1.
+    """
+
+    def __init__(self, graph, tipo):
+        self.graph = graph
+        self.tipo = tipo
+        self.slots = _topological_sort(graph.nodes, graph.edges.get(tipo, {}),
+                                       graph.rev_edges.get(tipo, {}))
+        self.position = {uid: i for i, uid in enumerate(self.slots)}
+        self.holes = 0
+
+    def order(self):
+        return [uid for uid in self.slots if uid is not None]
+
+    def node_added(self, uid):
+        self.position[uid] = len(self.slots)
+        self.slots.append(uid)
+
+    def node_removed(self, uid):
+        self.slots[self.position.pop(uid)] = None
+        self.holes += 1
+        # Compatta le posizioni quando i buchi superano metà degli slot
+        if self.holes * 2 > len(self.slots):
+            self.slots = self.order()
+            self.position = {uid: i for i, uid in enumerate(self.slots)}
+            self.holes = 0
+
+    def _reach(self, start, adjacency, lower, upper, target=None):
+        """Nodi raggiungibili da start con posizione in [lower, upper]
+
+        Restituisce None se la visita incontra target.
+        """
+        position = self.position
+        seen = {start}
+        stack = [start]
+        while stack:
+            for uid in adjacency.get(stack.pop(), ()):
+                if uid == target:
+                    return None
+                if uid not in seen and lower <= position[uid] <= upper:
+                    seen.add(uid)
+                    stack.append(uid)
+        return seen
+
+    def would_create_cycle(self, v1, v2):
+        if v1 == v2:
+            return True
+        lower, upper = self.position[v2], self.position[v1]
+        if upper < lower:
+            return False
+        edges_dict = self.graph.edges.get(self.tipo, {})
+        return self._reach(v2, edges_dict, lower, upper, target=v1) is None
+
+    def check_edge(self, v1, v2, tipo):
+        if tipo != self.tipo:
+            return
+        if v1 == v2:
+            raise ValueError(f"Edge '{v1}' -> '{v2}' of type '{tipo}' would create a cycle")
+        position = self.position
+        lower, upper = position[v2], position[v1]
+        if upper < lower:
+            return
+        graph = self.graph
+        forward = self._reach(v2, graph.edges.get(tipo, {}), lower, upper, target=v1)
+        if forward is None:
+            raise ValueError(f"Edge '{v1}' -> '{v2}' of type '{tipo}' would create a cycle")
+        backward = self._reach(v1, graph.rev_edges.get(tipo, {}), lower, upper)
+        # Gli antenati di v1 passano prima dei discendenti di v2,
+        # riusando le stesse posizioni e l'ordine relativo di ciascun gruppo
+        moved = sorted(backward, key=position.__getitem__)
+        moved += sorted(forward, key=position.__getitem__)
+        slots = sorted(position[uid] for uid in moved)
+        for slot, uid in zip(slots, moved):
+            position[uid] = slot
+            self.slots[slot] = uid
+
+
+def _strongly_connected(nodes, successors):
+    """Componenti fortemente connesse (Tarjan iterativo)
+
+    Le componenti escono in ordine topologico inverso: ogni componente
+    viene emessa dopo tutte quelle che raggiunge.
+    """
+    index = {}
+    low = {}
+    stack = []
+    on_stack = set()
+    components = []
+    for root in nodes:
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(successors(root)))]
+        while work:
+            uid, pending = work[-1]
+            for nxt in pending:
+                if nxt not in index:
+                    index[nxt] = low[nxt] = len(index)
+                    stack.append(nxt)
+                    on_stack.add(nxt)
+                    work.append((nxt, iter(successors(nxt))))
+                    break
+                if nxt in on_stack and index[nxt] < low[uid]:
+                    low[uid] = index[nxt]
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if low[uid] < low[parent]:
+                        low[parent] = low[uid]
+                if low[uid] == index[uid]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == uid:
+                            break
+                    components.append(component)
+    return components
+
+
+class _ReachabilityIndex(GraphObserver):
+    """Chiusura transitiva di un tipo di arco sulla condensazione in SCC
+
+    Ogni componente ha un intero usato come bitset delle componenti che
+    raggiunge. Un arco aggiunto aggiorna i bitset sul posto; rimozioni
+    e archi che fondono componenti invalidano l'indice, ricostruito
+    alla prima query successiva. Mappa delle componenti e bitset sono
+    pubblicati insieme in closure, così una query concorrente a una
+    ricostruzione (vedi ConcurrentGraph) non vede mai metà indice.
+    """
+
+    def __init__(self, graph, tipo):
+        self.graph = graph
+        self.tipo = tipo
+        self.stats = {'hits': 0, 'rebuilds': 0, 'rebuild_seconds': 0.0,
+                      'incremental_updates': 0, 'invalidations': 0}
+        self.rebuild()
+
+    def rebuild(self):
+        start = perf_counter()
+        edges_dict = self.graph.edges.get(self.tipo, {})
+        nodes = chain(edges_dict, self.graph.rev_edges.get(self.tipo, {}))
+        components = _strongly_connected(nodes, lambda uid: edges_dict.get(uid, ()))
+        component_of = {}
+        for cid, members in enumerate(components):
+            for uid in members:
+                component_of[uid] = cid
+        # Ordine topologico inverso: i successori sono già calcolati
+        reach = []
+        for cid, members in enumerate(components):
+            bits = 1 << cid
+            for uid in members:
+                for target in edges_dict.get(uid, ()):
+                    target_cid = component_of[target]
+                    if target_cid != cid:
+                        bits |= reach[target_cid]
+            reach.append(bits)
+        self.closure = (component_of, reach)
+        self.stale = False
+        self.stats['rebuilds'] += 1
+        self.stats['rebuild_seconds'] += perf_counter() - start
+
+    def invalidate(self):
+        if not self.stale:
+            self.stale = True
+            self.stats['invalidations'] += 1
+
+    def is_reachable(self, a, b):
+        if self.stale:
+            self.rebuild()
+        self.stats['hits'] += 1
+        if a == b:
+            return True
+        component_of, reach = self.closure
+        ca = component_of.get(a)
+        cb = component_of.get(b)
+        if ca is None or cb is None:
+            return False
+        return bool(reach[ca] >> cb & 1)
+
+    def _component_of(self, uid):
+        component_of, reach = self.closure
+        cid = component_of.get(uid)
+        if cid is None:
+            cid = component_of[uid] = len(reach)
+            reach.append(1 << cid)
+        return cid
+
+    def edge_added(self, v1, v2, tipo):
+        if tipo != self.tipo or self.stale:
+            return
+        reach = self.closure[1]
+        c1 = self._component_of(v1)
+        c2 = self._component_of(v2)
+        if reach[c1] >> c2 & 1:
+            return
+        if reach[c2] >> c1 & 1:
+            # L'arco chiude un ciclo: le componenti vanno fuse
+            self.invalidate()
+            return
+        # Chi raggiunge v1 ora raggiunge anche tutto ciò che raggiunge v2
+        bit = 1 << c1
+        extra = reach[c2]
+        for cid, bits in enumerate(reach):
+            if bits & bit:
+                reach[cid] = bits | extra
+        self.stats['incremental_updates'] += 1
+
+    def edge_removed(self, v1, v2, tipo):
+        if tipo == self.tipo:
+            self.invalidate()
+
+    def node_removed(self, uid):
+        if uid in self.closure[0]:
+            self.invalidate()
+
+
+class _ComponentIndex(GraphObserver):
+    """Componenti debolmente connesse con union-find incrementale
+
+    Union by rank e path compression; i nodi isolati non occupano
+    memoria (sono radici implicite). Ogni radice tiene l'insieme dei
+    membri, fuso dal più piccolo al più grande. Le rimozioni, che
+    l'union-find non sa annullare, segnano sporca solo la componente
+    coinvolta: viene ricalcolata con una visita alla prima query che la
+    tocca. Le query passano da un lock, così restano sicure anche sotto
+    il lock di lettura di ConcurrentGraph.
+    """
+
+    bulk_edges = True
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.parent = {}
+        self.rank = {}
+        self.members = {}
+        self.dirty = set()
+        self.lock = Lock()
+        self.stats = {'unions': 0, 'recomputes': 0, 'recomputed_nodes': 0}
+        self.edges_added(
+            (v1, v2, tipo) for tipo, rows in graph.edges.items()
+            for v1, targets in rows.items() for v2 in targets)
+
+    def find(self, uid):
+        parent = self.parent
+        root = uid
+        while root in parent:
+            root = parent[root]
+        while uid != root:
+            parent[uid], uid = root, parent[uid]
+        return root
+
+    def union(self, a, b):
+        a = self.find(a)
+        b = self.find(b)
+        if a == b:
+            return a
+        rank = self.rank
+        if rank.get(a, 0) < rank.get(b, 0):
+            a, b = b, a
+        self.parent[b] = a
+        if rank.get(a, 0) == rank.get(b, 0):
+            rank[a] = rank.get(a, 0) + 1
+        rank.pop(b, None)
+        members = self.members
+        big = members.pop(a, None) or {a}
+        small = members.pop(b, None) or {b}
+        if len(big) < len(small):
+            big, small = small, big
+        big |= small
+        members[a] = big
+        if b in self.dirty:
+            self.dirty.discard(b)
+            self.dirty.add(a)
+        self.stats['unions'] += 1
+        return a
+
+    def _root(self, uid):
+        """Radice di uid dopo aver ricalcolato la sua componente se sporca"""
+        root = self.find(uid)
+        if root in self.dirty:
+            self._recompute(root)
+            root = self.find(uid)
+        return root
+
+    def _recompute(self, root):
+        """Rifà le componenti dei membri di una componente sporca con visite"""
+        self.dirty.discard(root)
+        old = self.members.pop(root, None) or {root}
+        parent = self.parent
+        for uid in old:
+            parent.pop(uid, None)
+        self.rank.pop(root, None)
+        graph = self.graph
+        # I nodi rimossi restano nella struttura solo fino a qui
+        survivors = [uid for uid in old if uid in graph.nodes]
+        rows = graph._neighbor_rows(None, 'both')
+        seen = set()
+        for start in survivors:
+            if start in seen:
+                continue
+            seen.add(start)
+            component = [start]
+            for uid in component:
+                for row in rows(uid):
+                    for other in row:
+                        if other not in seen:
+                            seen.add(other)
+                            component.append(other)
+            if len(component) > 1:
+                for uid in component[1:]:
+                    parent[uid] = start
+                self.rank[start] = 1
+                self.members[start] = set(component)
+        self.stats['recomputes'] += 1
+        self.stats['recomputed_nodes'] += len(old)
+
+    def component_of(self, uid):
+        with self.lock:
+            root = self._root(uid)
+            return set(self.members.get(root) or (root,))
+
+    def same_component(self, a, b):
+        with self.lock:
+            return self._root(a) == self._root(b)
+
+    def components(self):
+        with self.lock:
+            for root in list(self.dirty):
+                if root in self.dirty:
+                    self._recompute(root)
+            result = [set(members) for members in self.members.values()]
+            result.extend({uid} for uid in self.graph.nodes
+                          if uid not in self.parent and uid not in self.members)
+            return result
+
+    def node_added(self, uid):
+        # Un uid riusato prima del ricalcolo non deve ereditare la vecchia componente
+        if uid in self.parent or uid in self.members:
+            self._root(uid)
+
+    def node_removed(self, uid):
+        root = self.find(uid)
+        members = self.members.get(root)
+        if members is not None:
+            self.dirty.add(root)
+
+    def edge_added(self, v1, v2, tipo):
+        self.union(v1, v2)
+
+    def edges_added(self, edges):
+        union = self.union
+        for v1, v2, _ in edges:
+            union(v1, v2)
+
+    def edge_removed(self, v1, v2, tipo):
+        if v1 == v2:
+            return
+        graph = self.graph
+        # Un altro arco fra gli stessi nodi li tiene comunque uniti
+        for a, b in ((v1, v2), (v2, v1)):
+            for edge_tipo in graph.out_types.get(a, ()):
+                if b in graph.edges[edge_tipo][a]:
+                    return
+        self.dirty.add(self.find(v1))
+
+
+class _Journal(GraphObserver):
+    """Journal append-only (write-ahead log) delle modifiche di un grafo
+
+    Ogni modifica è una riga JSON compatta, scritta su un file
+    bufferizzato: il costo dipende dalla modifica, non dal grafo. La
+    prima riga indica la generazione dell'istantanea a cui il journal
+    si applica, così un journal già compattato non viene riapplicato.
+    """
+
+    FSYNC_POLICIES = ('always', 'batch', 'never')
+
+    def __init__(self, graph, path, generation, fsync='batch', sync_every=1000, append=False):
+        import json
+        if fsync not in self.FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy '{fsync}'")
+        self.graph = graph
+        self.path = path
+        self.log_path = path + '.wal'
+        self.generation = generation
+        self.fsync = fsync
+        self.sync_every = sync_every
+        self.pending = 0
+        self._encode = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False).encode
+        self.file = None
+        if append:
+            self.file = open(self.log_path, 'a', encoding='utf-8')
+        else:
+            self._start_log()
+
+    def _start_log(self):
+        if self.file is not None:
+            self.file.close()
+        self.file = open(self.log_path, 'w', encoding='utf-8')
+        self.file.write(self._encode(['g', self.generation]) + '\n')
+        self.sync()
+
+    def write(self, record):
+        self.file.write(self._encode(record) + '\n')
+        self.pending += 1
+        if self.fsync == 'always' or (self.fsync == 'batch'
+                                      and self.pending >= self.sync_every):
+            self.sync()
+
+    def sync(self):
+        import os
+        self.file.flush()
+        if self.fsync != 'never':
+            os.fsync(self.file.fileno())
+        self.pending = 0
+
+    def compact(self):
+        import json
+        import os
+        self.generation += 1
+        tmp_path = self.path + '.tmp'
+        records = self.graph.to_records()
+        header = dict(next(records), journal=self.generation)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.writelines(
+                json.dumps(record, ensure_ascii=False) + '\n'
+                for record in chain((header,), records)
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        # L'istantanea nuova sostituisce la vecchia in modo atomico; se il
+        # processo si ferma prima di svuotare il journal, la generazione
+        # vecchia nella sua intestazione lo fa ignorare alla riapertura
+        os.replace(tmp_path, self.path)
+        self._start_log()
+
+    def close(self):
+        self.sync()
+        self.file.close()
+
+    def property_added(self, key, value):
+        self.write(['p', key, value])
+
+    def property_removed(self, key):
+        self.write(['q', key])
+
+    def progress_restored(self, progress):
+        self.write(['u', progress])
+
+    def node_added(self, uid):
+        graph = self.graph
+        attributes = graph.nodes[uid].to_dict()['attributes']
+        self.write(['n', uid, attributes, graph.progress])
+
+    def node_modified(self, uid, attributes):
+        self.write(['m', uid, attributes])
+
+    def node_replaced(self, uid, attributes):
+        self.write(['r', uid, attributes])
+
+    def node_removed(self, uid):
+        self.write(['d', uid])
+
+    def edge_added(self, v1, v2, tipo):
+        self.write(['e', v1, v2, tipo])
+
+    def edge_removed(self, v1, v2, tipo):
+        self.write(['x', v1, v2, tipo])
+
+
+class _Batch:
+    """Stato di graph.batch(): archi in sospeso e operazioni di annullamento"""
+
+    __slots__ = ('pending', 'undo', 'progress')
+
+    def __init__(self, progress):
+        # (tipo, v1, v2) -> True da aggiungere, False da rimuovere
+        self.pending = {}
+        self.undo = []
+        self.progress = progress
+
+
+class _MutationCounter(GraphObserver):
+    """Conta le modifiche al grafo (per accorgersi di cambi durante una copia)"""
+
+    def __init__(self):
+        self.count = 0
+
+    def _changed(self, *args):
+        self.count += 1
+
+    property_added = property_removed = progress_restored = _changed
+    node_added = node_modified = node_replaced = node_removed = _changed
+    edge_added = edge_removed = _changed
+
+
+class _DirtyTracker(GraphObserver):
+    """Modifiche dall'ultimo salvataggio: chiavi, nodi e righe di adiacenza"""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.keys = {}
+        # chiavi tolte dallo schema: nel delta vengono tolte prima di
+        # aggiungere quelle in keys, così una chiave tolta e rimessa
+        # riprende il nuovo valore
+        self.removed_keys = set()
+        self.nodes = set()
+        self.removed = set()
+        # uid sorgente -> tipi delle righe cambiate
+        self.rows = {}
+
+    def detach(self):
+        """Restituisce le modifiche tracciate finora e riparte da zero"""
+        state = (self.keys, self.removed_keys, self.nodes, self.removed, self.rows)
+        self.clear()
+        return state
+
+    def reattach(self, state):
+        """Rimette modifiche staccate con detach sotto quelle più recenti"""
+        keys, removed_keys, nodes, removed, rows = state
+        # Una chiave tolta dopo il distacco resta tolta
+        self.keys = dict({key: value for key, value in keys.items()
+                          if key not in self.removed_keys}, **self.keys)
+        self.removed_keys = removed_keys | self.removed_keys
+        # Ciò che è stato rimosso dopo il distacco non è più da scrivere
+        self.nodes = (nodes - self.removed) | self.nodes
+        self.removed = removed | self.removed
+        for source, tipi in rows.items():
+            if source not in self.removed or source in self.nodes:
+                self.rows.setdefault(source, set()).update(tipi)
+
+    def property_added(self, key, value):
+        self.keys[key] = value
+
+    def property_removed(self, key):
+        self.keys.pop(key, None)
+        self.removed_keys.add(key)
+
+    def node_added(self, uid):
+        self.nodes.add(uid)
+
+    def node_modified(self, uid, attributes):
+        self.nodes.add(uid)
+
+    def node_removed(self, uid):
+        # Le righe del nodo spariscono con lui (anche applicando del_node)
+        self.nodes.discard(uid)
+        self.rows.pop(uid, None)
+        self.removed.add(uid)
+
+    def edge_added(self, v1, v2, tipo):
+        self.rows.setdefault(v1, set()).add(tipo)
+
+    def edge_removed(self, v1, v2, tipo):
+        self.rows.setdefault(v1, set()).add(tipo)
+
+
+def _replay_journal(graph, log_path, generation):
+    """Riapplica al grafo il journal della generazione indicata
+
+    Restituisce la posizione in byte della fine dell'ultimo record
+    valido, o None se il journal manca o appartiene a un'altra
+    generazione. Un'ultima riga troncata (scrittura interrotta) viene
+    ignorata; una riga illeggibile in mezzo al file solleva ValueError.
+    """
+    import json
+    try:
+        f = open(log_path, 'rb')
+    except FileNotFoundError:
+        return None
+    with f:
+        line = f.readline()
+        try:
+            header = json.loads(line)
+        except ValueError:
+            return None
+        if header != ['g', generation]:
+            return None
+        end = len(line)
+        for number, line in enumerate(f, 2):
+            if not line.endswith(b'\n'):
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                raise ValueError(f"Corrupted journal record at line {number}") from None
+            end += len(line)
+            kind = record[0]
+            if kind == 'n':
+                graph.add_node(uid=record[1], **record[2])
+                graph.progress = record[3]
+            elif kind == 'm':
+                graph.modify_node(record[1], **record[2])
+            elif kind == 'r':
+                graph._restore_node(record[1], record[2])
+            elif kind == 'd':
+                graph.del_node(record[1])
+            elif kind == 'e':
+                graph.add_edge(record[1], record[2], record[3])
+            elif kind == 'x':
+                graph.del_edge(record[1], record[2], record[3])
+            elif kind == 'p':
+                graph.add_property(record[1], record[2])
+            elif kind == 'q':
+                graph._drop_property(record[1])
+            elif kind == 'u':
+                graph._restore_progress(record[1])
+            else:
+                raise ValueError(f"Unknown journal record '{kind}'")
+    return end
+
+
+def _path(parent, node):
+    """Ricostruisce il cammino risalendo i predecessori fino alla sorgente"""
+    path = []
+    while node is not None:
+        path.append(node)
+        node = parent[node]
+    path.reverse()
+    return path
+
+
+def _dijkstra(sources, edges_of, target=None, max_cost=None):
+    """Dijkstra generico su edges_of(nodo) -> (vicino, costo)"""
+    dist = {}
+    best = {source: 0 for source in sources}
+    parent = {source: None for source in sources}
+    heap = [(0, source) for source in sources]
+    heapify(heap)
+    while heap:
+        d, u = heappop(heap)
+        if u in dist:
+            continue
+        if max_cost is not None and d > max_cost:
+            break
+        dist[u] = d
+        if u == target:
+            break
+        for v, c in edges_of(u):
+            nd = d + c
+            if v not in dist and nd < best.get(v, inf):
+                best[v] = nd
+                parent[v] = u
+                heappush(heap, (nd, v))
+    return dist, {u: parent[u] for u in dist}
+
+
+def _bidirectional_dijkstra(source, target, forward, backward):
+    """Dijkstra bidirezionale: (costo, cammino) o (inf, [])"""
+    if source == target:
+        return 0, [source]
+    edges_of = (forward, backward)
+    done = ({}, {})
+    seen = ({source: 0}, {target: 0})
+    parents = ({source: None}, {target: None})
+    heaps = ([(0, source)], [(0, target)])
+    best, meet = inf, None
+    while heaps[0] and heaps[1]:
+        if heaps[0][0][0] + heaps[1][0][0] >= best:
+            break
+        side = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+        d, u = heappop(heaps[side])
+        if u in done[side]:
+            continue
+        done[side][u] = d
+        mine, other = seen[side], seen[1 - side]
+        for v, c in edges_of[side](u):
+            nd = d + c
+            if v not in done[side] and nd < mine.get(v, inf):
+                mine[v] = nd
+                parents[side][v] = u
+                heappush(heaps[side], (nd, v))
+            if v in other and mine.get(v, inf) + other[v] < best:
+                best, meet = mine[v] + other[v], v
+    if meet is None:
+        return inf, []
+    path = _path(parents[0], meet)
+    node = parents[1][meet]
+    while node is not None:
+        path.append(node)
+        node = parents[1][node]
+    return best, path
+
+
+def _astar(source, target, edges_of, heuristic):
+    """A* con euristica fornita dall'utente: (costo, cammino) o (inf, [])"""
+    best = {source: 0}
+    parent = {source: None}
+    closed = set()
+    heap = [(heuristic(source), 0, source)]
+    while heap:
+        _, d, u = heappop(heap)
+        if u in closed:
+            continue
+        if u == target:
+            return d, _path(parent, target)
+        closed.add(u)
+        for v, c in edges_of(u):
+            nd = d + c
+            if nd < best.get(v, inf):
+                best[v] = nd
+                parent[v] = u
+                closed.discard(v)
+                heappush(heap, (nd + heuristic(v), nd, v))
+    return inf, []
+
+
+def _graphml_default(attr_type):
+    """Valore di default dello schema per un attr.type GraphML"""
+    if attr_type == 'boolean':
+        return True
+    if attr_type == 'int':
+        return 0
+    if attr_type == 'double':
+        return 0.0
+    return ""
+
+
+def _graphml_value(text, attr_type):
+    """Converte il testo di un <data> nel tipo indicato da attr.type"""
+    text = text or ''
+    if attr_type == 'boolean':
+        return text.lower() == 'true'
+    if attr_type == 'int':
+        return int(text)
+    if attr_type == 'double':
+        return float(text)
+    return text
+
+
+def _index_typecode(size):
+    """Typecode di array più compatto per indici fino a size"""
+    return 'i' if size < 2 ** 31 else 'q'
+
+
+def _build_csr(rows, index, num_nodes):
+    """Converte un dizionario uid -> set(uid) in array CSR (offsets, targets)"""
+    to_id = index.__getitem__
+    num_edges = sum(map(len, rows.values()))
+    ordered = sorted(rows, key=to_id)
+
+    counts = array(_index_typecode(num_edges), [0]) * (num_nodes + 1)
+    for uid in ordered:
+        counts[to_id(uid) + 1] = len(rows[uid])
+    offsets = array(counts.typecode, accumulate(counts))
+
+    targets = array(_index_typecode(num_nodes))
+    for uid in ordered:
+        targets.extend(sorted(map(to_id, rows[uid])))
+    return memoryview(offsets), memoryview(targets)
+
+
+@lru_cache(maxsize=None)
+def _import_numpy():
+    """Modulo numpy se installato (extra opzionale 'fast'), altrimenti None"""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _row_lengths(num_nodes, rows):
+    """Lunghezza delle righe per id, sommata su più array CSR"""
+    lengths = [0] * num_nodes
+    for offsets, _ in rows:
+        for node_id in range(num_nodes):
+            lengths[node_id] += offsets[node_id + 1] - offsets[node_id]
+    return lengths
+
+
+def _row_sums(num_nodes, rows, values):
+    """Per ogni id la somma di values sugli id della sua riga CSR"""
+    sums = [0.0] * num_nodes
+    get = values.__getitem__
+    for offsets, targets in rows:
+        for node_id in range(num_nodes):
+            lo, hi = offsets[node_id], offsets[node_id + 1]
+            if lo != hi:
+                sums[node_id] += sum(map(get, targets[lo:hi]))
+    return sums
+
+
+def _edge_arrays(np, num_nodes, rows):
+    """Array numpy (sorgenti, destinazioni) di tutti gli archi delle righe CSR"""
+    sources = []
+    targets = []
+    for offsets, row_targets in rows:
+        row_targets = np.asarray(row_targets)
+        ids = np.arange(num_nodes, dtype=row_targets.dtype)
+        sources.append(np.repeat(ids, np.diff(np.asarray(offsets))))
+        targets.append(row_targets)
+    if not sources:
+        return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32)
+    return np.concatenate(sources), np.concatenate(targets)
+
+
+def _pagerank_ids(num_nodes, rows, rev_rows, alpha, teleport, tol, max_iter):
+    """Iterazione delle potenze di PageRank su interi densi
+
+    teleport è la distribuzione di salto (uniforme o personalizzata),
+    usata anche per la massa dei nodi senza archi in uscita. Con numpy
+    ogni iterazione è un prodotto matrice sparsa-vettore (bincount sugli
+    archi); senza, somme per riga sulle adiacenze all'indietro.
+    """
+    np = _import_numpy()
+    if np is not None:
+        sources, targets = _edge_arrays(np, num_nodes, rows)
+        out_degree = np.bincount(sources, minlength=num_nodes).astype(float)
+        inverse = np.divide(1.0, out_degree, out=np.zeros(num_nodes), where=out_degree > 0)
+        dangling = out_degree == 0
+        teleport = np.asarray(teleport, dtype=float)
+        rank = np.full(num_nodes, 1.0 / num_nodes)
+        for _ in range(max_iter):
+            contrib = (rank * inverse)[sources]
+            new = alpha * np.bincount(targets, weights=contrib, minlength=num_nodes)
+            new += (alpha * rank[dangling].sum() + 1.0 - alpha) * teleport
+            err = np.abs(new - rank).sum()
+            rank = new
+            if err < num_nodes * tol:
+                return rank.tolist()
+    else:
+        inverse = [1.0 / d if d else 0.0 for d in _row_lengths(num_nodes, rows)]
+        dangling = [i for i, w in enumerate(inverse) if not w]
+        rank = [1.0 / num_nodes] * num_nodes
+        for _ in range(max_iter):
+            contrib = [r * w for r, w in zip(rank, inverse)]
+            leaked = alpha * sum(rank[i] for i in dangling) + 1.0 - alpha
+            new = [alpha * s + leaked * t
+                   for s, t in zip(_row_sums(num_nodes, rev_rows, contrib), teleport)]
+            err = sum(abs(a - b) for a, b in zip(new, rank))
+            rank = new
+            if err < num_nodes * tol:
+                return rank
+    raise RuntimeError(f"PageRank did not converge in {max_iter} iterations")
+
+
+def _hits_ids(num_nodes, rows, rev_rows, tol, max_iter):
+    """Iterazione di HITS su interi densi: (hub, authority) normalizzati a somma 1"""
+    np = _import_numpy()
+    if np is not None:
+        sources, targets = _edge_arrays(np, num_nodes, rows)
+        hubs = np.full(num_nodes, 1.0 / num_nodes)
+        for _ in range(max_iter):
+            authorities = np.bincount(targets, weights=hubs[sources], minlength=num_nodes)
+            new = np.bincount(sources, weights=authorities[targets], minlength=num_nodes)
+            new /= new.max() or 1.0
+            authorities /= authorities.max() or 1.0
+            err = np.abs(new - hubs).sum()
+            hubs = new
+            if err < tol:
+                return ((hubs / (hubs.sum() or 1.0)).tolist(),
+                        (authorities / (authorities.sum() or 1.0)).tolist())
+    else:
+        hubs = [1.0 / num_nodes] * num_nodes
+        for _ in range(max_iter):
+            authorities = _row_sums(num_nodes, rev_rows, hubs)
+            new = _row_sums(num_nodes, rows, authorities)
+            scale = max(new) or 1.0
+            new = [h / scale for h in new]
+            scale = max(authorities) or 1.0
+            authorities = [a / scale for a in authorities]
+            err = sum(abs(a - b) for a, b in zip(new, hubs))
+            hubs = new
+            if err < tol:
+                hub_total = sum(hubs) or 1.0
+                authority_total = sum(authorities) or 1.0
+                return ([h / hub_total for h in hubs],
+                        [a / authority_total for a in authorities])
+    raise RuntimeError(f"HITS did not converge in {max_iter} iterations")
+
+
+class FrozenGraph:
+    """Istantanea immutabile di un BaseGraph con adiacenze in formato CSR
+
+    Gli uid sono internati in interi densi (0..n-1); per ogni tipo di arco
+    sono memorizzati gli array offsets/targets in avanti e all'indietro,
+    con i target di ogni riga ordinati.
+    """
+
+    def __init__(self, keys, progress, uids, nodes, csr, rev_csr, index=None):
+        self.keys = keys
+        self.progress = progress
+        # sequenza id -> uid (lista, o tabella di stringhe su file mappato)
+        self.uids = uids
+        self._index = index
+        self.nodes = MappingProxyType(nodes) if isinstance(nodes, dict) else nodes
+        # tipo -> (offsets, targets), entrambi memoryview
+        self._csr = csr
+        self._rev_csr = rev_csr
+        self._mmap = None
+        self._views = []
+        self._cost_cache = {}
+
+    @property
+    def index(self):
+        """Dizionario uid -> id, costruito al primo accesso se necessario"""
+        if self._index is None:
+            self._index = {uid: i for i, uid in enumerate(self.uids)}
+        return self._index
+
+    @classmethod
+    def from_graph(cls, graph):
+        """Costruisce l'istantanea a partire da un BaseGraph"""
+        uids = list(graph.nodes)
+        index = {uid: i for i, uid in enumerate(uids)}
+        nodes = {
+            uid: Node(uid, **node.to_dict()['attributes'])
+            for uid, node in graph.nodes.items()
+        }
+        csr = {
+            tipo: _build_csr(rows, index, len(uids))
+            for tipo, rows in graph.edges.items()
+        }
+        rev_csr = {
+            tipo: _build_csr(rows, index, len(uids))
+            for tipo, rows in graph.rev_edges.items()
+        }
+        return cls(dict(graph.keys), graph.progress, uids, nodes,
+                   csr, rev_csr, index=index)
+
+    @property
+    def edge_types(self):
+        """Tipi di arco presenti nell'istantanea"""
+        return tuple(self._csr)
+
+    def node_id(self, uid):
+        """Intero denso associato a un uid"""
+        if uid not in self.index:
+            raise KeyError(f"Node with uid '{uid}' does not exist")
+        return self.index[uid]
+
+    def node_uid(self, node_id):
+        """Uid associato a un intero denso"""
+        return self.uids[node_id]
+
+    @staticmethod
+    def _row(csr, node_id, tipo):
+        if tipo not in csr:
+            return ()
+        offsets, targets = csr[tipo]
+        return targets[offsets[node_id]:offsets[node_id + 1]]
+
+    def neighbor_ids(self, node_id, tipo):
+        """Successori (interi) di un nodo, come vista senza copia"""
+        return self._row(self._csr, node_id, tipo)
+
+    def predecessor_ids(self, node_id, tipo):
+        """Predecessori (interi) di un nodo, come vista senza copia"""
+        return self._row(self._rev_csr, node_id, tipo)
+
+    def has_edge_ids(self, id1, id2, tipo):
+        """Verifica se esiste un arco tra due nodi identificati da interi"""
+        if tipo not in self._csr:
+            return False
+        offsets, targets = self._csr[tipo]
+        lo, hi = offsets[id1], offsets[id1 + 1]
+        pos = bisect_left(targets, id2, lo, hi)
+        return pos < hi and targets[pos] == id2
+
+    def _uids_of(self, csr, uid, tipo):
+        node_id = self.node_id(uid)
+        uids = self.uids
+        if tipo:
+            return {uids[i] for i in self._row(csr, node_id, tipo)}
+        result = set()
+        for other in csr:
+            result.update(uids[i] for i in self._row(csr, node_id, other))
+        return result
+
+    def get_neighbors(self, uid: str, tipo: str = None):
+        """Ottiene i vicini (successori) di un nodo"""
+        return self._uids_of(self._csr, uid, tipo)
+
+    def get_predecessors(self, uid: str, tipo: str = None):
+        """Ottiene i predecessori di un nodo"""
+        return self._uids_of(self._rev_csr, uid, tipo)
+
+    def has_edge(self, v1: str, v2: str, tipo: str) -> bool:
+        """Verifica se esiste un arco tra due nodi"""
+        if v1 not in self.index or v2 not in self.index:
+            return False
+        return self.has_edge_ids(self.index[v1], self.index[v2], tipo)
+
+    def _node_costs(self, weight):
+        """Array piatto dei costi per nodo letti da un attributo (in cache)"""
+        costs = self._cost_cache.get(weight)
+        if costs is None:
+            if weight not in self.keys:
+                raise KeyError(f"Unknown weight attribute '{weight}'")
+            default = self.keys[weight]
+            nodes = self.nodes
+            costs = array('d', (
+                getattr(nodes[uid], weight, default) for uid in self.uids
+            ))
+            if any(c < 0 for c in costs):
+                raise ValueError(f"Negative weight in attribute '{weight}'")
+            self._cost_cache[weight] = costs
+        return costs
+
+    def _csr_rows(self, tipi, reverse=False):
+        csr = self._rev_csr if reverse else self._csr
+        if tipi is None:
+            return list(csr.items())
+        if isinstance(tipi, str):
+            tipi = (tipi,)
+        return [(tipo, csr[tipo]) for tipo in tipi if tipo in csr]
+
+    def dijkstra_ids(self, source_ids, tipi=None, weight=None, max_cost=None):
+        """Dijkstra su interi densi e array piatti
+
+        weight è None (costo 1), il nome di un attributo numerico (costo
+        del nodo di arrivo) o una funzione (id1, id2, tipo). Restituisce
+        (dist, parent): array('d') con inf per i nodi non raggiunti e
+        array('q') con -1 per sorgenti e nodi non raggiunti.
+        """
+        n = len(self.uids)
+        costs = self._node_costs(weight) if isinstance(weight, str) else None
+        rows = self._csr_rows(tipi)
+        dist = array('d', [inf]) * n
+        parent = array('q', [-1]) * n
+        done = bytearray(n)
+        heap = []
+        for source in source_ids:
+            dist[source] = 0.0
+            heap.append((0.0, source))
+        heapify(heap)
+        while heap:
+            d, u = heappop(heap)
+            if done[u]:
+                continue
+            if max_cost is not None and d > max_cost:
+                break
+            done[u] = 1
+            for tipo, (offsets, targets) in rows:
+                for v in targets[offsets[u]:offsets[u + 1]]:
+                    if costs is not None:
+                        nd = d + costs[v]
+                    elif weight is None:
+                        nd = d + 1.0
+                    else:
+                        c = weight(u, v, tipo)
+                        if c < 0:
+                            raise ValueError(f"Negative weight {c} on edge type '{tipo}'")
+                        nd = d + c
+                    if nd < dist[v]:
+                        dist[v] = nd
+                        parent[v] = u
+                        heappush(heap, (nd, v))
+        # i nodi oltre max_cost restano non raggiunti
+        if max_cost is not None:
+            for v in range(n):
+                if not done[v]:
+                    dist[v] = inf
+                    parent[v] = -1
+        return dist, parent
+
+    def _weighted_neighbors(self, tipi, weight, reverse=False):
+        """Funzione id -> (vicino, costo) per A* e Dijkstra bidirezionale"""
+        costs = self._node_costs(weight) if isinstance(weight, str) else None
+        rows = self._csr_rows(tipi, reverse)
+
+        def edges_of(u):
+            for tipo, (offsets, targets) in rows:
+                for v in targets[offsets[u]:offsets[u + 1]]:
+                    if costs is not None:
+                        yield v, costs[u if reverse else v]
+                    elif weight is None:
+                        yield v, 1
+                    else:
+                        c = weight(v, u, tipo) if reverse else weight(u, v, tipo)
+                        if c < 0:
+                            raise ValueError(f"Negative weight {c} on edge type '{tipo}'")
+                        yield v, c
+        return edges_of
+
+    def dijkstra(self, sources, tipi=None, weight=None, max_cost=None):
+        """Come BaseGraph.dijkstra, calcolato su interi densi: (distanze, predecessori)"""
+        if isinstance(sources, str):
+            sources = (sources,)
+        ids = [self.node_id(uid) for uid in sources]
+        dist, parent = self.dijkstra_ids(ids, tipi, self._id_weight(weight), max_cost)
+        uids = self.uids
+        distances = {}
+        parents = {}
+        for i, d in enumerate(dist):
+            if d != inf:
+                distances[uids[i]] = d
+                parents[uids[i]] = uids[parent[i]] if parent[i] >= 0 else None
+        return distances, parents
+
+    def _id_weight(self, weight):
+        if callable(weight):
+            uids = self.uids
+            return lambda i, j, tipo: weight(uids[i], uids[j], tipo)
+        return weight
+
+    def shortest_path(self, source, target, tipi=None, weight=None):
+        """Cammino minimo con Dijkstra bidirezionale: (costo, [uid...])"""
+        weight = self._id_weight(weight)
+        cost, path = _bidirectional_dijkstra(
+            self.node_id(source), self.node_id(target),
+            self._weighted_neighbors(tipi, weight),
+            self._weighted_neighbors(tipi, weight, reverse=True),
+        )
+        return cost, [self.uids[i] for i in path]
+
+    def astar_path(self, source, target, heuristic, tipi=None, weight=None):
+        """Cammino minimo con A*; heuristic(uid) stima il costo residuo verso target"""
+        uids = self.uids
+        cost, path = _astar(
+            self.node_id(source), self.node_id(target),
+            self._weighted_neighbors(tipi, self._id_weight(weight)),
+            lambda i: heuristic(uids[i]),
+        )
+        return cost, [uids[i] for i in path]
+
+    def _teleport(self, personalization):
+        """Distribuzione di salto per id: uniforme o dai pesi uid -> peso"""
+        num_nodes = len(self.uids)
+        if personalization is None:
+            return [1.0 / num_nodes] * num_nodes
+        teleport = [0.0] * num_nodes
+        for uid, weight in personalization.items():
+            if weight < 0:
+                raise ValueError(f"Negative personalization weight for node '{uid}'")
+            teleport[self.node_id(uid)] = float(weight)
+        total = sum(teleport)
+        if total <= 0:
+            raise ValueError("Personalization weights must sum to a positive value")
+        return [weight / total for weight in teleport]
+
+    def pagerank(self, tipi=None, alpha=0.85, personalization=None, tol=1e-6, max_iter=100):
+        """PageRank sugli archi dei tipi scelti: dizionario uid -> punteggio
+
+        personalization (uid -> peso) rende il PageRank personalizzato:
+        salti e massa dei nodi senza archi in uscita finiscono solo sui
+        nodi indicati. Un arco presente in più tipi conta una volta per
+        tipo. Con numpy installato le iterazioni sono vettoriali.
+        Solleva RuntimeError se non converge entro max_iter iterazioni.
+        """
+        if not len(self.uids):
+            return {}
+        rank = _pagerank_ids(
+            len(self.uids),
+            [csr for _, csr in self._csr_rows(tipi)],
+            [csr for _, csr in self._csr_rows(tipi, reverse=True)],
+            alpha, self._teleport(personalization), tol, max_iter,
+        )
+        return dict(zip(self.uids, rank))
+
+    def hits(self, tipi=None, tol=1e-8, max_iter=100):
+        """Punteggi HITS sugli archi dei tipi scelti: (hub, authority) per uid"""
+        if not len(self.uids):
+            return {}, {}
+        hubs, authorities = _hits_ids(
+            len(self.uids),
+            [csr for _, csr in self._csr_rows(tipi)],
+            [csr for _, csr in self._csr_rows(tipi, reverse=True)],
+            tol, max_iter,
+        )
+        return dict(zip(self.uids, hubs)), dict(zip(self.uids, authorities))
+
+    def degree_centrality(self, tipi=None, direction='out'):
+        """Centralità di grado (grado / (n - 1)) per uid; direction 'out', 'in' o 'both'"""
+        if direction not in ('out', 'in', 'both'):
+            raise ValueError(f"Unknown direction '{direction}'")
+        rows = []
+        if direction in ('out', 'both'):
+            rows += [csr for _, csr in self._csr_rows(tipi)]
+        if direction in ('in', 'both'):
+            rows += [csr for _, csr in self._csr_rows(tipi, reverse=True)]
+        num_nodes = len(self.uids)
+        scale = 1.0 / (num_nodes - 1) if num_nodes > 1 else 1.0
+        return {uid: degree * scale
+                for uid, degree in zip(self.uids, _row_lengths(num_nodes, rows))}
+
+    def thaw(self, graph_cls=None):
+        """Ricostruisce un grafo modificabile dall'istantanea"""
+        graph = (graph_cls or BaseGraph)(**self.keys)
+        graph.progress = self.progress
+        graph.add_nodes(
+            dict(node.to_dict()['attributes'], uid=uid)
+            for uid, node in self.nodes.items()
+        )
+        uids = self.uids
+        graph.add_edges(
+            (uids[i], uids[j], tipo)
+            for tipo in self._csr
+            for i in range(len(uids))
+            for j in self.neighbor_ids(i, tipo)
+        )
+        return graph
+
+    def save_binary(self, filepath):
+        """Salva l'istantanea nel formato binario caricabile con load_binary
+
+        Il file contiene un'intestazione, le sezioni (tabelle di stringhe
+        per uid, array CSR per tipo, colonne di attributi) allineate a 8
+        byte e, in coda, i metadati JSON con la posizione delle sezioni.
+        """
+        import json
+        import struct
+        import sys
+
+        store = ColumnStore(self.keys)
+        for uid in self.uids:
+            store.add_row(self.nodes[uid].to_dict()['attributes'])
+
+        sections = _string_table_sections('uids', self.uids)
+        edge_types = list(self._csr)
+        for i, tipo in enumerate(edge_types):
+            for prefix, csr in (('csr', self._csr), ('rev', self._rev_csr)):
+                offsets, targets = csr[tipo]
+                sections.append((f'{prefix}/{i}/offsets', offsets))
+                sections.append((f'{prefix}/{i}/targets', targets))
+        columns = {}
+        for key, column in store.columns.items():
+            columns[key] = _column_sections(f'col/{key}', column, sections)
+
+        with open(filepath, 'wb') as f:
+            f.write(_BINARY_MAGIC + bytes(16))
+            layout = {}
+            for name, buffer in sections:
+                f.write(bytes(-f.tell() % 8))
+                view = memoryview(buffer)
+                layout[name] = [f.tell(), view.nbytes, view.format]
+                f.write(view)
+            meta = json.dumps({
+                'byteorder': sys.byteorder,
+                'keys': self.keys,
+                'progress': self.progress,
+                'edge_types': edge_types,
+                'columns': columns,
+                'sections': layout,
+            }, ensure_ascii=False).encode('utf-8')
+            meta_offset = f.tell()
+            f.write(meta)
+            f.seek(len(_BINARY_MAGIC))
+            f.write(struct.pack('<QQ', meta_offset, len(meta)))
+
+    @classmethod
+    def load_binary(cls, filepath):
+        """Apre un'istantanea binaria con mmap, senza copiare né analizzare i dati
+
+        Adiacenze e colonne sono memoryview sul file mappato (condiviso tra
+        processi che aprono lo stesso file); il dizionario uid -> id viene
+        costruito solo al primo accesso per uid. Il file resta mappato fino
+        a close() (o all'uscita dal blocco with).
+        """
+        import json
+        import mmap
+        import struct
+        import sys
+
+        with open(filepath, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mapped[:len(_BINARY_MAGIC)] != _BINARY_MAGIC:
+            mapped.close()
+            raise ValueError(f"'{filepath}' is not a binary graph snapshot")
+        meta_offset, meta_length = struct.unpack_from('<QQ', mapped, len(_BINARY_MAGIC))
+        meta = json.loads(mapped[meta_offset:meta_offset + meta_length])
+        if meta['byteorder'] != sys.byteorder:
+            mapped.close()
+            raise ValueError(f"Snapshot byte order '{meta['byteorder']}' is not supported")
+        buffer = memoryview(mapped)
+        # Tutte le viste sul file, da rilasciare in close() prima di chiuderlo
+        views = [buffer]
+
+        def section(name):
+            offset, length, typecode = meta['sections'][name]
+            view = buffer[offset:offset + length].cast(typecode)
+            views.append(view)
+            return view
+
+        uids = _StringTable(section('uids/offsets'), section('uids/data'))
+        csr = {}
+        rev_csr = {}
+        for i, tipo in enumerate(meta['edge_types']):
+            csr[tipo] = (section(f'csr/{i}/offsets'), section(f'csr/{i}/targets'))
+            rev_csr[tipo] = (section(f'rev/{i}/offsets'), section(f'rev/{i}/targets'))
+        columns = {
+            key: _load_column(kind, f'col/{key}', section, len(uids))
+            for key, kind in meta['columns'].items()
+        }
+
+        graph = cls(meta['keys'], meta['progress'], uids, None, csr, rev_csr)
+        graph.nodes = _FrozenNodes(graph, columns)
+        graph._mmap = mapped
+        graph._views = views
+        return graph
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Chiude il file mappato da load_binary; nulla da fare in memoria
+
+        Dopo close l'istantanea non è più utilizzabile. Solleva BufferError
+        se restano in uso memoryview ottenute dall'istantanea (per esempio
+        righe di neighbor_ids).
+        """
+        if self._mmap is None:
+            return
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._csr = {}
+        self._rev_csr = {}
+        self._cost_cache = {}
+        self._mmap.close()
+        self._mmap = None
+
+
+_BINARY_MAGIC = b'BGRAPHB1'
+
+
+class _StringTable(Sequence):
+    """Sequenza di stringhe UTF-8 lette su richiesta da offsets e dati"""
+
+    def __init__(self, offsets, data, decode=None):
+        self.offsets = offsets
+        self.data = data
+        self.decode = decode
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        text = str(self.data[self.offsets[i]:self.offsets[i + 1]], 'utf-8')
+        return self.decode(text) if self.decode else text
+
+
+class _FrozenNodes(Mapping):
+    """Nodi di un FrozenGraph ricostruiti su richiesta dalle colonne"""
+
+    def __init__(self, graph, columns):
+        self._graph = graph
+        self._columns = columns
+
+    def __getitem__(self, uid):
+        row = self._graph.node_id(uid)
+        attributes = {}
+        for key, column in self._columns.items():
+            value = column.get(row)
+            if value is not _MISSING:
+                attributes[key] = value
+        return Node(uid, **attributes)
+
+    def __iter__(self):
+        return iter(self._graph.uids)
+
+    def __len__(self):
+        return len(self._graph.uids)
+
+
+def _string_table_sections(name, strings):
+    """Sezioni (offsets, dati UTF-8) di una tabella di stringhe"""
+    encoded = [text.encode('utf-8') for text in strings]
+    offsets = array('q', [0])
+    offsets.extend(accumulate(map(len, encoded)))
+    return [(f'{name}/offsets', offsets), (f'{name}/data', b''.join(encoded))]
+
+
+def _column_sections(name, column, sections):
+    """Aggiunge a sections i buffer di una colonna e ne restituisce il tipo"""
+    import json
+
+    sections.append((f'{name}/present', column.present))
+    if isinstance(column, _BoolColumn):
+        sections.append((f'{name}/values', column.bits))
+        return 'bool'
+    if isinstance(column, _StrColumn):
+        sections.append((f'{name}/codes', column.codes))
+        sections.extend(_string_table_sections(f'{name}/table', column.table))
+        return 'str'
+    if isinstance(column, _ObjectColumn):
+        sections.extend(_string_table_sections(
+            f'{name}/table', [json.dumps(value) for value in column.values]))
+        return 'object'
+    sections.append((f'{name}/values', column.values))
+    return 'int' if isinstance(column, _IntColumn) else 'float'
+
+
+def _load_column(kind, name, section, rows):
+    """Ricostruisce una colonna di sola lettura sulle sezioni mappate"""
+    import json
+
+    if kind == 'object':
+        column = _ObjectColumn()
+        column.values = _StringTable(section(f'{name}/table/offsets'),
+                                     section(f'{name}/table/data'),
+                                     decode=json.loads)
+    elif kind == 'str':
+        column = _StrColumn()
+        column.codes = section(f'{name}/codes')
+        column.table = _StringTable(section(f'{name}/table/offsets'),
+                                    section(f'{name}/table/data'))
+    elif kind == 'bool':
+        column = _BoolColumn()
+        column.bits = section(f'{name}/values')
+    else:
+        column = _IntColumn() if kind == 'int' else _FloatColumn()
+        column.values = section(f'{name}/values')
+    column.present = section(f'{name}/present')
+    column.rows = rows
+    return column
+
+
+def _merge_csr(csrs, num_nodes):
+    """Unisce gli array CSR di più tipi di arco in un unico (offsets, targets)"""
+    if len(csrs) == 1:
+        return csrs[0]
+    offsets = array(_index_typecode(sum(len(t) for _, t in csrs)), [0])
+    targets = array(_index_typecode(num_nodes))
+    for node_id in range(num_nodes):
+        for row_offsets, row_targets in csrs:
+            targets.extend(row_targets[row_offsets[node_id]:row_offsets[node_id + 1]])
+        offsets.append(len(targets))
+    return memoryview(offsets), memoryview(targets)
+
+
+# Stato dei processi worker di ParallelAnalytics (un collegamento per processo)
+_SHARED = {}
+
+
+def _open_shared_memory(name):
+    """Si collega a un blocco di memoria condivisa creato dal processo principale
+
+    I worker del pool condividono il resource tracker del processo
+    principale: il blocco resta suo e viene liberato da close().
+    """
+    from multiprocessing import shared_memory
+    return shared_memory.SharedMemory(name=name)
+
+
+def _shared_views(buf, layout):
+    return {name: buf[start:start + nbytes].cast(typecode)
+            for name, (start, nbytes, typecode) in layout.items()}
+
+
+def _attach_shared(name, layout):
+    """Inizializzatore dei worker: collega gli array CSR condivisi"""
+    shm = _open_shared_memory(name)
+    _SHARED['shm'] = shm
+    _SHARED.update(_shared_views(shm.buf, layout))
+
+
+def _shared_sides(direction):
+    sides = []
+    if direction in ('out', 'both'):
+        sides.append((_SHARED['offsets'], _SHARED['targets']))
+    if direction in ('in', 'both'):
+        sides.append((_SHARED['rev_offsets'], _SHARED['rev_targets']))
+    if not sides:
+        raise ValueError(f"Unknown direction '{direction}'")
+    return sides
+
+
+def _parallel_bfs(sources, direction, max_depth):
+    """Task: una visita in ampiezza completa per ogni sorgente"""
+    sides = _shared_sides(direction)
+    num_nodes = len(sides[0][0]) - 1
+    results = []
+    for source in sources:
+        dist = array('i', [-1]) * num_nodes
+        dist[source] = 0
+        frontier = [source]
+        depth = 0
+        while frontier and (max_depth is None or depth < max_depth):
+            depth += 1
+            next_frontier = []
+            for node_id in frontier:
+                for offsets, targets in sides:
+                    for target in targets[offsets[node_id]:offsets[node_id + 1]]:
+                        if dist[target] < 0:
+                            dist[target] = depth
+                            next_frontier.append(target)
+            frontier = next_frontier
+        results.append(dist.tobytes())
+    return results
+
+
+def _parallel_degrees(lo, hi):
+    """Task: gradi in uscita e in entrata dei nodi lo..hi-1"""
+    offsets = _SHARED['offsets']
+    rev_offsets = _SHARED['rev_offsets']
+    out_degrees = array('i', (offsets[i + 1] - offsets[i] for i in range(lo, hi)))
+    in_degrees = array('i', (rev_offsets[i + 1] - rev_offsets[i] for i in range(lo, hi)))
+    return out_degrees.tobytes(), in_degrees.tobytes()
+
+
+def _parallel_neighbor_sum(values_name, lo, hi, direction):
+    """Task: somma dei valori dei vicini per i nodi lo..hi-1"""
+    shm = _open_shared_memory(values_name)
+    try:
+        values = shm.buf.cast('d')
+        sides = _shared_sides(direction)
+        sums = array('d', bytes(8 * (hi - lo)))
+        for node_id in range(lo, hi):
+            total = 0.0
+            for offsets, targets in sides:
+                for target in targets[offsets[node_id]:offsets[node_id + 1]]:
+                    total += values[target]
+            sums[node_id - lo] = total
+        values.release()
+        return sums.tobytes()
+    finally:
+        shm.close()
+
+
+def _parallel_components(lo, hi):
+    """Task: union-find sugli archi in uscita dei nodi lo..hi-1
+
+    Restituisce le coppie (nodo, radice) dei soli nodi toccati, da
+    unire nel processo principale.
+    """
+    offsets = _SHARED['offsets']
+    targets = _SHARED['targets']
+    parent = {}
+
+    def find(node_id):
+        root = node_id
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while node_id != root:
+            parent[node_id], node_id = root, parent[node_id]
+        return root
+
+    for node_id in range(lo, hi):
+        row = targets[offsets[node_id]:offsets[node_id + 1]]
+        if not len(row):
+            continue
+        root = find(node_id)
+        for target in row:
+            target_root = find(target)
+            if target_root != root:
+                parent[target_root] = root
+    nodes = array('i', parent)
+    roots = array('i', map(find, nodes))
+    return nodes.tobytes(), roots.tobytes()
+
+
+class ParallelAnalytics:
+    """Analisi su più processi sopra una copia CSR in memoria condivisa
+
+    Le adiacenze dei tipi scelti (in avanti e all'indietro) vengono
+    copiate una volta in un blocco multiprocessing.shared_memory; i
+    processi di un ProcessPoolExecutor vi si collegano all'avvio, così
+    ogni task riceve solo intervalli di nodi o sorgenti, mai il grafo.
+    Da usare come context manager (o chiamare close) per liberare
+    processi e memoria condivisa.
+    """
+
+    def __init__(self, graph, tipi=None, workers=None):
+        import os
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing import shared_memory
+        # Dal grafo modificabile servono solo le adiacenze, non gli attributi
+        frozen = graph if isinstance(graph, FrozenGraph) else graph._adjacency_snapshot(tipi)
+        if tipi is None:
+            tipi = frozen.edge_types
+        elif isinstance(tipi, str):
+            tipi = (tipi,)
+        self.frozen = frozen
+        self.uids = frozen.uids
+        self.num_nodes = num_nodes = len(frozen.uids)
+        empty = (memoryview(array('i', [0]) * (num_nodes + 1)), memoryview(array('i')))
+        fwd = _merge_csr([frozen._csr[t] for t in tipi if t in frozen._csr] or [empty],
+                         num_nodes)
+        rev = _merge_csr([frozen._rev_csr[t] for t in tipi if t in frozen._rev_csr]
+                         or [empty], num_nodes)
+        arrays = {'offsets': fwd[0], 'targets': fwd[1],
+                  'rev_offsets': rev[0], 'rev_targets': rev[1]}
+
+        # Sezioni allineate a 8 byte in un unico blocco condiviso
+        layout = {}
+        size = 0
+        for name, values in arrays.items():
+            layout[name] = (size, values.nbytes, values.format)
+            size += -(-values.nbytes // 8) * 8
+        self._shm = shared_memory.SharedMemory(create=True, size=max(size, 8))
+        for name, values in arrays.items():
+            start, nbytes, _ = layout[name]
+            self._shm.buf[start:start + nbytes] = values.cast('B')
+        self._views = _shared_views(self._shm.buf, layout)
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = ProcessPoolExecutor(
+            self.workers, initializer=_attach_shared, initargs=(self._shm.name, layout))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Ferma i processi e libera la memoria condivisa"""
+        if self._shm is None:
+            return
+        self._executor.shutdown()
+        for view in self._views.values():
+            view.release()
+        self._views = {}
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+
+    def _ranges(self):
+        """Intervalli di nodi con circa lo stesso numero di archi ciascuno"""
+        offsets = self._views['offsets']
+        parts = self.workers * 4
+        total = offsets[self.num_nodes]
+        bounds = [0]
+        for part in range(1, parts):
+            bound = bisect_left(offsets, total * part // parts, bounds[-1], self.num_nodes)
+            if bound > bounds[-1]:
+                bounds.append(bound)
+        bounds.append(self.num_nodes)
+        return list(zip(bounds, bounds[1:]))
+
+    def multi_source_bfs(self, sources, direction='out', max_depth=None):
+        """Distanze in passi da ciascuna sorgente, calcolate in parallelo
+
+        Restituisce un dizionario uid sorgente -> array('i') indicizzato
+        per id di nodo (vedi node_uid), con -1 per i nodi non raggiunti.
+        """
+        if isinstance(sources, str):
+            sources = (sources,)
+        ids = [self.frozen.node_id(uid) for uid in dict.fromkeys(sources)]
+        groups = [ids[i::self.workers] for i in range(self.workers) if ids[i::self.workers]]
+        futures = [self._executor.submit(_parallel_bfs, group, direction, max_depth)
+                   for group in groups]
+        result = {}
+        for group, future in zip(groups, futures):
+            for source, data in zip(group, future.result()):
+                dist = array('i')
+                dist.frombytes(data)
+                result[self.uids[source]] = dist
+        return result
+
+    def node_uid(self, node_id):
+        """uid associato a un id di nodo"""
+        return self.uids[node_id]
+
+    def degrees(self):
+        """Array('i') dei gradi in uscita e in entrata, per id di nodo"""
+        futures = [self._executor.submit(_parallel_degrees, lo, hi)
+                   for lo, hi in self._ranges()]
+        out_degrees = array('i')
+        in_degrees = array('i')
+        for future in futures:
+            out_bytes, in_bytes = future.result()
+            out_degrees.frombytes(out_bytes)
+            in_degrees.frombytes(in_bytes)
+        return out_degrees, in_degrees
+
+    def neighbor_sum(self, values, direction='out'):
+        """Per ogni nodo la somma di values (per id di nodo) sui suoi vicini"""
+        from multiprocessing import shared_memory
+        values = array('d', values)
+        if len(values) != self.num_nodes:
+            raise ValueError("Expected one value per node")
+        shm = shared_memory.SharedMemory(create=True, size=max(values.itemsize * len(values), 8))
+        try:
+            shm.buf[:len(values) * values.itemsize] = memoryview(values).cast('B')
+            futures = [self._executor.submit(_parallel_neighbor_sum, shm.name, lo, hi, direction)
+                       for lo, hi in self._ranges()]
+            sums = array('d')
+            for future in futures:
+                sums.frombytes(future.result())
+            return sums
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def connected_components(self):
+        """Componenti debolmente connesse come lista di insiemi di uid
+
+        Ogni worker unisce gli archi del proprio intervallo di nodi; le
+        radici locali vengono poi fuse in un union-find globale.
+        """
+        parent = array(_index_typecode(self.num_nodes), range(self.num_nodes))
+
+        def find(node_id):
+            while parent[node_id] != node_id:
+                parent[node_id] = parent[parent[node_id]]
+                node_id = parent[node_id]
+            return node_id
+
+        futures = [self._executor.submit(_parallel_components, lo, hi)
+                   for lo, hi in self._ranges()]
+        for future in futures:
+            nodes_bytes, roots_bytes = future.result()
+            nodes = array('i')
+            nodes.frombytes(nodes_bytes)
+            roots = array('i')
+            roots.frombytes(roots_bytes)
+            for node_id, root in zip(nodes, roots):
+                a, b = find(node_id), find(root)
+                if a != b:
+                    parent[max(a, b)] = min(a, b)
+
+        components = {}
+        uids = self.uids
+        for node_id in range(self.num_nodes):
+            components.setdefault(find(node_id), set()).add(uids[node_id])
+        return list(components.values())
+
+
+class ColumnarGraph(BaseGraph):
+    """BaseGraph con attributi dei nodi memorizzati per colonne tipizzate
+
+    Ogni chiave dello schema diventa una colonna (array('q'), array('d'),
+    bit impacchettati per i bool, stringhe internate in una tabella);
+    i nodi in self.nodes sono viste leggere che leggono per indice di riga.
+    Gli attributi fuori schema finiscono in colonne di oggetti generici.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.store = ColumnStore(self.keys)
+
+    def add_property(self, key, value):
+        super().add_property(key, value)
+        self.store.add_column(key, value)
+
+    def _drop_property(self, key):
+        super()._drop_property(key)
+        del self.store.columns[key]
+
+    def _new_node(self, uid, attributes):
+        return ColumnarNode(uid, self.store, self.store.add_row(attributes))
+
+    def _restore_node(self, uid, attributes):
+        self.store.del_row(self.nodes[uid]._row)
+        super()._restore_node(uid, attributes)
+
+    def del_node(self, uid):
+        """Rimuove un nodo e tutti i suoi archi, liberando la sua riga"""
+        node = self.nodes.get(uid)
+        super().del_node(uid)
+        if isinstance(node, ColumnarNode):
+            self.store.del_row(node._row)
+
+
+class SlottedGraph(BaseGraph):
+    """BaseGraph i cui nodi usano una classe con __slots__ generata dallo schema
+
+    La classe viene rigenerata da add_property e i nodi esistenti migrati;
+    le chiavi dello schema devono essere identificatori Python validi.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.node_class = _slotted_node_class(tuple(self.keys))
+
+    def add_property(self, key, value):
+        super().add_property(key, value)
+        self._migrate_nodes()
+
+    def _drop_property(self, key):
+        super()._drop_property(key)
+        self._migrate_nodes()
+
+    def _migrate_nodes(self):
+        """Rigenera la classe dei nodi dallo schema e vi sposta i nodi esistenti"""
+        self.node_class = _slotted_node_class(tuple(self.keys))
+        for uid, node in self.nodes.items():
+            self.nodes[uid] = self.node_class(uid, **node._attributes())
+
+    def _new_node(self, uid, attributes):
+        return self.node_class(uid, **attributes)
+
+
+class ReadWriteLock:
+    """Lock lettori/scrittore: più lettori insieme, uno scrittore esclusivo
+
+    Gli scrittori in attesa hanno la precedenza sui nuovi lettori, così
+    un flusso continuo di letture non li blocca all'infinito. Letture e
+    scritture sono rientranti nello stesso thread, e chi scrive può
+    anche leggere; passare da lettura a scrittura invece non è permesso.
+    """
+
+    def __init__(self):
+        self._cond = Condition(Lock())
+        self._readers = 0
+        self._writer = None
+        self._writer_depth = 0
+        self._waiting_writers = 0
+        self._local = local()
+
+    def acquire_read(self):
+        held = getattr(self._local, 'reads', 0)
+        if held or self._writer == get_ident():
+            self._local.reads = held + 1
+            return
+        with self._cond:
+            while self._writer is not None or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+        self._local.reads = 1
+
+    def release_read(self):
+        self._local.reads -= 1
+        if self._local.reads or self._writer == get_ident():
+            return
+        with self._cond:
+            self._readers -= 1
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        me = get_ident()
+        if self._writer == me:
+            self._writer_depth += 1
+            return
+        if getattr(self._local, 'reads', 0):
+            raise RuntimeError("Cannot acquire write lock while holding a read lock")
+        with self._cond:
+            self._waiting_writers += 1
+            while self._writer is not None or self._readers:
+                self._cond.wait()
+            self._waiting_writers -= 1
+            self._writer = me
+            self._writer_depth = 1
+
+    def release_write(self):
+        self._writer_depth -= 1
+        if not self._writer_depth:
+            with self._cond:
+                self._writer = None
+                self._cond.notify_all()
+
+    @contextmanager
+    def read(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class ConcurrentGraph:
+    """Accesso thread-safe a un grafo condiviso tra più thread
+
+    Espone gli stessi metodi del grafo avvolto: quelli che lo modificano
+    prendono il lock in scrittura, tutti gli altri in lettura, così le
+    query girano in parallelo tra loro e ogni modifica è atomica. I
+    metodi che restituiscono generatori o viste vive restituiscono qui
+    una copia, calcolata sotto lock. Attributi come nodes o edges sono
+    gli oggetti originali: vanno letti dentro read().
+
+    Le coroutine (i metodi *_async) tengono il lock in lettura fino alla
+    fine, attese comprese: nello stesso thread le scritture vanno fatte
+    dopo averle attese, altrimenti sollevano RuntimeError.
+
+    snapshot() restituisce un FrozenGraph condiviso da tutti i lettori
+    fino alla scrittura successiva, da usare per analisi lunghe senza
+    tenere il lock.
+    """
+
+    MUTATORS = frozenset({
+        'add_property', 'next_auto_uid', 'add_node', 'add_nodes', 'modify_node',
+        'del_node', 'add_edge', 'add_edges', 'del_edge', 'add_observer',
+        'remove_observer', 'enable_topological_order', 'disable_topological_order',
+        'enable_reachability_index', 'disable_reachability_index',
+        'rebuild_reachability_index', 'enable_journal', 'compact', 'sync',
+        'close_journal', 'enable_dirty_tracking', 'save_delta',
+        'apply_delta_records', 'enable_component_index', 'disable_component_index',
+    })
+    MATERIALIZED = {
+        'bfs': list, 'dfs': list, 'k_hop': list,
+        'iter_neighbors': list, 'iter_predecessors': list,
+        'neighbors_view': set, 'predecessors_view': set,
+        'to_records': list, 'to_delta_records': list,
+        'subgraph': SubgraphView.materialize,
+    }
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.lock = ReadWriteLock()
+        self.writes = 0
+        self._snapshot = (None, None)
+        self._snapshot_lock = Lock()
+
+    @contextmanager
+    def read(self):
+        """Blocco di sola lettura sul grafo avvolto, in parallelo con altri lettori"""
+        with self.lock.read():
+            yield self.graph
+
+    @contextmanager
+    def write(self):
+        """Blocco esclusivo: più modifiche applicate come un'unica scrittura"""
+        with self.lock.write():
+            self.writes += 1
+            yield self.graph
+
+    @contextmanager
+    def batch(self):
+        """graph.batch() dentro un blocco esclusivo"""
+        with self.write() as graph, graph.batch():
+            yield graph
+
+    def snapshot(self):
+        """FrozenGraph dello stato corrente, ricalcolato solo dopo nuove scritture"""
+        with self.lock.read():
+            frozen, writes = self._snapshot
+            if writes == self.writes:
+                return frozen
+            # Un solo lettore congela il grafo, gli altri riusano il risultato
+            with self._snapshot_lock:
+                frozen, writes = self._snapshot
+                if writes != self.writes:
+                    frozen = self.graph.freeze()
+                    self._snapshot = (frozen, self.writes)
+                return frozen
+
+    def __getattr__(self, name):
+        attr = getattr(self.graph, name)
+        if not callable(attr):
+            return attr
+        if name in self.MUTATORS:
+            def locked(*args, **kwargs):
+                with self.lock.write():
+                    self.writes += 1
+                    return attr(*args, **kwargs)
+        elif iscoroutinefunction(attr):
+            async def locked(*args, **kwargs):
+                token = _READ_LOCKED.set(True)
+                try:
+                    with self.lock.read():
+                        return await attr(*args, **kwargs)
+                finally:
+                    _READ_LOCKED.reset(token)
+        else:
+            materialize = self.MATERIALIZED.get(name)
+
+            def locked(*args, **kwargs):
+                with self.lock.read():
+                    result = attr(*args, **kwargs)
+                    if materialize is not None:
+                        result = materialize(result)
+                    return result
+        return locked
+
+
+_MISSING = object()
+
+
+class _Column:
+    """Colonna di valori con bitmap di presenza (un bit per riga)"""
+
+    kind = object
+
+    def __init__(self):
+        self.present = bytearray()
+        self.rows = 0
+
+    def extend(self, count):
+        self.rows += count
+        missing = ((self.rows + 7) >> 3) - len(self.present)
+        if missing > 0:
+            self.present.extend(bytes(missing))
+        self._extend(count)
+
+    def accepts(self, value):
+        return type(value) is self.kind
+
+    def get(self, row):
+        if not self.present[row >> 3] & (1 << (row & 7)):
+            return _MISSING
+        return self._get(row)
+
+    def set(self, row, value):
+        self._set(row, value)
+        self.present[row >> 3] |= 1 << (row & 7)
+
+    def clear(self, row):
+        self.present[row >> 3] &= ~(1 << (row & 7)) & 0xFF
+
+    def to_objects(self):
+        """Converte la colonna in una colonna di oggetti generici"""
+        column = _ObjectColumn()
+        column.extend(self.rows)
+        for row in range(self.rows):
+            value = self.get(row)
+            if value is not _MISSING:
+                column.set(row, value)
+        return column
+
+
+class _ArrayColumn(_Column):
+    """Colonna numerica su array tipizzato"""
+
+    def __init__(self, typecode):
+        super().__init__()
+        self.values = array(typecode)
+
+    def _extend(self, count):
+        self.values.frombytes(bytes(count * self.values.itemsize))
+
+    def _get(self, row):
+        return self.values[row]
+
+    def _set(self, row, value):
+        self.values[row] = value
+
+
+class _IntColumn(_ArrayColumn):
+    kind = int
+
+    def __init__(self):
+        super().__init__('q')
+
+    def accepts(self, value):
+        return type(value) is int and -2 ** 63 <= value < 2 ** 63
+
+
+class _FloatColumn(_ArrayColumn):
+    kind = float
+
+    def __init__(self):
+        super().__init__('d')
+
+
+class _BoolColumn(_Column):
+    """Colonna di bool impacchettati a bit"""
+
+    kind = bool
+
+    def __init__(self):
+        super().__init__()
+        self.bits = bytearray()
+
+    def _extend(self, count):
+        missing = len(self.present) - len(self.bits)
+        if missing > 0:
+            self.bits.extend(bytes(missing))
+
+    def _get(self, row):
+        return bool(self.bits[row >> 3] & (1 << (row & 7)))
+
+    def _set(self, row, value):
+        if value:
+            self.bits[row >> 3] |= 1 << (row & 7)
+        else:
+            self.bits[row >> 3] &= ~(1 << (row & 7)) & 0xFF
+
+
+class _StrColumn(_Column):
+    """Colonna di stringhe internate: codici interi in una tabella"""
+
+    kind = str
+
+    def __init__(self):
+        super().__init__()
+        self.codes = array('i')
+        self.table = []
+        self.lookup = {}
+
+    def _extend(self, count):
+        self.codes.frombytes(bytes(count * self.codes.itemsize))
+
+    def _get(self, row):
+        return self.table[self.codes[row]]
+
+    def _set(self, row, value):
+        code = self.lookup.get(value)
+        if code is None:
+            code = self.lookup[value] = len(self.table)
+            self.table.append(value)
+        self.codes[row] = code
+
+
+class _ObjectColumn(_Column):
+    """Colonna di ripiego per valori non rappresentabili in array"""
+
+    def __init__(self):
+        super().__init__()
+        self.values = []
+
+    def accepts(self, value):
+        return True
+
+    def _extend(self, count):
+        self.values.extend([None] * count)
+
+    def _get(self, row):
+        return self.values[row]
+
+    def _set(self, row, value):
+        self.values[row] = value
+
+    def clear(self, row):
+        super().clear(row)
+        self.values[row] = None
+
+
+_COLUMN_TYPES = {bool: _BoolColumn, int: _IntColumn, float: _FloatColumn, str: _StrColumn}
+
+
+def _column_for(default):
+    """Sceglie la colonna adatta al tipo del valore di default"""
+    return _COLUMN_TYPES.get(type(default), _ObjectColumn)()
+
+
+class ColumnStore:
+    """Attributi dei nodi memorizzati per colonne, indirizzati per riga
+
+    Le righe dei nodi rimossi vengono riutilizzate; le stringhe restano
+    nella tabella della colonna anche quando nessun nodo le usa più.
+    """
+
+    def __init__(self, keys):
+        self.columns = {key: _column_for(value) for key, value in keys.items()}
+        self.size = 0
+        self.free_rows = []
+
+    def add_column(self, key, default):
+        if key in self.columns:
+            # La chiave era già usata fuori schema: i valori restano
+            return
+        column = _column_for(default)
+        column.extend(self.size)
+        self.columns[key] = column
+
+    def add_row(self, attributes):
+        if self.free_rows:
+            row = self.free_rows.pop()
+        else:
+            row = self.size
+            self.size += 1
+            for column in self.columns.values():
+                column.extend(1)
+        for key, value in attributes.items():
+            self.set(row, key, value)
+        return row
+
+    def del_row(self, row):
+        for column in self.columns.values():
+            column.clear(row)
+        self.free_rows.append(row)
+
+    def get(self, row, key):
+        column = self.columns.get(key)
+        if column is None:
+            return _MISSING
+        return column.get(row)
+
+    def set(self, row, key, value):
+        column = self.columns.get(key)
+        if column is None:
+            # Attributo fuori schema (from_dict e load_json lo accettano)
+            column = self.columns[key] = _ObjectColumn()
+            column.extend(self.size)
+        if not column.accepts(value):
+            # Il valore non entra nella colonna tipizzata: ripiego su oggetti
+            column = self.columns[key] = column.to_objects()
+        column.set(row, value)
+
+    def row_dict(self, row):
+        attributes = {}
+        for key, column in self.columns.items():
+            value = column.get(row)
+            if value is not _MISSING:
+                attributes[key] = value
+        return attributes
+
+
+class BaseNode:
+    """Comportamento comune dei nodi: identità e confronto basati su uid"""
+
+    __slots__ = ('uid',)
+
+    def _attributes(self):
+        raise NotImplementedError
+
+    def update(self, **kwargs):
+        """Aggiorna attributi del nodo"""
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+    def __str__(self):
+        return self.uid
+
+    def __repr__(self):
+        return self.uid
+    
+    def __eq__(self, other):
+        """Confronto basato su uid"""
+        if isinstance(other, BaseNode):
+            return self.uid == other.uid
+        return False
+    
+    def __hash__(self):
+        """Hash basato su uid per permettere uso in set/dict"""
+        return hash(self.uid)
+    
+    def to_dict(self):
+        """Serializza il nodo in un dizionario"""
+        return {
+            'uid': self.uid,
+            'attributes': self._attributes()
+        }
+
+
+class Node(BaseNode):
+    def __init__(self, uid: str, **kwargs):
+        self.uid = uid
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+    def _attributes(self):
+        return dict(self.__dict__)
+
+
+class SlottedNode(BaseNode):
+    """Base dei nodi con __slots__ generati a partire dallo schema"""
+
+    __slots__ = ()
+
+    def __init__(self, uid: str, **kwargs):
+        self.uid = uid
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+    def _attributes(self):
+        attributes = {}
+        for key in type(self).__slots__:
+            value = getattr(self, key, _MISSING)
+            if value is not _MISSING:
+                attributes[key] = value
+        return attributes
+
+
+@lru_cache(maxsize=None)
+def _slotted_node_class(keys):
+    """Genera (una volta per schema) la sottoclasse di SlottedNode per keys"""
+    return type('SlottedNode', (SlottedNode,), {'__slots__': keys})
+
+
+class ColumnarNode(BaseNode):
+    """Vista leggera su una riga di un ColumnStore"""
+
+    __slots__ = ('_store', '_row')
+
+    def __init__(self, uid, store, row):
+        object.__setattr__(self, 'uid', uid)
+        object.__setattr__(self, '_store', store)
+        object.__setattr__(self, '_row', row)
+
+    def __getattr__(self, key):
+        if key.startswith('_'):
+            raise AttributeError(key)
+        value = self._store.get(self._row, key)
+        if value is _MISSING:
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{key}'")
+        return value
+
+    def __setattr__(self, key, value):
+        if key in ColumnarNode.__slots__ or key == 'uid':
+            object.__setattr__(self, key, value)
+        else:
+            self._store.set(self._row, key, value)
+
+    def _attributes(self):
+        return self._store.row_dict(self._row)
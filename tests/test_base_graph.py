@@ -2,7 +2,8 @@ import pytest
 import json
 import os
 import tempfile
-from base_graph import BaseGraph, Node
+from base_graph import (BaseGraph, Node, FrozenGraph, ColumnarGraph, SlottedGraph,
+                        ConcurrentGraph, ReadWriteLock, ParallelAnalytics, SubgraphView)
 
 
 class TestNode:
@@ -222,6 +223,73 @@ class TestGraph:
         # L'arco v1->v3 deve rimanere
         assert graph.has_edge(v1, v3, "other")
     
+    def test_del_node_with_self_loop(self):
+        """Test rimozione di un nodo con un arco verso se stesso"""
+        graph = BaseGraph()
+        v1 = graph.add_node()
+        v2 = graph.add_node()
+        
+        graph.add_edge(v1, v1, "loop")
+        graph.add_edge(v2, v1, "loop")
+        graph.del_node(v1)
+        
+        assert graph.edges == {}
+        assert graph.rev_edges == {}
+        assert graph.out_types == {}
+        assert graph.in_types == {}
+    
+    def test_incidence_index_tracks_edge_types(self):
+        """Test che l'indice di incidenza segue aggiunte e rimozioni di archi"""
+        graph = BaseGraph()
+        v1 = graph.add_node()
+        v2 = graph.add_node()
+        
+        graph.add_edge(v1, v2, "link")
+        graph.add_edge(v1, v2, "other")
+        assert graph.out_types[v1] == {"link", "other"}
+        assert graph.in_types[v2] == {"link", "other"}
+        assert v2 not in graph.out_types
+        
+        graph.del_edge(v1, v2, "link")
+        assert graph.out_types[v1] == {"other"}
+        assert graph.in_types[v2] == {"other"}
+        
+        graph.del_edge(v1, v2, "other")
+        assert graph.out_types == {}
+        assert graph.in_types == {}
+    
+    def test_del_node_visits_only_own_edge_types(self):
+        """Test che del_node legge solo le righe dei tipi di arco del nodo"""
+        class RecordingDict(dict):
+            def __init__(self, data):
+                super().__init__(data)
+                self.read = set()
+            
+            def __getitem__(self, key):
+                self.read.add(key)
+                return super().__getitem__(key)
+        
+        graph = BaseGraph()
+        hub_a = graph.add_node()
+        hub_b = graph.add_node()
+        graph.add_edges((hub_a, hub_b, f"type-{i}") for i in range(100))
+        victim = graph.add_node()
+        graph.add_edge(victim, hub_a, "type-0")
+        graph.add_edge(hub_b, victim, "type-1")
+        graph.edges = RecordingDict(graph.edges)
+        graph.rev_edges = RecordingDict(graph.rev_edges)
+        
+        graph.del_node(victim)
+        
+        assert graph.edges.read <= {"type-0", "type-1"}
+        assert graph.rev_edges.read <= {"type-0", "type-1"}
+        assert victim not in graph.out_types
+        assert victim not in graph.in_types
+        assert graph.out_types[hub_a] == {f"type-{i}" for i in range(100)}
+        assert hub_a not in graph.in_types
+        assert hub_b not in graph.out_types
+        assert graph.num_edges() == 100
+    
     def test_add_edge_between_existing_nodes(self):
         """Test aggiunta arco tra nodi esistenti"""
         graph = BaseGraph()
@@ -425,6 +493,1272 @@ class TestGraph:
         assert v3 not in graph.edges["link"][v1]
 
 
+class TestGraphStatistics:
+    """Test per i contatori di archi, gradi e istogrammi mantenuti"""
+    
+    def _recount(self, graph):
+        # Conteggio da zero da confrontare con i contatori mantenuti
+        per_type = {tipo: sum(len(row) for row in rows.values())
+                    for tipo, rows in graph.edges.items()}
+        assert graph.num_edges() == sum(per_type.values())
+        for tipo, count in per_type.items():
+            assert graph.num_edges(tipo) == count
+        for direction, adjacency in (("out", graph.edges), ("in", graph.rev_edges)):
+            degrees = {uid: sum(len(rows.get(uid, ())) for rows in adjacency.values())
+                       for uid in graph.nodes}
+            expected = {}
+            for degree in degrees.values():
+                expected[degree] = expected.get(degree, 0) + 1
+            assert graph.degree_histogram(direction) == expected
+            method = graph.out_degree if direction == "out" else graph.in_degree
+            for uid, degree in degrees.items():
+                assert method(uid) == degree
+    
+    def test_counts_follow_mutations(self):
+        """Test contatori dopo inserimenti, duplicati e rimozioni"""
+        graph = BaseGraph()
+        a, b, c = graph.add_nodes([{}, {}, {}])
+        assert graph.num_nodes() == 3
+        assert graph.num_edges() == 0
+        assert graph.degree_histogram() == {0: 3}
+        
+        graph.add_edge(a, b, "link")
+        graph.add_edge(a, b, "link")  # duplicato: non conta
+        graph.add_edges([(a, c, "link"), (a, b, "other"), (a, c, "link"), (c, c, "link")])
+        assert graph.num_edges() == 4
+        assert graph.num_edges("link") == 3
+        assert graph.num_edges("missing") == 0
+        assert graph.out_degree(a) == 3
+        assert graph.degree_histogram("out") == {3: 1, 1: 1, 0: 1}
+        assert graph.degree_histogram("in", tipo="link") == {1: 1, 2: 1, 0: 1}
+        
+        graph.del_edge(a, b, "other")
+        graph.del_edge(a, b, "other")  # già rimosso: non conta
+        assert graph.num_edges() == 3
+        assert graph.num_edges("other") == 0
+        
+        graph.del_node(c)
+        assert graph.num_edges() == 1
+        assert graph.degree_histogram("in") == {1: 1, 0: 1}
+        with pytest.raises(ValueError):
+            graph.degree_histogram("both")
+    
+    def test_counts_match_recount(self):
+        """Test contatori contro un conteggio completo su modifiche casuali"""
+        import random
+        rng = random.Random(11)
+        graph = BaseGraph()
+        uids = graph.add_nodes({} for _ in range(25))
+        for _ in range(200):
+            action = rng.random()
+            if action < 0.6:
+                graph.add_edge(rng.choice(uids), rng.choice(uids), rng.choice("xy"))
+            elif action < 0.9:
+                graph.del_edge(rng.choice(uids), rng.choice(uids), rng.choice("xy"))
+            else:
+                victim = rng.choice(uids)
+                graph.del_node(victim)
+                uids.remove(victim)
+                uids.append(graph.add_node())
+        self._recount(graph)
+        self._recount(BaseGraph.from_dict(graph.to_dict()))
+
+
+class TestBatch:
+    """Test per graph.batch(): modifiche consolidate e annullamento"""
+    
+    def _sample_graph(self, graph_cls=BaseGraph):
+        graph = graph_cls(name="", value=0)
+        uids = graph.add_nodes({"name": f"n{i}", "value": i} for i in range(6))
+        graph.add_edges([(uids[i], uids[i + 1], "link") for i in range(5)])
+        graph.add_edge(uids[0], uids[3], "other")
+        return graph, uids
+    
+    def _state(self, graph):
+        return (graph.to_dict(), graph.num_edges(), graph.degree_histogram(),
+                graph.degree_histogram("in"), graph.out_types, graph.in_types)
+    
+    def test_edges_applied_on_exit(self):
+        """Test archi annotati, applicati all'uscita e consolidati"""
+        graph, uids = self._sample_graph()
+        expected, _ = self._sample_graph()
+        with graph.batch():
+            graph.del_edge(uids[0], uids[1], "link")
+            graph.add_edge(uids[5], uids[0], "link")
+            graph.add_edges([(uids[0], uids[1], "link"), (uids[2], uids[4], "new")])
+            graph.del_edge(uids[0], uids[3], "other")
+            graph.del_edge(uids[1], uids[4], "missing")
+            # Le letture vedono ancora lo stato precedente al blocco
+            assert not graph.has_edge(uids[5], uids[0], "link")
+            assert graph.has_edge(uids[0], uids[3], "other")
+            with pytest.raises(KeyError):
+                graph.add_edge(uids[0], "missing", "link")
+        for edge in [(uids[5], uids[0], "link"), (uids[2], uids[4], "new")]:
+            expected.add_edge(*edge)
+        expected.del_edge(uids[0], uids[3], "other")
+        assert self._state(graph) == self._state(expected)
+        assert "other" not in graph.edges
+    
+    def test_del_node_flushes_pending_edges(self):
+        """Test che del_node applica prima gli archi annotati"""
+        graph, uids = self._sample_graph()
+        with graph.batch():
+            graph.add_edge(uids[4], uids[0], "link")
+            graph.del_node(uids[0])
+            graph.add_node(uid=uids[0], name="again")
+            graph.add_edge(uids[0], uids[2], "link")
+            with graph.batch():
+                graph.add_edge(uids[2], uids[0], "back")
+        assert graph.get_predecessors(uids[0]) == {uids[2]}
+        assert graph.get_neighbors(uids[0]) == {uids[2]}
+        assert graph.nodes[uids[0]].name == "again"
+        assert graph.num_edges() == 6
+    
+    @pytest.mark.parametrize("graph_cls", [BaseGraph, ColumnarGraph, SlottedGraph])
+    def test_exception_rolls_back(self, graph_cls):
+        """Test ritorno allo stato iniziale se il blocco solleva un'eccezione"""
+        graph, uids = self._sample_graph(graph_cls)
+        before = self._state(graph)
+        with pytest.raises(RuntimeError):
+            with graph.batch():
+                graph.add_property("active", True)
+                graph.modify_node(uids[1], name="changed", active=False)
+                fresh = graph.add_node(name="fresh", active=True)
+                graph.add_edge(fresh, uids[1], "link")
+                graph.del_edge(uids[1], uids[2], "link")
+                graph.del_node(uids[3])
+                graph.add_nodes([{}, {"value": 9}])
+                graph.add_edge(uids[5], uids[0], "other")
+                raise RuntimeError("boom")
+        assert self._state(graph) == before
+        assert graph.progress == 6
+        assert "active" not in graph.keys
+        assert graph.nodes[uids[1]].name == "n1"
+        # Il grafo resta utilizzabile dopo l'annullamento
+        graph.add_property("active", True)
+        graph.modify_node(uids[1], active=True)
+        assert graph.nodes[uids[1]].active is True
+    
+    def test_rejected_edge_rolls_back(self):
+        """Test annullamento quando un indice rifiuta un arco all'uscita"""
+        graph, uids = self._sample_graph()
+        graph.enable_topological_order("link")
+        before = self._state(graph)
+        with pytest.raises(ValueError, match="cycle"):
+            with graph.batch():
+                graph.add_edge(uids[0], uids[2], "link")
+                graph.add_edge(uids[5], uids[0], "link")
+        assert self._state(graph) == before
+
+
+class TestNeighborViews:
+    """Test per le viste e gli iteratori di adiacenza senza copia"""
+    
+    def _sample_graph(self):
+        graph = BaseGraph()
+        v1, v2, v3 = graph.add_nodes([{}, {}, {}])
+        graph.add_edges([(v1, v2, "link"), (v1, v3, "link"), (v1, v2, "other"), (v3, v1, "link")])
+        return graph, v1, v2, v3
+    
+    def test_neighbors_view_is_live(self):
+        """Test che la vista riflette le modifiche successive del grafo"""
+        graph, v1, v2, v3 = self._sample_graph()
+        view = graph.neighbors_view(v1, "link")
+        
+        assert view == {v2, v3}
+        assert len(view) == 2
+        assert v2 in view
+        
+        graph.del_edge(v1, v2, "link")
+        assert view == {v3}
+        graph.del_edge(v1, v3, "link")
+        assert len(view) == 0
+        graph.add_edge(v1, v2, "link")
+        assert view == {v2}
+    
+    def test_predecessors_view(self):
+        """Test vista dei predecessori e tipo inesistente"""
+        graph, v1, v2, v3 = self._sample_graph()
+        
+        assert graph.predecessors_view(v2, "link") == {v1}
+        assert graph.predecessors_view(v2, "missing") == set()
+        assert graph.neighbors_view(v2, "link") | {"x"} == {"x"}
+    
+    def test_view_is_read_only(self):
+        """Test che la vista non espone metodi di modifica"""
+        graph, v1, _, _ = self._sample_graph()
+        view = graph.neighbors_view(v1, "link")
+        
+        assert not hasattr(view, "add")
+        assert not hasattr(view, "discard")
+    
+    def test_view_iteration_guarded_against_mutation(self):
+        """Test che modificare gli archi durante l'iterazione solleva errore"""
+        graph, v1, v2, v3 = self._sample_graph()
+        
+        with pytest.raises(RuntimeError):
+            for other in graph.neighbors_view(v1, "link"):
+                graph.add_edge(v2, v3, "link")
+        with pytest.raises(RuntimeError):
+            for other in graph.iter_neighbors(v1):
+                graph.del_edge(v3, v1, "link")
+    
+    def test_iter_neighbors_chains_types(self):
+        """Test che iter_neighbors concatena i tipi senza costruire set"""
+        graph, v1, v2, v3 = self._sample_graph()
+        
+        assert sorted(graph.iter_neighbors(v1)) == sorted([v2, v3, v2])
+        assert sorted(graph.iter_neighbors(v1, "link")) == sorted([v2, v3])
+        assert list(graph.iter_neighbors(v2)) == []
+        assert list(graph.iter_predecessors(v1)) == [v3]
+        assert sorted(graph.iter_predecessors(v2)) == [v1, v1]
+    
+    def test_degrees(self):
+        """Test dei gradi in uscita e in entrata"""
+        graph, v1, v2, v3 = self._sample_graph()
+        
+        assert graph.out_degree(v1) == 3
+        assert graph.out_degree(v1, "link") == 2
+        assert graph.out_degree(v2) == 0
+        assert graph.in_degree(v2) == 2
+        assert graph.in_degree(v1, "link") == 1
+        assert graph.in_degree(v1, "missing") == 0
+    
+    def test_views_nonexistent_raise_error(self):
+        """Test che viste e iteratori su nodi inesistenti sollevano errore"""
+        graph = BaseGraph()
+        
+        for method in (graph.iter_neighbors, graph.iter_predecessors,
+                       graph.out_degree, graph.in_degree):
+            with pytest.raises(KeyError, match="does not exist"):
+                method("nonexistent")
+        with pytest.raises(KeyError, match="does not exist"):
+            graph.neighbors_view("nonexistent", "link")
+        with pytest.raises(KeyError, match="does not exist"):
+            graph.predecessors_view("nonexistent", "link")
+
+
+class TestSubgraphView:
+    """Test per le viste filtrate senza copie"""
+    
+    def _sample_graph(self, graph_cls=BaseGraph):
+        graph = graph_cls(name="", active=True)
+        for i in range(6):
+            graph.add_node(uid=f"n{i}", name=f"node {i}", active=i != 4)
+        graph.add_edges([("n0", "n1", "depends_on"), ("n1", "n2", "depends_on"),
+                         ("n2", "n4", "depends_on"), ("n4", "n5", "depends_on"),
+                         ("n0", "n3", "other"), ("n3", "n1", "depends_on")])
+        return graph
+    
+    def _expected(self, graph):
+        """Stessa restrizione costruita copiando nodo per nodo"""
+        expected = BaseGraph(name="", active=True)
+        for uid, node in graph.nodes.items():
+            if node.active:
+                expected.add_node(uid=uid, name=node.name, active=True)
+        for v1, targets in graph.edges["depends_on"].items():
+            for v2 in targets:
+                if v1 in expected.nodes and v2 in expected.nodes:
+                    expected.add_edge(v1, v2, "depends_on")
+        return expected
+    
+    def test_read_api_matches_copy(self):
+        """Test API di lettura uguale a quella della copia equivalente"""
+        graph = self._sample_graph()
+        view = SubgraphView(graph, node_filter=lambda node: node.active,
+                            edge_types="depends_on")
+        expected = self._expected(graph)
+        assert view.to_dict() == expected.to_dict()
+        assert view.num_nodes() == 5
+        assert view.num_edges() == expected.num_edges() == 3
+        for uid in expected.nodes:
+            assert view.get_neighbors(uid) == expected.get_neighbors(uid)
+            assert view.get_predecessors(uid) == expected.get_predecessors(uid)
+            assert view.out_degree(uid) == expected.out_degree(uid)
+            assert view.in_degree(uid) == expected.in_degree(uid)
+            assert dict(view.bfs(uid, direction="both")) == dict(expected.bfs(uid, direction="both"))
+        assert view.degree_histogram("in") == expected.degree_histogram("in")
+        assert view.degree_centrality() == expected.degree_centrality()
+        both = view.degree_centrality("depends_on", "both")
+        assert both == expected.degree_centrality("depends_on", "both")
+        order = view.topological_order("depends_on")
+        assert sorted(order) == ["n0", "n1", "n2", "n3", "n5"]
+        assert order.index("n0") < order.index("n3") < order.index("n1") < order.index("n2")
+        assert not view.has_edge("n2", "n4", "depends_on")
+        assert not view.has_edge("n0", "n3", "other")
+        assert view.shortest_path("n0", "n2") == (2, ["n0", "n1", "n2"])
+        assert view.shortest_path("n0", "n5") == (float("inf"), [])
+        assert sorted(map(sorted, view.components())) == [["n0", "n1", "n2", "n3"], ["n5"]]
+        assert view.pagerank() == pytest.approx(expected.pagerank())
+        with pytest.raises(KeyError):
+            view.get_neighbors("n4")
+    
+    def test_view_is_live_and_nests(self):
+        """Test vista aggiornata dalle modifiche del grafo e viste annidate"""
+        graph = self._sample_graph()
+        view = graph.subgraph(nodes=["n0", "n1", "n2", "n3"])
+        assert view.get_neighbors("n0") == {"n1", "n3"}
+        graph.add_edge("n2", "n0", "loop")
+        graph.add_edge("n2", "n5", "loop")
+        assert view.get_neighbors("n2") == {"n0"}
+        graph.del_node("n3")
+        assert "n3" not in view.nodes
+        assert view.get_neighbors("n0") == {"n1"}
+        
+        inner = view.subgraph(edge_types=["loop"])
+        assert set(inner.nodes) == {"n0", "n1", "n2"}
+        assert inner.to_dict()["edges"] == {"loop": {"n2": ["n0"]}}
+    
+    @pytest.mark.parametrize("graph_cls", [BaseGraph, ColumnarGraph, SlottedGraph])
+    def test_materialize(self, graph_cls):
+        """Test copia indipendente della stessa classe del grafo"""
+        graph = self._sample_graph(graph_cls)
+        view = graph.subgraph(node_filter=lambda node: node.active, edge_types="depends_on")
+        copy = view.materialize()
+        assert type(copy) is graph_cls
+        assert copy.to_dict() == self._expected(graph).to_dict()
+        assert copy.num_edges() == 3
+        copy.del_node("n0")
+        assert "n0" in graph.nodes
+        frozen = view.freeze()
+        assert len(frozen.uids) == 5
+        assert frozen.get_neighbors("n0", "depends_on") == {"n1"}
+
+
+class TestTraversal:
+    """Test per le visite bfs, dfs e k_hop"""
+    
+    def _chain_graph(self):
+        # a -> b -> c -> d (dep), a -> x (other), e -> a (dep)
+        graph = BaseGraph(active=True)
+        for uid in "abcdxe":
+            graph.add_node(uid=uid, active=uid != "c")
+        graph.add_edges([
+            ("a", "b", "dep"), ("b", "c", "dep"), ("c", "d", "dep"),
+            ("a", "x", "other"), ("e", "a", "dep"),
+        ])
+        return graph
+    
+    def test_bfs_yields_depths_in_order(self):
+        """Test che bfs produce i nodi con la loro distanza"""
+        graph = self._chain_graph()
+        
+        result = list(graph.bfs("a"))
+        assert result[0] == ("a", 0)
+        assert sorted(result[1:3]) == [("b", 1), ("x", 1)]
+        assert result[3:] == [("c", 2), ("d", 3)]
+    
+    def test_bfs_type_filter_and_max_depth(self):
+        """Test filtro sui tipi di arco e profondità massima"""
+        graph = self._chain_graph()
+        
+        assert list(graph.bfs("a", tipi={"dep"})) == [("a", 0), ("b", 1), ("c", 2), ("d", 3)]
+        assert list(graph.bfs("a", tipi="dep", max_depth=1)) == [("a", 0), ("b", 1)]
+        assert list(graph.bfs("a", tipi={"missing"})) == [("a", 0)]
+    
+    def test_bfs_directions(self):
+        """Test visita sui predecessori e in entrambe le direzioni"""
+        graph = self._chain_graph()
+        
+        assert list(graph.bfs("c", direction="in")) == [("c", 0), ("b", 1), ("a", 2), ("e", 3)]
+        both = dict(graph.bfs("b", direction="both", max_depth=1))
+        assert both == {"b": 0, "a": 1, "c": 1}
+        with pytest.raises(ValueError, match="Unknown direction"):
+            list(graph.bfs("a", direction="sideways"))
+    
+    def test_bfs_multiple_seeds_and_predicate(self):
+        """Test semi multipli e predicato sui nodi"""
+        graph = self._chain_graph()
+        
+        result = dict(graph.bfs({"a", "d"}, tipi="dep"))
+        assert result == {"a": 0, "d": 0, "b": 1, "c": 2}
+        
+        # c non è attivo: la visita si ferma prima di c
+        active = lambda node: node.active
+        assert dict(graph.bfs("a", tipi="dep", predicate=active)) == {"a": 0, "b": 1}
+    
+    def test_bfs_is_lazy(self):
+        """Test che la visita si può interrompere in anticipo"""
+        graph = BaseGraph()
+        uids = graph.add_nodes({} for _ in range(1000))
+        graph.add_edges((uids[i], uids[i + 1], "next") for i in range(999))
+        
+        visit = graph.bfs(uids[0])
+        assert next(visit) == (uids[0], 0)
+        assert next(visit) == (uids[1], 1)
+    
+    def test_dfs_preorder(self):
+        """Test che dfs segue un ramo fino in fondo prima del successivo"""
+        graph = BaseGraph()
+        for uid in "abcde":
+            graph.add_node(uid=uid)
+        graph.add_edges([("a", "b", "t"), ("b", "c", "t"), ("a", "d", "t"), ("d", "e", "t")])
+        
+        order = [uid for uid, _ in graph.dfs("a")]
+        assert order[0] == "a"
+        branch = order[1:]
+        assert branch in (["b", "c", "d", "e"], ["d", "e", "b", "c"])
+        assert dict(graph.dfs("a")) == {"a": 0, "b": 1, "c": 2, "d": 1, "e": 2}
+    
+    def test_dfs_max_depth_finds_all_nodes_within_limit(self):
+        """Test che il limite di profondità non perde nodi raggiungibili"""
+        graph = BaseGraph()
+        for uid in "abcde":
+            graph.add_node(uid=uid)
+        # a -> b -> c -> d -> e e scorciatoia a -> d
+        graph.add_edges([("a", "b", "t"), ("b", "c", "t"), ("c", "d", "t"),
+                         ("d", "e", "t"), ("a", "d", "t")])
+        
+        assert set(uid for uid, _ in graph.dfs("a", max_depth=2)) == set("abcde")
+    
+    def test_dfs_max_depth_zero_yields_only_seed(self):
+        """Test che max_depth=0 produce solo la sorgente, come bfs"""
+        graph = BaseGraph()
+        a, b = graph.add_nodes({} for _ in range(2))
+        graph.add_edge(a, b, "t")
+        
+        assert list(graph.dfs(a, max_depth=0)) == [(a, 0)]
+        assert list(graph.dfs(a, max_depth=0)) == list(graph.bfs(a, max_depth=0))
+    
+    def test_dfs_deep_chain_no_recursion_limit(self):
+        """Test che dfs è iterativa e gestisce catene lunghe"""
+        graph = BaseGraph()
+        uids = graph.add_nodes({} for _ in range(5000))
+        graph.add_edges((uids[i], uids[i + 1], "next") for i in range(4999))
+        
+        assert sum(1 for _ in graph.dfs(uids[0])) == 5000
+    
+    def test_k_hop(self):
+        """Test dell'intorno a k passi"""
+        graph = self._chain_graph()
+        
+        assert set(graph.k_hop("a", 1)) == {"b", "x"}
+        assert set(graph.k_hop("a", 2, tipi="dep")) == {"b", "c"}
+        assert set(graph.k_hop("a", 1, direction="both")) == {"b", "x", "e"}
+    
+    def test_traversal_errors(self):
+        """Test nodi inesistenti e modifiche durante la visita"""
+        graph = self._chain_graph()
+        
+        with pytest.raises(KeyError, match="does not exist"):
+            list(graph.bfs("missing"))
+        with pytest.raises(RuntimeError):
+            for uid, _ in graph.bfs("a"):
+                graph.add_edge("d", "e", "dep")
+
+
+class TestShortestPaths:
+    """Test per Dijkstra, Dijkstra bidirezionale e A*"""
+    
+    def _weighted_graph(self):
+        # a -> b -> d costa 1 + 1, a -> c -> d costa 5 + 1 (peso sul nodo di arrivo)
+        graph = BaseGraph(priority=0)
+        graph.add_nodes([
+            {"uid": "a", "priority": 0},
+            {"uid": "b", "priority": 1},
+            {"uid": "c", "priority": 5},
+            {"uid": "d", "priority": 1},
+            {"uid": "e"},
+        ])
+        graph.add_edges([
+            ("a", "b", "dep"), ("b", "d", "dep"), ("a", "c", "dep"),
+            ("c", "d", "dep"), ("a", "d", "slow"),
+        ])
+        return graph
+    
+    def _random_graph(self, seed):
+        import random
+        rng = random.Random(seed)
+        graph = BaseGraph(priority=0)
+        uids = graph.add_nodes({"priority": rng.randint(0, 9)} for _ in range(60))
+        graph.add_edges(
+            (rng.choice(uids), rng.choice(uids), rng.choice(["x", "y"]))
+            for _ in range(240)
+        )
+        return graph, uids
+    
+    def test_dijkstra_unit_and_attribute_weights(self):
+        """Test distanze con costo unitario e da attributo"""
+        graph = self._weighted_graph()
+        
+        dist, parent = graph.dijkstra("a", tipi="dep")
+        assert dist == {"a": 0, "b": 1, "c": 1, "d": 2}
+        assert parent["a"] is None
+        
+        dist, parent = graph.dijkstra("a", tipi="dep", weight="priority")
+        assert dist == {"a": 0, "b": 1, "c": 5, "d": 2}
+        assert parent["d"] == "b"
+    
+    def test_dijkstra_callable_weight_and_types(self):
+        """Test peso calcolato da funzione su (u, v, tipo)"""
+        graph = self._weighted_graph()
+        weight = lambda u, v, tipo: 0.5 if tipo == "slow" else 1.0
+        
+        dist, _ = graph.dijkstra("a", weight=weight)
+        assert dist["d"] == 0.5
+    
+    def test_dijkstra_multi_source_and_max_cost(self):
+        """Test sorgenti multiple e limite di costo"""
+        graph = self._weighted_graph()
+        
+        dist, parent = graph.dijkstra({"b", "c"}, tipi="dep")
+        assert dist == {"b": 0, "c": 0, "d": 1}
+        assert parent["d"] in ("b", "c")
+        
+        dist, _ = graph.dijkstra("a", tipi="dep", weight="priority", max_cost=2)
+        assert dist == {"a": 0, "b": 1, "d": 2}
+    
+    def test_shortest_path_and_astar(self):
+        """Test cammino minimo bidirezionale e A*"""
+        graph = self._weighted_graph()
+        
+        assert graph.shortest_path("a", "d", tipi="dep", weight="priority") == (2, ["a", "b", "d"])
+        assert graph.shortest_path("a", "a") == (0, ["a"])
+        assert graph.shortest_path("a", "e") == (float("inf"), [])
+        assert graph.astar_path("a", "d", lambda uid: 0, tipi="dep",
+                                weight="priority") == (2, ["a", "b", "d"])
+        assert graph.astar_path("d", "a", lambda uid: 0) == (float("inf"), [])
+    
+    def test_algorithms_agree_on_random_graphs(self):
+        """Test che Dijkstra, bidirezionale e A* trovano lo stesso costo"""
+        for seed in range(5):
+            graph, uids = self._random_graph(seed)
+            dist, parent = graph.dijkstra(uids[0], weight="priority")
+            for target in uids[1:20]:
+                expected = dist.get(target, float("inf"))
+                cost, path = graph.shortest_path(uids[0], target, weight="priority")
+                assert cost == expected
+                assert graph.astar_path(uids[0], target, lambda uid: 0,
+                                        weight="priority")[0] == expected
+                if path:
+                    assert path[0] == uids[0] and path[-1] == target
+                    assert sum(graph.nodes[uid].priority for uid in path[1:]) == cost
+    
+    def test_negative_weight_raises_error(self):
+        """Test che pesi negativi sollevano errore"""
+        graph = self._weighted_graph()
+        graph.modify_node("b", priority=-1)
+        
+        with pytest.raises(ValueError, match="Negative weight"):
+            graph.dijkstra("a", weight="priority")
+        with pytest.raises(ValueError, match="Negative weight"):
+            graph.freeze().dijkstra("a", weight="priority")
+    
+    def test_unknown_weight_and_nodes(self):
+        """Test attributo di peso sconosciuto e nodi inesistenti"""
+        graph = self._weighted_graph()
+        
+        with pytest.raises(KeyError, match="Unknown weight attribute"):
+            graph.dijkstra("a", weight="missing")
+        with pytest.raises(KeyError, match="does not exist"):
+            graph.shortest_path("a", "missing")
+    
+    def test_frozen_matches_base_graph(self):
+        """Test che le varianti su FrozenGraph coincidono con BaseGraph"""
+        for seed in range(3):
+            graph, uids = self._random_graph(seed)
+            frozen = graph.freeze()
+            for weight in (None, "priority", lambda u, v, tipo: 2 if tipo == "x" else 3):
+                assert frozen.dijkstra(uids[:3], weight=weight)[0] == \
+                    graph.dijkstra(uids[:3], weight=weight)[0]
+                for target in uids[5:15]:
+                    assert frozen.shortest_path(uids[0], target, weight=weight)[0] == \
+                        graph.shortest_path(uids[0], target, weight=weight)[0]
+                    assert frozen.astar_path(uids[0], target, lambda uid: 0, tipi="x",
+                                             weight=weight)[0] == \
+                        graph.astar_path(uids[0], target, lambda uid: 0, tipi="x",
+                                         weight=weight)[0]
+    
+    def test_frozen_dijkstra_ids_arrays(self):
+        """Test del risultato su array piatti"""
+        frozen = self._weighted_graph().freeze()
+        a, d, e = frozen.node_id("a"), frozen.node_id("d"), frozen.node_id("e")
+        
+        dist, parent = frozen.dijkstra_ids([a], tipi="dep", weight="priority")
+        assert dist[d] == 2.0
+        assert frozen.node_uid(parent[d]) == "b"
+        assert dist[e] == float("inf")
+        assert parent[a] == -1
+
+
+class TestCentrality:
+    """Test per PageRank, HITS e centralità di grado"""
+    
+    def _sample_graph(self):
+        graph = BaseGraph(name="")
+        uids = graph.add_nodes({"name": f"n{i}"} for i in range(6))
+        graph.add_edges([(uids[0], uids[1], "link"), (uids[1], uids[2], "link"),
+                         (uids[2], uids[0], "link"), (uids[3], uids[0], "link"),
+                         (uids[4], uids[3], "link"), (uids[0], uids[4], "cite"),
+                         (uids[5], uids[2], "cite")])
+        return graph, uids
+    
+    @staticmethod
+    def _reference_pagerank(graph, tipi, alpha=0.85, teleport=None, iterations=200):
+        uids = list(graph.nodes)
+        n = len(uids)
+        teleport = teleport or {uid: 1.0 / n for uid in uids}
+        out = {uid: [v for tipo in tipi for v in graph.edges.get(tipo, {}).get(uid, ())]
+               for uid in uids}
+        rank = {uid: 1.0 / n for uid in uids}
+        for _ in range(iterations):
+            dangling = sum(rank[uid] for uid in uids if not out[uid])
+            new = {uid: (alpha * dangling + 1 - alpha) * teleport.get(uid, 0.0) for uid in uids}
+            for uid in uids:
+                for v in out[uid]:
+                    new[v] += alpha * rank[uid] / len(out[uid])
+            rank = new
+        return rank
+    
+    def test_pagerank_matches_reference(self):
+        """Test PageRank confrontato con un'iterazione di riferimento"""
+        graph, _ = self._sample_graph()
+        for tipi in (["link"], ["link", "cite"]):
+            rank = graph.pagerank(tipi, tol=1e-12, max_iter=500)
+            expected = self._reference_pagerank(graph, tipi)
+            assert sum(rank.values()) == pytest.approx(1.0)
+            assert rank == pytest.approx(expected, abs=1e-9)
+        assert graph.pagerank() == pytest.approx(graph.pagerank(["link", "cite"]))
+        assert graph.freeze().pagerank("link") == pytest.approx(graph.pagerank("link"))
+    
+    def test_personalized_pagerank(self):
+        """Test PageRank personalizzato: i nodi non raggiungibili restano a zero"""
+        graph, uids = self._sample_graph()
+        rank = graph.pagerank("link", personalization={uids[0]: 1}, tol=1e-12, max_iter=500)
+        expected = self._reference_pagerank(graph, ["link"], teleport={uids[0]: 1.0})
+        assert rank == pytest.approx(expected, abs=1e-9)
+        assert rank[uids[3]] == rank[uids[4]] == rank[uids[5]] == 0
+        with pytest.raises(ValueError):
+            graph.pagerank("link", personalization={uids[0]: 0})
+        with pytest.raises(KeyError):
+            graph.pagerank("link", personalization={"missing": 1})
+        with pytest.raises(RuntimeError):
+            graph.pagerank("link", max_iter=1)
+    
+    def test_hits(self):
+        """Test HITS su un grafo con autovettori noti"""
+        graph = BaseGraph(name="")
+        a, b, c, d = graph.add_nodes({"name": x} for x in "abcd")
+        graph.add_edges([(a, b, "t"), (a, c, "t"), (d, b, "t")])
+        hubs, authorities = graph.hits("t")
+        golden = (5 ** 0.5 - 1) / 2
+        assert hubs == pytest.approx({a: golden, b: 0, c: 0, d: 1 - golden})
+        assert authorities == pytest.approx({a: 0, b: golden, c: 1 - golden, d: 0})
+        assert graph.freeze().hits() == (hubs, authorities)
+        assert BaseGraph(name="").hits() == ({}, {})
+    
+    def test_degree_centrality(self):
+        """Test centralità di grado per direzione e tipo"""
+        graph, uids = self._sample_graph()
+        frozen = graph.freeze()
+        for tipi in (None, "link", ["cite"]):
+            for direction in ("out", "in", "both"):
+                centrality = graph.degree_centrality(tipi, direction)
+                assert centrality == frozen.degree_centrality(tipi, direction)
+        assert graph.degree_centrality()[uids[0]] == pytest.approx(2 / 5)
+        assert graph.degree_centrality("link", "in")[uids[0]] == pytest.approx(2 / 5)
+        assert graph.degree_centrality(direction="both")[uids[0]] == pytest.approx(4 / 5)
+        with pytest.raises(ValueError):
+            graph.degree_centrality(direction="sideways")
+    
+    def test_numpy_and_fallback_agree(self, monkeypatch):
+        """Test stesso risultato con numpy e con il fallback in Python puro"""
+        pytest.importorskip("numpy")
+        import base_graph
+        graph, _ = self._sample_graph()
+        rank = graph.pagerank(tol=1e-12, max_iter=500)
+        scores = graph.hits()
+        monkeypatch.setattr(base_graph, "_import_numpy", lambda: None)
+        assert graph.pagerank(tol=1e-12, max_iter=500) == pytest.approx(rank)
+        fallback = graph.hits()
+        assert fallback[0] == pytest.approx(scores[0])
+        assert fallback[1] == pytest.approx(scores[1])
+
+
+class TestStronglyConnected:
+    """Test per componenti fortemente connesse e condensazione"""
+    
+    def _cyclic_graph(self):
+        graph = BaseGraph(name="")
+        for uid in "abcdef":
+            graph.add_node(uid=uid)
+        graph.add_edges([("a", "b", "dep"), ("b", "c", "dep"), ("c", "a", "dep"),
+                         ("c", "d", "dep"), ("d", "e", "dep"), ("e", "d", "call"),
+                         ("f", "a", "call")])
+        return graph
+    
+    def test_components_per_type_set(self):
+        """Test componenti sui tipi scelti, in ordine topologico inverso"""
+        graph = self._cyclic_graph()
+        components = graph.strongly_connected_components()
+        assert sorted(map(sorted, components)) == [["a", "b", "c"], ["d", "e"], ["f"]]
+        position = {uid: i for i, members in enumerate(components) for uid in members}
+        assert position["d"] < position["a"] < position["f"]
+        
+        components = graph.strongly_connected_components("dep")
+        assert sorted(map(sorted, components)) == [
+            ["a", "b", "c"], ["d"], ["e"], ["f"]]
+        assert sorted(map(sorted, graph.strongly_connected_components([]))) == [
+            [uid] for uid in "abcdef"]
+    
+    def test_condensation(self):
+        """Test grafo delle componenti aciclico, con membri e tipi degli archi"""
+        graph = self._cyclic_graph()
+        dag = graph.condensation()
+        members = {uid: sorted(node.members) for uid, node in dag.nodes.items()}
+        by_members = {tuple(m): uid for uid, m in members.items()}
+        abc, de, f = by_members[("a", "b", "c")], by_members[("d", "e")], by_members[("f",)]
+        assert dag.nodes[abc].size == 3
+        assert dag.get_neighbors(abc, "dep") == {de}
+        assert dag.get_neighbors(f, "call") == {abc}
+        assert dag.num_edges() == 2
+        # Gli uid numerati seguono un ordine topologico
+        order = sorted(dag.nodes, key=lambda uid: int(uid.split("-")[1]))
+        assert order.index(f) < order.index(abc) < order.index(de)
+        
+        frozen = graph.condensation("dep", frozen=True)
+        assert isinstance(frozen, FrozenGraph)
+        assert len(frozen.uids) == 4
+        assert sum(len(frozen.get_neighbors(uid, "dep")) for uid in frozen.uids) == 2
+    
+    def test_long_cycle_without_recursion(self):
+        """Test ciclo più lungo del limite di ricorsione"""
+        import sys
+        graph = BaseGraph()
+        size = sys.getrecursionlimit() * 5
+        uids = graph.add_nodes({} for _ in range(size))
+        graph.add_edges((uids[i], uids[(i + 1) % size], "next") for i in range(size))
+        graph.add_node(uid="tail")
+        graph.add_edge(uids[0], "tail", "next")
+        components = graph.strongly_connected_components("next")
+        assert [len(c) for c in components] == [1, size]
+        dag = graph.condensation("next")
+        assert dag.num_nodes() == 2 and dag.num_edges() == 1
+
+
+class TestTopologicalOrder:
+    """Test per l'ordine topologico incrementale e il rilevamento dei cicli"""
+    
+    def _assert_topological(self, graph, tipo):
+        order = graph.topological_order(tipo)
+        assert sorted(order) == sorted(graph.nodes)
+        position = {uid: i for i, uid in enumerate(order)}
+        for v1, targets in graph.edges.get(tipo, {}).items():
+            for v2 in targets:
+                assert position[v1] < position[v2]
+    
+    def test_topological_order_without_tracking(self):
+        """Test ordine calcolato da zero e ciclo esistente"""
+        graph = BaseGraph()
+        for uid in "abcd":
+            graph.add_node(uid=uid)
+        graph.add_edges([("c", "b", "dep"), ("b", "a", "dep"), ("d", "a", "other")])
+        self._assert_topological(graph, "dep")
+        assert graph.would_create_cycle("a", "c", "dep")
+        assert not graph.would_create_cycle("c", "a", "dep")
+        
+        graph.add_edge("a", "c", "dep")
+        with pytest.raises(ValueError, match="cycle"):
+            graph.topological_order("dep")
+        with pytest.raises(ValueError, match="cycle"):
+            graph.enable_topological_order("dep")
+    
+    def test_tracked_order_rejects_cycles(self):
+        """Test rifiuto degli archi che chiudono un ciclo"""
+        graph = BaseGraph()
+        for uid in "abcd":
+            graph.add_node(uid=uid)
+        graph.enable_topological_order("dep")
+        graph.add_edge("d", "c", "dep")
+        graph.add_edge("c", "b", "dep")
+        graph.add_edge("b", "a", "dep")
+        assert graph.topological_order("dep") == ["d", "c", "b", "a"]
+        
+        assert graph.would_create_cycle("a", "d", "dep")
+        assert graph.would_create_cycle("a", "a", "dep")
+        with pytest.raises(ValueError, match="cycle"):
+            graph.add_edge("a", "d", "dep")
+        with pytest.raises(ValueError, match="cycle"):
+            graph.add_edge("b", "b", "dep")
+        assert not graph.has_edge("a", "d", "dep")
+        
+        # Altri tipi di arco non sono vincolati
+        graph.add_edge("a", "d", "other")
+        # Rimuovere un arco rende di nuovo lecito il verso opposto
+        graph.del_edge("c", "b", "dep")
+        graph.add_edge("a", "d", "dep")
+        graph.add_edge("b", "c", "dep")
+        self._assert_topological(graph, "dep")
+    
+    def test_tracked_order_follows_node_changes(self):
+        """Test nodi aggiunti e rimossi dopo l'attivazione"""
+        graph = BaseGraph()
+        graph.enable_topological_order("dep")
+        uids = graph.add_nodes({} for _ in range(10))
+        for uid in uids[:8]:
+            graph.del_node(uid)
+        late = graph.add_node()
+        graph.add_edge(late, uids[8], "dep")
+        assert graph.topological_order("dep") == [late, uids[9], uids[8]]
+        
+        graph.disable_topological_order("dep")
+        graph.add_edge(uids[8], late, "dep")
+        with pytest.raises(ValueError):
+            graph.topological_order("dep")
+    
+    def test_tracked_order_matches_random_insertions(self):
+        """Test su inserimenti casuali contro la verifica completa"""
+        import random
+        rng = random.Random(7)
+        graph = BaseGraph()
+        uids = graph.add_nodes({} for _ in range(40))
+        graph.enable_topological_order("dep")
+        for _ in range(400):
+            v1, v2 = rng.choice(uids), rng.choice(uids)
+            expected = v1 == v2 or v1 in {uid for uid, _ in graph.bfs(v2, "dep")}
+            assert graph.would_create_cycle(v1, v2, "dep") == expected
+            if expected:
+                with pytest.raises(ValueError):
+                    graph.add_edge(v1, v2, "dep")
+            else:
+                graph.add_edge(v1, v2, "dep")
+            if rng.random() < 0.1:
+                victim = rng.choice(uids)
+                graph.del_node(victim)
+                uids.remove(victim)
+                uids.append(graph.add_node())
+        self._assert_topological(graph, "dep")
+    
+    def test_bulk_edges_with_tracking(self):
+        """Test add_edges con l'ordine attivo"""
+        graph = BaseGraph()
+        uids = graph.add_nodes({} for _ in range(5))
+        graph.enable_topological_order("dep")
+        graph.add_edges((uids[i + 1], uids[i], "dep") for i in range(4))
+        assert graph.topological_order("dep") == uids[::-1]
+        with pytest.raises(KeyError):
+            graph.add_edges([(uids[0], uids[1], "x"), (uids[0], "missing", "x")])
+        assert "x" not in graph.edges
+
+
+class TestReachabilityIndex:
+    """Test per l'indice di raggiungibilità e la sua invalidazione"""
+    
+    def _chain_graph(self):
+        graph = BaseGraph()
+        for uid in "abcde":
+            graph.add_node(uid=uid)
+        graph.add_edges([("a", "b", "dep"), ("b", "c", "dep"), ("d", "e", "other")])
+        return graph
+    
+    def test_is_reachable_without_index(self):
+        """Test risposta tramite visita quando l'indice non è attivo"""
+        graph = self._chain_graph()
+        assert graph.is_reachable("a", "c", "dep")
+        assert graph.is_reachable("e", "e", "dep")
+        assert not graph.is_reachable("c", "a", "dep")
+        assert not graph.is_reachable("d", "e", "dep")
+        with pytest.raises(KeyError):
+            graph.is_reachable("a", "missing", "dep")
+    
+    def test_index_updates_and_invalidates(self):
+        """Test aggiornamento incrementale, invalidazione e contatori"""
+        graph = self._chain_graph()
+        graph.enable_reachability_index("dep")
+        assert graph.is_reachable("a", "c", "dep")
+        assert not graph.is_reachable("c", "a", "dep")
+        assert not graph.is_reachable("a", "d", "dep")
+        
+        # Arco verso un nodo nuovo: aggiornamento sul posto
+        graph.add_edge("c", "d", "dep")
+        assert graph.is_reachable("a", "d", "dep")
+        # Arco già implicato: nessun lavoro
+        graph.add_edge("a", "c", "dep")
+        stats = graph.reachability_stats("dep")
+        assert stats["rebuilds"] == 1
+        assert stats["incremental_updates"] == 1
+        assert stats["hits"] == 4
+        
+        # Un ciclo fonde componenti: ricostruzione alla query successiva
+        graph.add_edge("d", "a", "dep")
+        assert graph.is_reachable("c", "b", "dep")
+        assert graph.reachability_stats("dep")["rebuilds"] == 2
+        
+        graph.del_edge("d", "a", "dep")
+        graph.del_node("b")
+        assert graph.reachability_stats("dep")["invalidations"] == 2
+        assert graph.is_reachable("a", "d", "dep")
+        assert not graph.is_reachable("d", "a", "dep")
+        
+        graph.rebuild_reachability_index("dep")
+        stats = graph.reachability_stats("dep")
+        assert stats["rebuilds"] == 4
+        assert stats["rebuild_seconds"] >= 0
+        
+        graph.disable_reachability_index("dep")
+        with pytest.raises(KeyError):
+            graph.reachability_stats("dep")
+    
+    def test_index_matches_traversal_on_random_mutations(self):
+        """Test su modifiche casuali contro la visita in ampiezza"""
+        import random
+        rng = random.Random(3)
+        graph = BaseGraph()
+        uids = graph.add_nodes({} for _ in range(30))
+        graph.enable_reachability_index("dep")
+        for step in range(300):
+            action = rng.random()
+            if action < 0.7:
+                graph.add_edge(rng.choice(uids), rng.choice(uids), "dep")
+            elif action < 0.9:
+                v1 = rng.choice(uids)
+                targets = list(graph.edges.get("dep", {}).get(v1, ()))
+                if targets:
+                    graph.del_edge(v1, rng.choice(targets), "dep")
+            else:
+                victim = rng.choice(uids)
+                graph.del_node(victim)
+                uids.remove(victim)
+                uids.append(graph.add_node())
+            a, b = rng.choice(uids), rng.choice(uids)
+            expected = any(uid == b for uid, _ in graph.bfs(a, "dep"))
+            assert graph.is_reachable(a, b, "dep") == expected
+
+
+class TestComponentIndex:
+    """Test per le componenti connesse mantenute con union-find"""
+    
+    def _sample_graph(self):
+        graph = BaseGraph()
+        for uid in "abcdefg":
+            graph.add_node(uid=uid)
+        graph.add_edges([("a", "b", "x"), ("c", "b", "y"), ("d", "e", "x"),
+                         ("e", "f", "x")])
+        return graph
+    
+    @staticmethod
+    def _normalized(components):
+        return sorted(sorted(component) for component in components)
+    
+    @pytest.mark.parametrize("indexed", [False, True])
+    def test_queries(self, indexed):
+        """Test component_of, same_component e components con e senza indice"""
+        graph = self._sample_graph()
+        if indexed:
+            graph.enable_component_index()
+        assert graph.component_of("b") == {"a", "b", "c"}
+        assert graph.component_of("g") == {"g"}
+        assert graph.same_component("a", "c")
+        assert not graph.same_component("a", "d")
+        assert graph.same_component("g", "g")
+        assert self._normalized(graph.components()) == [
+            ["a", "b", "c"], ["d", "e", "f"], ["g"]]
+        with pytest.raises(KeyError):
+            graph.component_of("missing")
+    
+    def test_deletions_recompute_only_affected_component(self):
+        """Test ricalcolo pigro della sola componente toccata da una rimozione"""
+        graph = self._sample_graph()
+        graph.enable_component_index()
+        graph.add_edges([("f", "g", "y"), ("g", "f", "x")])
+        assert graph.component_stats()["recomputes"] == 0
+        
+        # Resta un altro arco fra f e g: nessun ricalcolo necessario
+        graph.del_edge("f", "g", "y")
+        assert graph.same_component("d", "g")
+        assert graph.component_stats()["recomputes"] == 0
+        
+        graph.del_edge("d", "e", "x")
+        assert graph.same_component("a", "c")
+        assert graph.component_stats()["recomputes"] == 0
+        assert graph.component_of("e") == {"e", "f", "g"}
+        stats = graph.component_stats()
+        assert stats["recomputes"] == 1
+        assert stats["recomputed_nodes"] == 4
+        
+        graph.del_node("b")
+        graph.add_node(uid="b")
+        assert self._normalized(graph.components()) == [
+            ["a"], ["b"], ["c"], ["d"], ["e", "f", "g"]]
+        graph.add_edge("a", "d", "x")
+        assert graph.component_of("d") == {"a", "d"}
+        graph.disable_component_index()
+        with pytest.raises(ValueError):
+            graph.component_stats()
+    
+    def test_matches_traversal_under_random_mutations(self):
+        """Test indice coerente con la visita dopo modifiche casuali"""
+        import random
+        rng = random.Random(7)
+        graph = BaseGraph()
+        uids = [graph.add_node(uid=f"n{i}") for i in range(40)]
+        graph.enable_component_index()
+        for step in range(300):
+            choice = rng.random()
+            if choice < 0.5:
+                graph.add_edges((rng.choice(uids), rng.choice(uids), rng.choice("xy"))
+                                for _ in range(3))
+            elif choice < 0.9:
+                tipo = rng.choice(list(graph.edges) or ["x"])
+                rows = graph.edges.get(tipo, {})
+                if rows:
+                    v1 = rng.choice(sorted(rows))
+                    graph.del_edge(v1, rng.choice(sorted(rows[v1])), tipo)
+            else:
+                uid = rng.choice(uids)
+                graph.del_node(uid)
+                graph.add_node(uid=uid)
+            if step % 10 == 0:
+                graph._components, index = None, graph._components
+                expected = self._normalized(graph.components())
+                graph._components = index
+                assert self._normalized(graph.components()) == expected
+                a, b = rng.sample(uids, 2)
+                assert graph.same_component(a, b) == (b in graph.component_of(a))
+    
+    def test_bulk_insert_keeps_bulk_path(self):
+        """Test add_edges con l'indice attivo resta un inserimento in blocco"""
+        graph = BaseGraph()
+        for uid in "abcd":
+            graph.add_node(uid=uid)
+        graph.enable_component_index()
+        version = graph._version
+        graph.add_edges([("a", "b", "x"), ("b", "c", "x"), ("a", "b", "x")])
+        assert graph._version == version + 1
+        assert graph.component_of("a") == {"a", "b", "c"}
+        assert graph.num_edges() == 2
+
+
+class TestConcurrentGraph:
+    """Test per il lock lettori/scrittore e l'accesso concorrente al grafo"""
+    
+    def test_readers_share_writer_excludes(self):
+        """Test lettori in parallelo e scrittore esclusivo"""
+        import threading
+        lock = ReadWriteLock()
+        barrier = threading.Barrier(2, timeout=5)
+        
+        def reader():
+            with lock.read():
+                barrier.wait()  # fallisce se i lettori si escludono
+        threads = [threading.Thread(target=reader) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not barrier.broken
+        
+        entered = threading.Event()
+        
+        def late_reader():
+            with lock.read():
+                entered.set()
+        with lock.write():
+            thread = threading.Thread(target=late_reader)
+            thread.start()
+            assert not entered.wait(0.1)
+            # Rientro dello scrittore, anche come lettore
+            with lock.write(), lock.read():
+                pass
+        thread.join()
+        assert entered.is_set()
+        
+        with lock.read():
+            with lock.read():
+                pass
+            with pytest.raises(RuntimeError):
+                lock.acquire_write()
+    
+    def test_wrapper_delegates_and_materializes(self):
+        """Test metodi delegati, risultati copiati e istantanea condivisa"""
+        graph = ConcurrentGraph(BaseGraph(name=""))
+        a = graph.add_node(name="a")
+        b = graph.add_node(name="b")
+        graph.add_edge(a, b, "link")
+        assert graph.bfs(a) == [(a, 0), (b, 1)]
+        view = graph.neighbors_view(a, "link")
+        assert isinstance(view, set) and view == {b}
+        assert graph.num_edges() == 1
+        assert graph.keys == {"name": ""}
+        
+        snapshot = graph.snapshot()
+        assert graph.snapshot() is snapshot
+        with graph.batch() as inner:
+            inner.add_edge(b, a, "link")
+        assert graph.snapshot() is not snapshot
+        assert graph.snapshot().has_edge(b, a, "link")
+    
+    def test_subgraph_is_copied_under_lock(self):
+        """Test subgraph restituisce una copia, non una vista che legge senza lock"""
+        graph = ConcurrentGraph(BaseGraph(name=""))
+        a, b, c = graph.add_nodes({"name": x} for x in "abc")
+        graph.add_edges([(a, b, "link"), (b, c, "link"), (a, c, "other")])
+        sub = graph.subgraph(nodes=[a, b, c], edge_types="link")
+        assert not isinstance(sub, SubgraphView)
+        assert sub.to_dict() == graph.graph.subgraph(edge_types="link").to_dict()
+        graph.add_edge(c, a, "link")
+        assert not sub.has_edge(c, a, "link")
+    
+    def test_async_methods_hold_read_lock(self):
+        """Test le coroutine girano sotto lock in lettura, senza osservatori"""
+        import asyncio
+        import threading
+        graph = ConcurrentGraph(BaseGraph(name=""))
+        graph.add_nodes({"name": str(i)} for i in range(50))
+        observers = []
+        
+        async def copy_while_writing():
+            copy = asyncio.ensure_future(graph.to_dict_async(chunk_size=1))
+            await asyncio.sleep(0)
+            observers.append(list(graph.graph._observers))
+            writer = threading.Thread(target=graph.add_node, kwargs={"name": "late"})
+            writer.start()
+            writer.join(0.05)
+            # Lo scrittore aspetta la fine della copia
+            assert writer.is_alive()
+            data = await copy
+            writer.join()
+            return data
+        
+        data = asyncio.run(copy_while_writing())
+        assert len(data["nodes"]) == 50
+        assert observers == [[]]
+        assert len(graph.nodes) == 51
+        assert graph.graph._observers == []
+    
+    def test_stress_readers_see_consistent_state(self):
+        """Test con più lettori e uno scrittore: nessuno stato a metà"""
+        import random
+        import threading
+        graph = ConcurrentGraph(BaseGraph())
+        uids = graph.add_nodes({} for _ in range(50))
+        errors = []
+        # Tutti i thread partono insieme; i lettori continuano finché lo
+        # scrittore non ha finito le sue modifiche
+        start = threading.Barrier(5, timeout=10)
+        done = threading.Event()
+        
+        def writer():
+            rng = random.Random(0)
+            start.wait()
+            try:
+                for _ in range(2000):
+                    a, b = rng.sample(uids, 2)
+                    # Gli archi "pair" esistono sempre in entrambi i versi
+                    with graph.write() as g:
+                        if g.has_edge(a, b, "pair"):
+                            g.del_edge(a, b, "pair")
+                            g.del_edge(b, a, "pair")
+                        else:
+                            g.add_edge(a, b, "pair")
+                            g.add_edge(b, a, "pair")
+                    if rng.random() < 0.05:
+                        victim = rng.choice(uids[25:])
+                        with graph.write():
+                            graph.del_node(victim)
+                            graph.add_node(uid=victim)
+            except Exception as exc:  # pragma: no cover - riportata sotto
+                errors.append(exc)
+            finally:
+                done.set()
+        
+        def reader(seed):
+            rng = random.Random(seed)
+            try:
+                start.wait()
+                reads = 0
+                while not done.is_set() or reads < 100:
+                    reads += 1
+                    uid = rng.choice(uids)
+                    with graph.read() as g:
+                        for other in g.iter_neighbors(uid, "pair"):
+                            assert uid in g.edges["pair"][other]
+                        assert g.num_edges("pair") % 2 == 0
+                    graph.bfs(uid, "pair", max_depth=2)
+                    graph.get_predecessors(uid)
+            except Exception as exc:  # pragma: no cover - riportata sotto
+                errors.append(exc)
+        
+        threads = [threading.Thread(target=writer)]
+        threads += [threading.Thread(target=reader, args=(seed,)) for seed in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+        assert graph.num_edges() == sum(
+            len(row) for rows in graph.edges.values() for row in rows.values())
+
+
+class TestParallelAnalytics:
+    """Test per le analisi su più processi in memoria condivisa"""
+    
+    def _sample_graph(self):
+        graph = BaseGraph(name="")
+        uids = graph.add_nodes({"name": f"n{i}"} for i in range(8))
+        graph.add_edges([(uids[0], uids[1], "a"), (uids[1], uids[2], "a"),
+                         (uids[2], uids[0], "b"), (uids[3], uids[4], "a"),
+                         (uids[5], uids[4], "b"), (uids[6], uids[7], "b")])
+        return graph, uids
+    
+    def test_multi_source_bfs_matches_bfs(self):
+        """Test distanze parallele uguali alla visita in ampiezza"""
+        graph, uids = self._sample_graph()
+        with ParallelAnalytics(graph, workers=2) as analytics:
+            for direction in ("out", "in", "both"):
+                result = analytics.multi_source_bfs(uids[:4], direction=direction)
+                for source in uids[:4]:
+                    expected = dict(graph.bfs(source, direction=direction))
+                    dist = result[source]
+                    reached = {analytics.node_uid(i): d for i, d in enumerate(dist) if d >= 0}
+                    assert reached == expected
+            limited = analytics.multi_source_bfs(uids[0], max_depth=1)[uids[0]]
+            assert sorted(limited) == [-1] * 6 + [0, 1]
+    
+    def test_degrees_and_neighbor_sum(self):
+        """Test gradi e aggregazione sui vicini"""
+        graph, uids = self._sample_graph()
+        with ParallelAnalytics(graph, workers=2) as analytics:
+            out_degrees, in_degrees = analytics.degrees()
+            values = [float(i) for i in range(8)]
+            sums = analytics.neighbor_sum(values)
+            in_sums = analytics.neighbor_sum(values, direction="in")
+            for node_id in range(8):
+                uid = analytics.node_uid(node_id)
+                assert out_degrees[node_id] == graph.out_degree(uid)
+                assert in_degrees[node_id] == graph.in_degree(uid)
+                ids = [analytics.frozen.node_id(v) for v in graph.iter_neighbors(uid)]
+                assert sums[node_id] == sum(values[i] for i in ids)
+                ids = [analytics.frozen.node_id(v) for v in graph.iter_predecessors(uid)]
+                assert in_sums[node_id] == sum(values[i] for i in ids)
+            with pytest.raises(ValueError):
+                analytics.neighbor_sum(values[:3])
+    
+    def test_connected_components(self):
+        """Test componenti debolmente connesse, anche per tipo"""
+        graph, uids = self._sample_graph()
+        with ParallelAnalytics(graph, workers=2) as analytics:
+            components = analytics.connected_components()
+        assert sorted(map(sorted, components)) == sorted([
+            sorted(uids[0:3]), sorted(uids[3:6]), sorted(uids[6:8])])
+        with ParallelAnalytics(graph, tipi="a", workers=2) as analytics:
+            components = analytics.connected_components()
+            # Dal grafo modificabile vengono copiate solo le adiacenze
+            assert analytics.frozen.edge_types == ("a",)
+            assert len(analytics.frozen.nodes) == 0
+        assert sorted(map(sorted, components)) == sorted(
+            [sorted(uids[0:3]), sorted(uids[3:5])] + [[uid] for uid in uids[5:8]])
+    
+    def test_unknown_source_and_close(self):
+        """Test sorgente sconosciuta e close idempotente"""
+        graph, _ = self._sample_graph()
+        analytics = ParallelAnalytics(graph.freeze(), workers=1)
+        with pytest.raises(KeyError):
+            analytics.multi_source_bfs(["missing"])
+        analytics.close()
+        analytics.close()
+
+
 class TestGraphIntegration:
     """Test di integrazione per scenari complessi"""
     
@@ -519,6 +1853,405 @@ class TestGraphIntegration:
         assert graph.has_edge(person1, person2, "neighbor")
 
 
+class TestBulkInsert:
+    """Test per l'inserimento in blocco di nodi e archi"""
+    
+    def test_add_nodes_returns_uids(self):
+        """Test che add_nodes restituisce gli uid assegnati in ordine"""
+        graph = BaseGraph(name="", value=0)
+        uids = graph.add_nodes([
+            {"name": "A", "value": 1},
+            {"uid": "custom", "name": "B"},
+            {},
+        ])
+        
+        assert uids == ["node-0", "custom", "node-1"]
+        assert graph.nodes["node-0"].value == 1
+        assert graph.nodes["custom"].name == "B"
+    
+    def test_add_nodes_matches_add_node(self):
+        """Test che add_nodes applica le stesse regole di add_node"""
+        rows = [
+            {"uid": "a", "name": "First", "value": "wrong"},
+            {"uid": "a", "name": "Second", "unknown": 1},
+            {"uid": 7, "value": 3},
+        ]
+        single = BaseGraph(name="", value=0)
+        for row in rows:
+            single.add_node(**row)
+        bulk = BaseGraph(name="", value=0)
+        bulk.add_nodes(rows)
+        
+        assert bulk.to_dict() == single.to_dict()
+        assert not hasattr(bulk.nodes["a"], "value")
+        assert "7" in bulk.nodes
+    
+    def test_add_nodes_accepts_generator(self):
+        """Test che add_nodes accetta un iterabile qualsiasi"""
+        graph = BaseGraph(value=0)
+        uids = graph.add_nodes({"value": i} for i in range(5))
+        
+        assert len(uids) == 5
+        assert [graph.nodes[uid].value for uid in uids] == list(range(5))
+    
+    def test_add_edges(self):
+        """Test inserimento in blocco di archi di tipi diversi"""
+        graph = BaseGraph()
+        v1, v2, v3 = graph.add_nodes([{}, {}, {}])
+        
+        graph.add_edges([
+            (v1, v2, "link"),
+            (v2, v3, "link"),
+            (v1, v3, "other"),
+            (v1, v2, "link"),  # duplicato
+        ])
+        
+        assert graph.edges["link"] == {v1: {v2}, v2: {v3}}
+        assert graph.rev_edges["link"] == {v2: {v1}, v3: {v2}}
+        assert graph.has_edge(v1, v3, "other")
+        assert graph.out_types[v1] == {"link", "other"}
+        assert graph.in_types[v3] == {"link", "other"}
+    
+    def test_add_edges_nonexistent_node_raises_error(self):
+        """Test che add_edges solleva gli stessi errori di add_edge"""
+        graph = BaseGraph()
+        v1, v2 = graph.add_nodes([{}, {}])
+        
+        with pytest.raises(KeyError, match="Source node 'missing' does not exist"):
+            graph.add_edges([(v1, v2, "link"), ("missing", v2, "link")])
+        with pytest.raises(KeyError, match="Target node 'missing' does not exist"):
+            graph.add_edges([(v1, v2, "link"), (v1, "missing", "link")])
+        
+        # Nessun arco del blocco deve essere stato inserito
+        assert graph.edges == {}
+        assert graph.rev_edges == {}
+    
+    def test_add_edges_then_del_node(self):
+        """Test che gli archi inseriti in blocco vengono rimossi con il nodo"""
+        graph = BaseGraph()
+        v1, v2, v3 = graph.add_nodes([{}, {}, {}])
+        graph.add_edges([(v1, v2, "a"), (v2, v3, "b"), (v3, v2, "a")])
+        
+        graph.del_node(v2)
+        
+        assert graph.edges == {}
+        assert graph.rev_edges == {}
+        assert graph.out_types == {}
+        assert graph.in_types == {}
+
+
+class TestFrozenGraph:
+    """Test per l'istantanea immutabile in formato CSR"""
+    
+    def _sample_graph(self):
+        graph = BaseGraph(name="", value=0)
+        v1, v2, v3, v4 = graph.add_nodes([
+            {"name": "A", "value": 1},
+            {"name": "B", "value": 2},
+            {"name": "C"},
+            {"uid": "isolated"},
+        ])
+        graph.add_edges([
+            (v1, v2, "link"),
+            (v1, v3, "link"),
+            (v2, v3, "link"),
+            (v3, v1, "other"),
+            (v2, v2, "other"),
+        ])
+        return graph
+    
+    def test_freeze_returns_frozen_graph(self):
+        """Test che freeze restituisce un FrozenGraph"""
+        frozen = self._sample_graph().freeze()
+        assert isinstance(frozen, FrozenGraph)
+        assert set(frozen.edge_types) == {"link", "other"}
+        assert len(frozen.uids) == 4
+    
+    def test_frozen_matches_graph(self):
+        """Test che l'istantanea risponde come il grafo originale"""
+        graph = self._sample_graph()
+        frozen = graph.freeze()
+        
+        for uid in graph.nodes:
+            for tipo in (None, "link", "other", "missing"):
+                assert frozen.get_neighbors(uid, tipo) == graph.get_neighbors(uid, tipo)
+                assert frozen.get_predecessors(uid, tipo) == graph.get_predecessors(uid, tipo)
+            for other in graph.nodes:
+                for tipo in ("link", "other", "missing"):
+                    assert frozen.has_edge(uid, other, tipo) == graph.has_edge(uid, other, tipo)
+    
+    def test_frozen_int_id_variants(self):
+        """Test delle varianti su interi densi"""
+        frozen = self._sample_graph().freeze()
+        a = frozen.node_id("node-0")
+        b = frozen.node_id("node-1")
+        c = frozen.node_id("node-2")
+        
+        assert sorted(frozen.neighbor_ids(a, "link")) == sorted([b, c])
+        assert list(frozen.predecessor_ids(c, "link")) == sorted([a, b])
+        assert list(frozen.neighbor_ids(a, "missing")) == []
+        assert frozen.has_edge_ids(a, b, "link")
+        assert not frozen.has_edge_ids(b, a, "link")
+        assert frozen.node_uid(b) == "node-1"
+    
+    def test_frozen_nonexistent_node(self):
+        """Test che nodi inesistenti sollevano errore come in BaseGraph"""
+        frozen = self._sample_graph().freeze()
+        
+        with pytest.raises(KeyError, match="does not exist"):
+            frozen.get_neighbors("nonexistent")
+        with pytest.raises(KeyError, match="does not exist"):
+            frozen.get_predecessors("nonexistent")
+        assert not frozen.has_edge("nonexistent", "node-0", "link")
+    
+    def test_frozen_is_independent_snapshot(self):
+        """Test che modifiche al grafo non si riflettono sull'istantanea"""
+        graph = self._sample_graph()
+        frozen = graph.freeze()
+        
+        graph.modify_node("node-0", name="Changed")
+        graph.del_edge("node-0", "node-1", "link")
+        
+        assert frozen.nodes["node-0"].name == "A"
+        assert frozen.has_edge("node-0", "node-1", "link")
+        with pytest.raises(TypeError):
+            frozen.nodes["new"] = Node("new")
+    
+    def test_frozen_thaw_roundtrip(self):
+        """Test che thaw ricostruisce un grafo equivalente"""
+        graph = self._sample_graph()
+        restored = graph.freeze().thaw()
+        
+        original = graph.to_dict()
+        result = restored.to_dict()
+        assert result['keys'] == original['keys']
+        assert result['progress'] == original['progress']
+        assert result['nodes'] == original['nodes']
+        for tipo, edges_dict in original['edges'].items():
+            for v1, v2_list in edges_dict.items():
+                assert sorted(result['edges'][tipo][v1]) == sorted(v2_list)
+    
+    def test_freeze_empty_graph(self):
+        """Test istantanea di un grafo vuoto"""
+        frozen = BaseGraph().freeze()
+        assert frozen.uids == []
+        assert frozen.edge_types == ()
+
+
+class TestColumnarGraph:
+    """Test per la memorizzazione a colonne degli attributi dei nodi"""
+    
+    def test_columnar_add_and_read_attributes(self):
+        """Test lettura degli attributi tipizzati tramite la vista"""
+        graph = ColumnarGraph(name="", value=0, score=0.0, active=True)
+        uid = graph.add_node(name="Task", value=42, score=1.5, active=False)
+        
+        node = graph.nodes[uid]
+        assert node.uid == uid
+        assert node.name == "Task"
+        assert node.value == 42
+        assert node.score == 1.5
+        assert node.active is False
+        assert not hasattr(node, "__dict__")
+    
+    def test_columnar_matches_base_graph(self):
+        """Test che to_dict coincide con quello di BaseGraph"""
+        rows = [
+            {"name": "A", "value": 1, "active": True},
+            {"name": "B", "invalid": 3},
+            {"uid": "c", "value": "wrong", "active": False},
+            {},
+        ]
+        base = BaseGraph(name="", value=0, active=True)
+        columnar = ColumnarGraph(name="", value=0, active=True)
+        for graph in (base, columnar):
+            graph.add_nodes(rows)
+            graph.modify_node("node-0", name="A2", value=10)
+            graph.modify_node("c", active=True, unknown="x")
+            graph.add_edge("node-0", "c", "link")
+        
+        assert columnar.to_dict() == base.to_dict()
+        assert not hasattr(columnar.nodes["node-1"], "value")
+        assert not hasattr(columnar.nodes["node-1"], "invalid")
+    
+    def test_columnar_del_node_reuses_row(self):
+        """Test che la riga di un nodo rimosso viene riutilizzata pulita"""
+        graph = ColumnarGraph(name="", value=0)
+        v1 = graph.add_node(name="First", value=1)
+        graph.add_node(name="Second")
+        graph.del_node(v1)
+        
+        v3 = graph.add_node(name="Third")
+        assert graph.store.size == 2
+        assert graph.nodes[v3].to_dict() == {'uid': v3, 'attributes': {'name': "Third"}}
+    
+    def test_columnar_add_property(self):
+        """Test che add_property aggiunge una colonna ai nodi esistenti"""
+        graph = ColumnarGraph(name="")
+        uid = graph.add_node(name="A")
+        graph.add_property("weight", 0.0)
+        
+        assert not hasattr(graph.nodes[uid], "weight")
+        graph.modify_node(uid, weight=2.5)
+        assert graph.nodes[uid].weight == 2.5
+    
+    def test_columnar_values_outside_column_type(self):
+        """Test che valori non rappresentabili nella colonna restano intatti"""
+        graph = ColumnarGraph(value=0)
+        big = graph.add_node(value=2 ** 70)
+        flag = graph.add_node(value=True)
+        small = graph.add_node(value=5)
+        
+        assert graph.nodes[big].value == 2 ** 70
+        assert graph.nodes[flag].value is True
+        assert graph.nodes[small].value == 5
+    
+    def test_columnar_strings_are_interned(self):
+        """Test che stringhe uguali condividono una sola voce di tabella"""
+        graph = ColumnarGraph(status="")
+        graph.add_nodes({"status": "todo"} for _ in range(100))
+        
+        assert graph.store.columns["status"].table == ["todo"]
+    
+    def test_columnar_json_roundtrip(self):
+        """Test salvataggio e caricamento JSON di un ColumnarGraph"""
+        graph = ColumnarGraph(name="", value=0, active=True)
+        v1 = graph.add_node(name="A", value=1, active=True)
+        v2 = graph.add_node(name="B", active=False)
+        graph.add_edge(v1, v2, "link")
+        
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json') as f:
+            filepath = f.name
+        try:
+            graph.save_json(filepath)
+            restored = ColumnarGraph.load_json(filepath)
+            
+            assert isinstance(restored, ColumnarGraph)
+            assert restored.to_dict() == graph.to_dict()
+            assert restored.nodes[v2].active is False
+        finally:
+            os.remove(filepath)
+    
+    def test_columnar_attributes_outside_schema(self):
+        """Test che gli attributi fuori schema finiscono in una colonna di oggetti"""
+        data = {
+            'keys': {'name': ''},
+            'progress': 2,
+            'nodes': {'a': {'uid': 'a', 'attributes': {'name': 'x', 'extra': 1}},
+                      'b': {'uid': 'b', 'attributes': {'name': 'y'}}},
+            'edges': {},
+        }
+        graph = ColumnarGraph.from_dict(data)
+        
+        assert graph.nodes['a'].extra == 1
+        assert not hasattr(graph.nodes['b'], 'extra')
+        assert graph.to_dict()['nodes'] == BaseGraph.from_dict(data).to_dict()['nodes']
+        
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.jsonl') as f:
+            filepath = f.name
+        try:
+            graph.save_jsonl(filepath)
+            assert ColumnarGraph.load_jsonl(filepath).to_dict() == graph.to_dict()
+        finally:
+            os.remove(filepath)
+        
+        # Aggiungere la chiave allo schema non perde i valori già presenti
+        graph.add_property('extra', 0)
+        assert graph.nodes['a'].extra == 1
+    
+    def test_columnar_node_equals_plain_node(self):
+        """Test che la vista e un Node con lo stesso uid sono uguali"""
+        graph = ColumnarGraph(name="")
+        uid = graph.add_node(name="A")
+        assert graph.nodes[uid] == Node(uid)
+        assert hash(graph.nodes[uid]) == hash(Node(uid))
+
+
+class TestSlottedGraph:
+    """Test per i nodi con __slots__ generati dallo schema"""
+    
+    def test_slotted_nodes_have_no_dict(self):
+        """Test che i nodi non hanno un __dict__ per istanza"""
+        graph = SlottedGraph(name="", value=0)
+        uid = graph.add_node(name="A", value=1, invalid_key="Ignored")
+        
+        node = graph.nodes[uid]
+        assert node.name == "A"
+        assert node.value == 1
+        assert not hasattr(node, "__dict__")
+        assert not hasattr(node, "invalid_key")
+        assert type(node).__slots__ == ("name", "value")
+    
+    def test_slotted_matches_base_graph(self):
+        """Test che to_dict e modify_node si comportano come in BaseGraph"""
+        base = BaseGraph(name="", value=0, active=True)
+        slotted = SlottedGraph(name="", value=0, active=True)
+        for graph in (base, slotted):
+            v1 = graph.add_node(name="A", value=1)
+            graph.add_node(active=False)
+            graph.modify_node(v1, value=5, active=True)
+        
+        assert slotted.to_dict() == base.to_dict()
+        assert slotted.nodes["node-1"].to_dict() == {
+            'uid': "node-1", 'attributes': {'active': False}
+        }
+    
+    def test_slotted_add_property_rebuilds_class(self):
+        """Test che add_property rigenera la classe e migra i nodi"""
+        graph = SlottedGraph(name="")
+        uid = graph.add_node(name="A")
+        old_class = graph.node_class
+        
+        graph.add_property("weight", 0.0)
+        graph.modify_node(uid, weight=1.5)
+        
+        assert graph.node_class is not old_class
+        assert isinstance(graph.nodes[uid], graph.node_class)
+        assert graph.nodes[uid].name == "A"
+        assert graph.nodes[uid].weight == 1.5
+    
+    def test_slotted_class_shared_by_schema(self):
+        """Test che grafi con lo stesso schema condividono la classe"""
+        assert SlottedGraph(a=0, b="").node_class is SlottedGraph(a=0, b="").node_class
+    
+    def test_slotted_graphml_roundtrip(self):
+        """Test export/import GraphML con nodi a slot"""
+        graph = SlottedGraph(name="", priority=0, active=True)
+        n1 = graph.add_node(name="Node 1", priority=1, active=False)
+        n2 = graph.add_node(name="Node 2")
+        graph.add_edge(n1, n2, "connects")
+        
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.graphml') as f:
+            filepath = f.name
+        try:
+            graph.export_graphml(filepath)
+            restored = BaseGraph.import_graphml(filepath)
+            
+            assert restored.nodes[n1].to_dict() == graph.nodes[n1].to_dict()
+            assert restored.nodes[n2].to_dict() == graph.nodes[n2].to_dict()
+            assert restored.has_edge(n1, n2, "connects")
+        finally:
+            os.remove(filepath)
+    
+    def test_slotted_class_tracks_schema(self):
+        """Test che la classe dei nodi segue lo schema ed è condivisa tra grafi"""
+        graph = SlottedGraph(name="", value=0)
+        other = SlottedGraph(name="", value=0)
+        assert graph.node_class is other.node_class
+        assert graph.node_class.__slots__ == ("name", "value")
+        uid = graph.add_node(name="A")
+        
+        with pytest.raises(RuntimeError):
+            with graph.batch():
+                graph.add_property("weight", 0.0)
+                assert graph.node_class.__slots__ == ("name", "value", "weight")
+                raise RuntimeError("abort")
+        
+        assert graph.node_class is other.node_class
+        assert type(graph.nodes[uid]) is graph.node_class
+        assert not hasattr(graph.nodes[uid], "__dict__")
+        assert graph.nodes[uid].name == "A"
+
 class TestNodeSerialization:
     """Test per la serializzazione dei nodi"""
     
@@ -776,6 +2509,430 @@ class TestJSONSerialization:
                 os.remove(filepath)
 
 
+class TestJSONLinesSerialization:
+    """Test per il formato JSON Lines in streaming"""
+    
+    def _sample_graph(self):
+        graph = BaseGraph(name="", value=0, active=True)
+        v1 = graph.add_node(name="Città", value=1, active=True)
+        v2 = graph.add_node(name="B", active=False)
+        v3 = graph.add_node(uid="custom")
+        graph.add_edge(v1, v2, "link")
+        graph.add_edge(v1, v3, "link")
+        graph.add_edge(v3, v1, "back")
+        return graph
+    
+    def test_save_jsonl_one_record_per_line(self):
+        """Test che ogni riga è un record JSON con intestazione in testa"""
+        graph = self._sample_graph()
+        
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.jsonl') as f:
+            filepath = f.name
+        try:
+            graph.save_jsonl(filepath)
+            with open(filepath, 'r', encoding='utf-8') as f:
+                records = [json.loads(line) for line in f]
+            
+            assert records[0] == {
+                'record': 'graph',
+                'keys': {"name": "", "value": 0, "active": True},
+                'progress': 2,
+            }
+            kinds = [record['record'] for record in records[1:]]
+            assert kinds == ['node'] * 3 + ['edges'] * 2
+            assert records[1]['attributes']['name'] == "Città"
+        finally:
+            os.remove(filepath)
+    
+    def test_save_load_jsonl_roundtrip(self):
+        """Test ciclo completo save_jsonl/load_jsonl"""
+        graph = self._sample_graph()
+        
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.jsonl') as f:
+            filepath = f.name
+        try:
+            graph.save_jsonl(filepath)
+            restored = BaseGraph.load_jsonl(filepath)
+            
+            assert restored.to_dict()['nodes'] == graph.to_dict()['nodes']
+            assert restored.keys == graph.keys
+            assert restored.progress == graph.progress
+            assert restored.get_neighbors("node-0", "link") == {"node-1", "custom"}
+            assert restored.get_predecessors("node-0") == {"custom"}
+        finally:
+            os.remove(filepath)
+    
+    def test_load_jsonl_into_columnar_graph(self):
+        """Test caricamento JSON Lines in una sottoclasse"""
+        graph = self._sample_graph()
+        
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.jsonl') as f:
+            filepath = f.name
+        try:
+            graph.save_jsonl(filepath)
+            restored = ColumnarGraph.load_jsonl(filepath)
+            
+            assert isinstance(restored, ColumnarGraph)
+            assert restored.nodes["node-1"].active is False
+        finally:
+            os.remove(filepath)
+    
+    def test_records_roundtrip_empty_graph(self):
+        """Test to_records/from_records su grafo vuoto"""
+        restored = BaseGraph.from_records(BaseGraph(name="").to_records())
+        assert restored.keys == {"name": ""}
+        assert restored.nodes == {}
+    
+    def test_from_records_requires_header(self):
+        """Test che manca l'intestazione solleva errore"""
+        with pytest.raises(ValueError, match="header"):
+            BaseGraph.from_records([])
+        with pytest.raises(ValueError, match="header"):
+            BaseGraph.from_records([{'record': 'node', 'uid': "a", 'attributes': {}}])
+    
+    def test_from_records_unknown_record(self):
+        """Test che un record sconosciuto solleva errore"""
+        records = [{'record': 'graph', 'keys': {}, 'progress': 0}, {'record': 'bogus'}]
+        with pytest.raises(ValueError, match="bogus"):
+            BaseGraph.from_records(records)
+
+
+class TestMutationJournal:
+    """Test per il journal delle modifiche, la riapertura e la compattazione"""
+    
+    def _mutate(self, graph):
+        v1 = graph.add_node(name="Città", value=1)
+        v2 = graph.add_node(name="B")
+        v3 = graph.add_node(uid="custom")
+        graph.add_edges([(v1, v2, "link"), (v1, v3, "link"), (v3, v1, "back")])
+        graph.modify_node(v2, value=7)
+        graph.del_edge(v1, v3, "link")
+        graph.add_property("active", True)
+        graph.add_node(active=False)
+        graph.del_node(v3)
+        return graph
+    
+    def _log_lines(self, path):
+        with open(path + ".wal", "r", encoding="utf-8") as f:
+            return f.readlines()
+    
+    def test_open_replays_journal(self):
+        """Test che riaprire senza compattare riapplica tutte le modifiche"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "graph.jsonl")
+            graph = self._mutate(BaseGraph.open(path, keys={"name": "", "value": 0}))
+            graph.close_journal()
+            # Il journal contiene solo le modifiche, una per riga
+            assert len(self._log_lines(path)) == 12
+            
+            reopened = BaseGraph.open(path)
+            assert reopened.to_dict() == graph.to_dict()
+            assert reopened.next_auto_uid() == graph.next_auto_uid()
+            reopened.add_edge("node-0", "node-1", "late")
+            reopened.close_journal()
+            assert BaseGraph.open(path).has_edge("node-0", "node-1", "late")
+    
+    def test_compact_writes_snapshot_and_truncates_log(self):
+        """Test compattazione e journal di una generazione precedente"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "graph.jsonl")
+            graph = BaseGraph(name="", value=0)
+            graph.enable_journal(path, fsync="always")
+            self._mutate(graph)
+            with open(path + ".wal", "r", encoding="utf-8") as f:
+                stale_log = f.read()
+            
+            graph.compact()
+            assert len(self._log_lines(path)) == 1
+            graph.close_journal()
+            assert BaseGraph.open(path).to_dict() == graph.to_dict()
+            
+            # Crash tra istantanea e svuotamento: il journal vecchio è ignorato
+            with open(path + ".wal", "w", encoding="utf-8") as f:
+                f.write(stale_log)
+            assert BaseGraph.open(path).to_dict() == graph.to_dict()
+    
+    def test_truncated_tail_is_discarded(self):
+        """Test che un'ultima riga interrotta non viene applicata né corrompe il log"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "graph.jsonl")
+            graph = BaseGraph.open(path, fsync="never")
+            graph.add_node(uid="a")
+            graph.close_journal()
+            with open(path + ".wal", "a", encoding="utf-8") as f:
+                f.write('["n","b",{},')
+            
+            reopened = BaseGraph.open(path)
+            assert list(reopened.nodes) == ["a"]
+            reopened.add_node(uid="c")
+            reopened.close_journal()
+            assert list(BaseGraph.open(path).nodes) == ["a", "c"]
+    
+    def test_rolled_back_batch_is_not_replayed(self):
+        """Test che chiavi e attributi annullati da un batch non tornano riaprendo"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "graph.jsonl")
+            graph = BaseGraph.open(path, keys={"name": "", "value": 0})
+            graph.add_node(uid="a", value=1)
+            with pytest.raises(RuntimeError):
+                with graph.batch():
+                    graph.add_property("k", 0)
+                    graph.modify_node("a", name="temp")
+                    graph.add_node(value=2)
+                    raise RuntimeError("abort")
+            assert "k" not in graph.keys
+            assert not hasattr(graph.nodes["a"], "name")
+            assert graph.progress == 0
+            graph.close_journal()
+            
+            reopened = BaseGraph.open(path)
+            assert reopened.to_dict() == graph.to_dict()
+            assert "k" not in reopened.keys
+            assert not hasattr(reopened.nodes["a"], "name")
+            # Gli uid automatici restano allineati dopo l'annullamento
+            assert reopened.progress == graph.progress == 0
+            assert reopened.add_node() == graph.add_node()
+    
+    def test_journal_errors(self):
+        """Test policy sconosciuta, journal doppio o assente"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "graph.jsonl")
+            graph = BaseGraph()
+            with pytest.raises(ValueError):
+                graph.compact()
+            with pytest.raises(ValueError, match="fsync"):
+                graph.enable_journal(path, fsync="sometimes")
+            graph.enable_journal(path)
+            with pytest.raises(ValueError):
+                graph.enable_journal(path)
+            graph.close_journal()
+            with pytest.raises(ValueError):
+                graph.sync()
+
+
+class TestDeltaSnapshots:
+    """Test per il tracciamento delle modifiche e i salvataggi incrementali"""
+    
+    def _base_graph(self):
+        graph = BaseGraph(name="", value=0)
+        uids = graph.add_nodes({"name": f"n{i}", "value": i} for i in range(20))
+        graph.add_edges((uids[i], uids[(i + 1) % 20], "link") for i in range(20))
+        graph.add_edge(uids[0], uids[5], "other")
+        return graph, uids
+    
+    def test_delta_contains_only_changes(self):
+        """Test che il delta contiene solo nodi, righe e chiavi modificati"""
+        graph, uids = self._base_graph()
+        graph.enable_dirty_tracking()
+        assert list(graph.to_delta_records()) == [
+            {"record": "delta", "keys": {}, "progress": 20}
+        ]
+        
+        graph.modify_node(uids[3], value=99)
+        graph.add_edge(uids[3], uids[7], "link")
+        graph.del_node(uids[10])
+        graph.add_property("active", True)
+        records = list(graph.to_delta_records())
+        assert records[0]["keys"] == {"active": True}
+        assert {"record": "del_node", "uid": uids[10]} in records
+        assert [r["uid"] for r in records if r["record"] == "node"] == [uids[3]]
+        rows = [r for r in records if r["record"] == "edges"]
+        assert len(rows) == 1
+        assert sorted(rows[0]["targets"]) == sorted([uids[4], uids[7]])
+        
+        with pytest.raises(ValueError):
+            list(BaseGraph().to_delta_records())
+    
+    def test_delta_after_rolled_back_batch(self):
+        """Test che un delta salvato dopo un batch annullato rispecchia il grafo"""
+        graph, uids = self._base_graph()
+        with tempfile.TemporaryDirectory() as tmp:
+            base_path = os.path.join(tmp, "base.json")
+            delta_path = os.path.join(tmp, "delta.jsonl")
+            graph.add_property("note", "")
+            graph.save_json(base_path)
+            graph.enable_dirty_tracking()
+            with pytest.raises(RuntimeError):
+                with graph.batch():
+                    graph.add_property("k", 0)
+                    graph.modify_node(uids[0], note="temp", value=50)
+                    raise RuntimeError("abort")
+            with graph.batch():
+                graph.modify_node(uids[1], note="kept")
+            graph.save_delta(delta_path)
+            
+            restored = BaseGraph.load_with_deltas(base_path, [delta_path])
+            assert restored.to_dict() == graph.to_dict()
+            assert "k" not in restored.keys
+            assert not hasattr(restored.nodes[uids[0]], "note")
+    
+    def test_load_with_deltas_and_merge(self):
+        """Test catena di delta riapplicata e ricomposta in un'istantanea"""
+        graph, uids = self._base_graph()
+        with tempfile.TemporaryDirectory() as tmp:
+            base = os.path.join(tmp, "base.jsonl")
+            graph.enable_dirty_tracking()
+            graph.save_jsonl(base)
+            
+            graph.modify_node(uids[1], name="changed")
+            graph.del_edge(uids[0], uids[5], "other")
+            graph.del_node(uids[2])
+            delta1 = os.path.join(tmp, "delta1.jsonl")
+            graph.save_delta(delta1)
+            
+            # Un uid rimosso e ricreato, un nodo nuovo con archi
+            graph.del_node(uids[4])
+            graph.add_node(uid=uids[4], name="again")
+            fresh = graph.add_node(name="fresh")
+            graph.add_edges([(fresh, uids[4], "link"), (uids[4], uids[1], "link")])
+            graph.add_property("active", False)
+            graph.modify_node(fresh, active=True)
+            delta2 = os.path.join(tmp, "delta2.jsonl")
+            graph.save_delta(delta2)
+            assert len(list(graph.to_delta_records())) == 1
+            
+            loaded = BaseGraph.load_with_deltas(base, [delta1, delta2])
+            assert loaded.to_dict() == graph.to_dict()
+            assert loaded.num_edges() == graph.num_edges()
+            
+            merged_path = os.path.join(tmp, "merged.json")
+            BaseGraph.merge_deltas(base, [delta1, delta2], merged_path)
+            assert BaseGraph.load_json(merged_path).to_dict() == graph.to_dict()
+    
+    def test_save_resets_tracking(self):
+        """Test che un salvataggio completo azzera le modifiche tracciate"""
+        graph, uids = self._base_graph()
+        graph.enable_dirty_tracking()
+        graph.modify_node(uids[0], value=5)
+        with tempfile.TemporaryDirectory() as tmp:
+            graph.save_json(os.path.join(tmp, "full.json"))
+        assert len(list(graph.to_delta_records())) == 1
+    
+    def test_apply_delta_requires_header(self):
+        """Test errore su record delta senza intestazione"""
+        graph, _ = self._base_graph()
+        with pytest.raises(ValueError, match="header"):
+            graph.apply_delta_records([{"record": "node", "uid": "x", "attributes": {}}])
+        with pytest.raises(ValueError, match="Unknown record"):
+            graph.apply_delta_records([{"record": "delta", "keys": {}, "progress": 0},
+                                       {"record": "bogus"}])
+
+
+class TestAsyncPersistence:
+    """Test per le varianti asyncio di salvataggio e caricamento"""
+    
+    def _sample_graph(self):
+        graph = BaseGraph(name="", value=0)
+        uids = graph.add_nodes({"name": f"n{i}", "value": i} for i in range(10))
+        graph.add_edges((uids[i], uids[(i + 3) % 10], "link") for i in range(10))
+        return graph, uids
+    
+    def test_async_round_trips(self):
+        """Test salvataggio e caricamento asincroni nei tre formati"""
+        import asyncio
+        graph, _ = self._sample_graph()
+        expected = graph.to_dict()
+        
+        async def round_trip(tmp):
+            json_path = os.path.join(tmp, "graph.json")
+            jsonl_path = os.path.join(tmp, "graph.jsonl")
+            graphml_path = os.path.join(tmp, "graph.graphml")
+            await asyncio.gather(
+                graph.save_json_async(json_path),
+                graph.save_jsonl_async(jsonl_path),
+                graph.export_graphml_async(graphml_path),
+            )
+            return await asyncio.gather(
+                BaseGraph.load_json_async(json_path),
+                BaseGraph.load_jsonl_async(jsonl_path),
+                BaseGraph.import_graphml_async(graphml_path),
+            )
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            from_json, from_jsonl, from_graphml = asyncio.run(round_trip(tmp))
+        assert from_json.to_dict() == expected
+        assert from_jsonl.to_dict() == expected
+        assert from_graphml.to_dict()["edges"] == expected["edges"]
+    
+    def test_save_writes_state_at_call_time(self):
+        """Test che modifiche concorrenti non finiscono nel file né si perdono"""
+        import asyncio
+        graph, uids = self._sample_graph()
+        graph.enable_dirty_tracking()
+        graph.modify_node(uids[0], value=100)
+        expected = graph.to_dict()
+        
+        async def save_while_mutating(path):
+            save = asyncio.ensure_future(graph.save_json_async(path))
+            await asyncio.sleep(0)
+            graph.modify_node(uids[1], value=200)
+            graph.add_edge(uids[1], uids[2], "late")
+            await save
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "graph.json")
+            asyncio.run(save_while_mutating(path))
+            assert BaseGraph.load_json(path).to_dict() == expected
+        records = list(graph.to_delta_records())
+        assert [r["uid"] for r in records if r["record"] == "node"] == [uids[1]]
+        assert [r["tipo"] for r in records if r["record"] == "edges"] == ["late"]
+    
+    def test_chunked_copy_stays_consistent(self):
+        """Test che una modifica durante la copia a blocchi non produce stati misti"""
+        import asyncio
+        graph, uids = self._sample_graph()
+        
+        async def copy_while_mutating():
+            copy = asyncio.ensure_future(graph.to_dict_async(chunk_size=2))
+            await asyncio.sleep(0)
+            graph.modify_node(uids[0], value=100)
+            graph.del_edge(uids[9], uids[2], "link")
+            return await copy
+        
+        assert asyncio.run(graph.to_dict_async()) == graph.to_dict()
+        copied = asyncio.run(copy_while_mutating())
+        assert copied == graph.to_dict()
+        # Anche la copia rifatta non condivide lo schema vivo
+        assert copied["keys"] is not graph.keys
+        assert graph._observers == []
+    
+    def test_async_files_match_sync_files(self):
+        """Test stessi byte di save_jsonl ed export_graphml, senza ricostruire il grafo"""
+        import asyncio
+        graph, _ = self._sample_graph()
+        graph.add_node(uid="bare")
+        
+        def read(path):
+            with open(path, "rb") as f:
+                return f.read()
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = {name: os.path.join(tmp, name) for name in
+                     ("sync.jsonl", "async.jsonl", "sync.graphml", "async.graphml")}
+            graph.save_jsonl(paths["sync.jsonl"])
+            graph.export_graphml(paths["sync.graphml"], indent="")
+            asyncio.run(graph.save_jsonl_async(paths["async.jsonl"]))
+            asyncio.run(graph.export_graphml_async(paths["async.graphml"], indent=""))
+            assert read(paths["async.jsonl"]) == read(paths["sync.jsonl"])
+            assert read(paths["async.graphml"]) == read(paths["sync.graphml"])
+    
+    def test_failed_save_keeps_dirty_changes(self):
+        """Test che un salvataggio fallito non perde le modifiche tracciate"""
+        import asyncio
+        graph, uids = self._sample_graph()
+        graph.enable_dirty_tracking()
+        graph.modify_node(uids[0], value=100)
+        graph.del_node(uids[5])
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "missing", "graph.json")
+            with pytest.raises(FileNotFoundError):
+                asyncio.run(graph.save_json_async(path))
+        records = list(graph.to_delta_records())
+        assert {"record": "del_node", "uid": uids[5]} in records
+        assert [r["uid"] for r in records if r["record"] == "node"] == [uids[0]]
+
+
 class TestGraphMLSerialization:
     """Test per export/import GraphML"""
     
@@ -946,6 +3103,283 @@ class TestGraphMLSerialization:
                 os.remove(filepath)
 
 
+class TestGraphMLStreamingExport:
+    """Test per l'esportazione GraphML in streaming"""
+    
+    def _export(self, graph, **kwargs):
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.graphml') as f:
+            filepath = f.name
+        try:
+            graph.export_graphml(filepath, **kwargs)
+            with open(filepath, 'r', encoding='utf-8') as f:
+                content = f.read()
+            restored = BaseGraph.import_graphml(filepath)
+        finally:
+            os.remove(filepath)
+        return content, restored
+    
+    def test_export_escapes_special_characters(self):
+        """Test che caratteri speciali in valori e uid sopravvivono al ciclo"""
+        graph = BaseGraph(name="")
+        v1 = graph.add_node(uid='a "quoted" <uid>', name='A & <b> "q"')
+        v2 = graph.add_node(uid="tab\tnew\nline", name="riga 1\n  riga 2")
+        graph.add_edge(v1, v2, "dipende & <da>")
+        
+        content, restored = self._export(graph)
+        
+        assert "&amp; &lt;b&gt;" in content
+        assert restored.nodes[v1].name == 'A & <b> "q"'
+        assert restored.nodes[v2].name == "riga 1\n  riga 2"
+        assert restored.has_edge(v1, v2, "dipende & <da>")
+    
+    def test_export_empty_string_roundtrip(self):
+        """Test che le stringhe vuote vengono reimportate come tali"""
+        graph = BaseGraph(name="")
+        uid = graph.add_node(name="")
+        
+        _, restored = self._export(graph)
+        assert restored.nodes[uid].name == ""
+    
+    def test_export_without_indentation(self):
+        """Test esportazione compatta senza indentazione"""
+        graph = BaseGraph(name="", value=0)
+        v1 = graph.add_node(name="A", value=1)
+        v2 = graph.add_node(name="B")
+        graph.add_edge(v1, v2, "link")
+        
+        content, restored = self._export(graph, indent=None)
+        
+        assert "\n" not in content
+        assert restored.to_dict()['nodes'] == graph.to_dict()['nodes']
+        assert restored.to_dict()['edges'] == graph.to_dict()['edges']
+    
+    def test_export_indented_layout(self):
+        """Test che l'indentazione segue la profondità degli elementi"""
+        graph = BaseGraph(name="")
+        graph.add_node(name="A")
+        graph.add_node()
+        
+        content, _ = self._export(graph, indent="\t")
+        lines = content.split("\n")
+        
+        assert lines[0] == '<?xml version="1.0" ?>'
+        assert '\t\t<node id="node-0">' in lines
+        assert '\t\t\t<data key="k0">A</data>' in lines
+        assert '\t\t<node id="node-1"/>' in lines
+        assert lines[-1] == '</graphml>'
+
+
+class TestGraphMLStreamingImport:
+    """Test per l'importazione GraphML in streaming"""
+    
+    def _import(self, content, **kwargs):
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.graphml',
+                                         encoding='utf-8') as f:
+            f.write(content)
+            filepath = f.name
+        try:
+            return BaseGraph.import_graphml(filepath, **kwargs)
+        finally:
+            os.remove(filepath)
+    
+    def test_import_in_small_batches(self):
+        """Test che l'inserimento a blocchi produce lo stesso grafo"""
+        graph = BaseGraph(name="", value=0)
+        uids = graph.add_nodes({"name": f"N{i}", "value": i} for i in range(25))
+        graph.add_edges((uids[i], uids[(i * 7) % 25], "link") for i in range(25))
+        
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.graphml') as f:
+            filepath = f.name
+        try:
+            graph.export_graphml(filepath)
+            restored = BaseGraph.import_graphml(filepath, batch_size=3)
+        finally:
+            os.remove(filepath)
+        
+        assert restored.to_dict()['nodes'] == graph.to_dict()['nodes']
+        for uid in uids:
+            assert restored.get_neighbors(uid, "link") == graph.get_neighbors(uid, "link")
+    
+    def test_import_edges_before_nodes(self):
+        """Test che archi dichiarati prima dei nodi vengono inseriti"""
+        content = """<?xml version="1.0" ?>
+<graphml xmlns="http://graphml.graphdrawing.org/xmlns">
+  <key id="d0" for="node" attr.name="name" attr.type="string"/>
+  <key id="t" for="edge" attr.name="type" attr.type="string"/>
+  <graph id="G" edgedefault="directed">
+    <edge source="a" target="b"><data key="t">dep</data></edge>
+    <node id="a"><data key="d0">A</data></node>
+    <node id="b"/>
+  </graph>
+</graphml>"""
+        graph = self._import(content, batch_size=1)
+        
+        assert graph.nodes["a"].name == "A"
+        assert graph.has_edge("a", "b", "dep")
+    
+    def test_import_without_namespace_and_edge_type(self):
+        """Test file senza namespace e senza chiave per il tipo di arco"""
+        content = """<graphml>
+  <key id="d0" for="node" attr.name="weight" attr.type="double"/>
+  <graph id="G">
+    <node id="a"><data key="d0">1.5</data></node>
+    <node id="b"/>
+    <edge source="a" target="b"/>
+  </graph>
+</graphml>"""
+        graph = self._import(content)
+        
+        assert graph.keys == {"weight": 0.0}
+        assert graph.nodes["a"].weight == 1.5
+        assert graph.has_edge("a", "b", "default")
+    
+    def test_import_edge_to_missing_node_raises_error(self):
+        """Test che un arco verso un nodo inesistente solleva errore"""
+        content = """<graphml xmlns="http://graphml.graphdrawing.org/xmlns">
+  <graph id="G">
+    <node id="a"/>
+    <edge source="a" target="missing"/>
+  </graph>
+</graphml>"""
+        with pytest.raises(KeyError, match="does not exist"):
+            self._import(content)
+    
+    def test_import_without_graph_element(self):
+        """Test file con sole chiavi: grafo vuoto con lo schema"""
+        content = """<graphml xmlns="http://graphml.graphdrawing.org/xmlns">
+  <key id="d0" for="node" attr.name="active" attr.type="boolean"/>
+</graphml>"""
+        graph = self._import(content)
+        
+        assert graph.keys == {"active": True}
+        assert graph.nodes == {}
+
+
+class TestBinarySnapshot:
+    """Test per il formato binario mappato in memoria"""
+    
+    def _roundtrip(self, graph):
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.bin') as f:
+            filepath = f.name
+        graph.save_binary(filepath)
+        return filepath, FrozenGraph.load_binary(filepath)
+    
+    def _sample_graph(self):
+        graph = BaseGraph(name="", value=0, score=0.0, active=True)
+        v1 = graph.add_node(name="Città", value=1, score=0.5, active=False)
+        v2 = graph.add_node(uid="custom", name="B")
+        v3 = graph.add_node(value=2 ** 70)
+        graph.add_edges([(v1, v2, "link"), (v2, v3, "link"), (v3, v1, "back")])
+        return graph
+    
+    def test_binary_roundtrip(self):
+        """Test che l'istantanea binaria risponde come il grafo originale"""
+        graph = self._sample_graph()
+        filepath, frozen = self._roundtrip(graph)
+        try:
+            assert list(frozen.uids) == list(graph.nodes)
+            assert frozen.keys == graph.keys
+            assert frozen.progress == graph.progress
+            for uid in graph.nodes:
+                assert frozen.nodes[uid].to_dict() == graph.nodes[uid].to_dict()
+                assert frozen.get_neighbors(uid) == graph.get_neighbors(uid)
+                assert frozen.get_predecessors(uid) == graph.get_predecessors(uid)
+            assert frozen.has_edge("node-0", "custom", "link")
+            assert not frozen.has_edge("custom", "node-0", "link")
+        finally:
+            frozen.close()
+            os.remove(filepath)
+    
+    def test_binary_adjacency_is_memoryview(self):
+        """Test che le adiacenze sono viste sul file, senza copia"""
+        filepath, frozen = self._roundtrip(self._sample_graph())
+        try:
+            row = frozen.neighbor_ids(frozen.node_id("node-0"), "link")
+            assert isinstance(row, memoryview)
+            assert row.readonly
+            assert [frozen.node_uid(i) for i in row] == ["custom"]
+        finally:
+            del row
+            frozen.close()
+            os.remove(filepath)
+    
+    def test_binary_thaw(self):
+        """Test che un'istantanea caricata si può riportare a BaseGraph"""
+        graph = self._sample_graph()
+        filepath, frozen = self._roundtrip(graph)
+        try:
+            restored = frozen.thaw()
+            assert restored.to_dict()['nodes'] == graph.to_dict()['nodes']
+            assert restored.has_edge("node-1", "node-0", "back")
+        finally:
+            frozen.close()
+            os.remove(filepath)
+    
+    def test_binary_empty_graph(self):
+        """Test istantanea binaria di un grafo vuoto"""
+        filepath, frozen = self._roundtrip(BaseGraph(name=""))
+        try:
+            assert len(frozen.uids) == 0
+            assert len(frozen.nodes) == 0
+            assert frozen.keys == {"name": ""}
+        finally:
+            frozen.close()
+            os.remove(filepath)
+    
+    def test_binary_attributes_outside_schema(self):
+        """Test che gli attributi fuori schema accettati da from_dict vengono salvati"""
+        graph = BaseGraph.from_dict({
+            'keys': {'name': ''},
+            'progress': 2,
+            'nodes': {'a': {'uid': 'a', 'attributes': {'name': 'x', 'extra': 1}},
+                      'b': {'uid': 'b', 'attributes': {'name': 'y'}}},
+            'edges': {},
+        })
+        filepath, frozen = self._roundtrip(graph)
+        try:
+            assert frozen.keys == {'name': ''}
+            assert frozen.nodes['a'].to_dict() == graph.nodes['a'].to_dict()
+            assert frozen.nodes['b'].to_dict() == {'uid': 'b', 'attributes': {'name': 'y'}}
+        finally:
+            frozen.close()
+            os.remove(filepath)
+    
+    def test_binary_close_releases_file(self):
+        """Test che close (anche via with) libera il file mappato"""
+        filepath, frozen = self._roundtrip(self._sample_graph())
+        try:
+            row = frozen.neighbor_ids(frozen.node_id("node-0"), "link")
+            with pytest.raises(BufferError):
+                frozen.close()
+            del row
+            frozen.close()
+            frozen.close()
+            assert frozen._mmap is None
+            
+            with FrozenGraph.load_binary(filepath) as reopened:
+                assert reopened.has_edge("node-0", "custom", "link")
+            assert reopened._mmap is None
+            with pytest.raises(ValueError):
+                reopened.uids[0]
+            # Senza mappature aperte il file si può sovrascrivere
+            BaseGraph(name="").save_binary(filepath)
+            with FrozenGraph.load_binary(filepath) as empty:
+                assert len(empty.uids) == 0
+        finally:
+            os.remove(filepath)
+    
+    def test_load_binary_rejects_other_files(self):
+        """Test che un file non binario solleva errore"""
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json') as f:
+            f.write('{"keys": {}}' + ' ' * 32)
+            filepath = f.name
+        try:
+            with pytest.raises(ValueError, match="not a binary graph snapshot"):
+                FrozenGraph.load_binary(filepath)
+        finally:
+            os.remove(filepath)
+
+
 class TestSerializationEdgeCases:
     """Test casi limite nella serializzazione"""
     